@@ -11,18 +11,35 @@ patch generation, archival, and planning context scanning.
 """
 
 import argparse
+import atexit
+import concurrent.futures
 import datetime
+import fnmatch
+import gzip
+import hashlib
 import json
+import lzma
+import math
 import os
 import re
 import shutil
 import subprocess
 import sys
-from pathlib import Path
-from typing import Any
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Callable, Iterator
 
 import yaml
 
+try:
+    import numpy as np
+except ImportError:  # optional: BM25 scoring falls back to pure Python
+    np = None
+
 
 # ---------------------------------------------------------------------------
 # JSON encoder
@@ -59,7 +76,13 @@ def find_git_root() -> Path:
 
 
 def find_planning_dir() -> Path:
-    """Find .planning/ from git root. Exit with error if missing."""
+    """Find .planning/ from git root (or the --rev tree). Exit with error if missing."""
+    if _READ_REV is not None:
+        planning = _READ_REV / ".planning"
+        if not planning.is_dir():
+            print(f"Error: No .planning/ directory found at {_READ_REV.rev}", file=sys.stderr)
+            sys.exit(1)
+        return planning
     planning = find_git_root() / ".planning"
     if not planning.is_dir():
         print("Error: No .planning/ directory found", file=sys.stderr)
@@ -82,7 +105,10 @@ def slugify(name: str) -> str:
 
 
 def find_planning_dir_optional() -> Path | None:
-    """Find .planning/ from git root. Return None if missing."""
+    """Find .planning/ from git root (or the --rev tree). Return None if missing."""
+    if _READ_REV is not None:
+        planning = _READ_REV / ".planning"
+        return planning if planning.is_dir() else None
     try:
         result = subprocess.run(
             ["git", "rev-parse", "--show-toplevel"],
@@ -157,10 +183,17 @@ def parse_roadmap_phases(roadmap_path: Path) -> list[tuple[str, str]]:
     """
     if not roadmap_path.is_file():
         return []
-    text = roadmap_path.read_text(encoding="utf-8")
+    doc = MarkdownArtifact.load(roadmap_path)
+    return _roadmap_phases(doc) if doc is not None else []
+
+
+def _roadmap_phases(roadmap: "MarkdownArtifact") -> list[tuple[str, str]]:
+    """(phase_number, phase_name) for each ``### Phase N: Name`` heading in a loaded ROADMAP.md."""
     results: list[tuple[str, str]] = []
-    for line in text.splitlines():
-        m = re.match(r"^###\s+Phase\s+(\d+(?:\.\d+)?)\s*:\s*(.+)$", line)
+    for level, title, *_ in roadmap.headings:
+        if level != 3:
+            continue
+        m = re.match(r"^Phase\s+(\d+(?:\.\d+)?)\s*:\s*(.+)$", title)
         if m:
             num = m.group(1)
             name = re.sub(r"\s*\([A-Z][A-Za-z]*\)\s*$", "", m.group(2)).strip()
@@ -187,6 +220,399 @@ def run_git(*args: str) -> str:
     return result.stdout.strip()
 
 
+class GitSession:
+    """Git access for one working directory with long-lived object lookups.
+
+    Revision and object queries go through persistent ``git cat-file
+    --batch-check`` / ``--batch`` processes, so resolving refs and reading
+    blobs at any revision costs a pipe round-trip instead of a process spawn.
+    Porcelain commands still run through run_git, and multi-path commands are
+    batched into as few invocations as the argv limit allows. Lookups are
+    serialized with a lock, so one session can be shared across threads.
+    """
+
+    _PATH_CHUNK = 512
+    _OBJECT_CACHE_BYTES = 32 * 1024 * 1024
+
+    def __init__(self, cwd: str | None = None) -> None:
+        self.cwd = cwd or os.getcwd()
+        self._procs: dict[str, subprocess.Popen] = {}
+        self._lock = threading.RLock()
+        # Objects are immutable, so anything read by full id can be reused
+        self._objects: dict[str, tuple[str, bytes]] = {}
+        self._object_bytes = 0
+        self._trees: dict[str, dict[str, tuple[str, str]]] = {}
+
+    # --- persistent cat-file processes ---
+
+    def _proc(self, mode: str) -> subprocess.Popen:
+        proc = self._procs.get(mode)
+        if proc is None or proc.poll() is not None:
+            proc = subprocess.Popen(
+                ["git", "cat-file", mode],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                cwd=self.cwd,
+            )
+            self._procs[mode] = proc
+        return proc
+
+    def _request(self, mode: str, obj: str) -> tuple[subprocess.Popen, list[str]] | None:
+        """Send one query and return (process, header fields), or None if the object is missing."""
+        if not obj or "\n" in obj:
+            return None
+        proc = self._proc(mode)
+        proc.stdin.write(obj.encode("utf-8") + b"\n")
+        proc.stdin.flush()
+        header = proc.stdout.readline()
+        if not header:
+            self._procs.pop(mode, None)
+            raise subprocess.CalledProcessError(128, ["git", "cat-file", mode])
+        line = header.decode("utf-8", errors="replace").rstrip("\n")
+        # "<obj> missing" / "<obj> ambiguous" echo the query, which may contain spaces
+        if line.endswith((" missing", " ambiguous")):
+            return None
+        fields = line.split(" ")
+        if len(fields) != 3 or not fields[2].isdigit():
+            return None
+        return proc, fields
+
+    def object_info(self, rev: str) -> tuple[str, str, int] | None:
+        """(oid, type, size) for any revision expression, or None if it doesn't resolve."""
+        with self._lock:
+            reply = self._request("--batch-check", rev)
+        if reply is None:
+            return None
+        oid, obj_type, size = reply[1]
+        return oid, obj_type, int(size)
+
+    def resolve(self, rev: str) -> str | None:
+        """Full object id for *rev*, or None."""
+        info = self.object_info(rev)
+        return info[0] if info else None
+
+    def resolve_many(self, revs: list[str]) -> dict[str, str | None]:
+        """resolve() for several revisions over the same process."""
+        return {rev: self.resolve(rev) for rev in revs}
+
+    def abbrev(self, rev: str) -> str | None:
+        """*rev*'s commit id abbreviated as ``git log --oneline`` prints it.
+
+        Goes through ``%h`` like _short_hashes, so core.abbrev and git's
+        automatic length apply; non-commits come back as the full id.
+        """
+        oid = self.resolve(rev)
+        if oid is None:
+            return None
+        result = subprocess.run(
+            ["git", "log", "--no-walk", "--format=%h", oid], capture_output=True, text=True, cwd=self.cwd
+        )
+        return result.stdout.strip() if result.returncode == 0 and result.stdout.strip() else oid
+
+    def read_object(self, rev: str) -> tuple[str, bytes] | None:
+        """(type, raw content) of *rev*, or None if it doesn't resolve.
+
+        Objects are cached by id (up to _OBJECT_CACHE_BYTES), so reading the
+        same full object id again skips the pipe.
+        """
+        with self._lock:
+            cached = self._objects.get(rev)
+            if cached is not None:
+                return cached
+            reply = self._request("--batch", rev)
+            if reply is None:
+                return None
+            proc, (oid, obj_type, size) = reply
+            remaining = int(size) + 1  # content plus trailing newline
+            chunks: list[bytes] = []
+            while remaining:
+                chunk = proc.stdout.read(remaining)
+                if not chunk:
+                    self._procs.pop("--batch", None)
+                    raise subprocess.CalledProcessError(128, ["git", "cat-file", "--batch"])
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            obj = (obj_type, b"".join(chunks)[:-1])
+            if self._object_bytes + len(obj[1]) <= self._OBJECT_CACHE_BYTES:
+                self._objects[oid] = obj
+                self._object_bytes += len(obj[1])
+        return obj
+
+    def read_tree(self, oid: str) -> dict[str, tuple[str, str]] | None:
+        """Entries of tree *oid* as {name: (type, oid)}, or None if it isn't a tree."""
+        with self._lock:
+            entries = self._trees.get(oid)
+            if entries is not None:
+                return entries
+            obj = self.read_object(oid)
+            if obj is None or obj[0] != "tree":
+                return None
+            raw, hash_len = obj[1], len(oid) // 2
+            entries = {}
+            i = 0
+            while i < len(raw):
+                space = raw.index(b" ", i)
+                nul = raw.index(b"\0", space)
+                mode = raw[i:space]
+                name = raw[space + 1:nul].decode("utf-8", errors="surrogateescape")
+                entry_type = "tree" if mode == b"40000" else "commit" if mode == b"160000" else "blob"
+                entries[name] = (entry_type, raw[nul + 1:nul + 1 + hash_len].hex())
+                i = nul + 1 + hash_len
+            self._trees[oid] = entries
+        return entries
+
+    def read_blob(self, rev: str, path: str) -> bytes | None:
+        """Contents of *path* at *rev* (e.g. ``read_blob("HEAD~3", "src/app.py")``), or None."""
+        obj = self.read_object(f"{rev}:{path}")
+        if obj is None or obj[0] != "blob":
+            return None
+        return obj[1]
+
+    def commit_subject(self, rev: str) -> str:
+        """First line of a commit message, or "" if *rev* isn't a commit."""
+        obj = self.read_object(rev)
+        if obj is None or obj[0] != "commit":
+            return ""
+        _, _, message = obj[1].partition(b"\n\n")
+        return message.decode("utf-8", errors="replace").split("\n", 1)[0]
+
+    # --- process-per-call commands ---
+
+    def run(self, *args: str) -> str:
+        """Run a porcelain git command (see run_git)."""
+        return run_git(*args)
+
+    def stream(self, *args: str) -> subprocess.Popen:
+        """Start ``git <args>`` with stdout as a binary pipe, for output too large to buffer."""
+        return subprocess.Popen(
+            ["git", *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.cwd,
+        )
+
+    def check_attr(self, attrs: list[str], paths: list[str]) -> dict[str, dict[str, str]]:
+        """Values of gitattributes *attrs* for *paths*, in one ``git check-attr --stdin`` call.
+
+        Values are "set", "unset", "unspecified" or the assigned string.
+        """
+        if not paths:
+            return {}
+        result = subprocess.run(
+            ["git", "check-attr", "-z", "--stdin", *attrs],
+            input="\0".join(paths) + "\0",
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=self.cwd,
+        )
+        values: dict[str, dict[str, str]] = {}
+        fields = result.stdout.split("\0")
+        for i in range(0, len(fields) - 2, 3):
+            path, attr, value = fields[i:i + 3]
+            values.setdefault(path, {})[attr] = value
+        return values
+
+    def run_paths(self, args: list[str], paths: list[str]) -> None:
+        """Run ``git <args> -- <paths>`` in as few invocations as possible."""
+        for i in range(0, len(paths), self._PATH_CHUNK):
+            run_git(*args, "--", *paths[i:i + self._PATH_CHUNK])
+
+    def close(self) -> None:
+        """Terminate the cat-file processes."""
+        for proc in self._procs.values():
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+        self._procs.clear()
+
+
+_GIT_SESSIONS: dict[str, GitSession] = {}
+
+
+def _git_session() -> GitSession:
+    """Shared GitSession for the current working directory."""
+    cwd = os.getcwd()
+    session = _GIT_SESSIONS.get(cwd)
+    if session is None:
+        session = _GIT_SESSIONS[cwd] = GitSession(cwd)
+    return session
+
+
+@atexit.register
+def _close_git_sessions() -> None:
+    for session in _GIT_SESSIONS.values():
+        session.close()
+    _GIT_SESSIONS.clear()
+
+
+class RevPath:
+    """Read-only stand-in for a pathlib.Path inside a commit's tree.
+
+    Backs the global --rev option: planning readers keep using the Path API
+    (joining, name/stem/suffix/parent, is_dir/is_file, iterdir/glob,
+    read_text, relative_to) while trees and blobs come from the GitSession
+    object cache. ``str()`` renders as ``<rev>:<path>``.
+    """
+
+    def __init__(
+        self, session: GitSession, rev: str, tree: str, worktree: Path, parts: tuple[str, ...] = ()
+    ) -> None:
+        self._session = session
+        self.rev = rev
+        self._tree = tree
+        self._worktree = worktree
+        self.parts = parts
+
+    @classmethod
+    def at(cls, rev: str, worktree: Path) -> "RevPath | None":
+        """Root of *rev*'s tree, or None if *rev* doesn't name a commit."""
+        session = _git_session()
+        if session.resolve(f"{rev}^{{commit}}") is None:
+            return None
+        return cls(session, rev, session.resolve(f"{rev}^{{tree}}"), worktree)
+
+    def _child(self, parts: tuple[str, ...]) -> "RevPath":
+        return RevPath(self._session, self.rev, self._tree, self._worktree, parts)
+
+    def __truediv__(self, other: str) -> "RevPath":
+        return self._child(self.parts + tuple(p for p in str(other).split("/") if p and p != "."))
+
+    def __str__(self) -> str:
+        return f"{self.rev}:{'/'.join(self.parts)}"
+
+    def __repr__(self) -> str:
+        return f"RevPath({str(self)!r})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RevPath) and (self._tree, self.parts) == (other._tree, other.parts)
+
+    def __hash__(self) -> int:
+        return hash((self._tree, self.parts))
+
+    def __lt__(self, other: "RevPath") -> bool:
+        return self.parts < other.parts
+
+    @property
+    def name(self) -> str:
+        return self.parts[-1] if self.parts else ""
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.name).suffix
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.name).stem
+
+    @property
+    def parent(self) -> "RevPath":
+        return self._child(self.parts[:-1])
+
+    @property
+    def worktree(self) -> Path:
+        """The same path in the working tree (used to locate the git dir)."""
+        return self._worktree.joinpath(*self.parts)
+
+    @property
+    def oid(self) -> str | None:
+        """Object id at this path, or None if nothing exists there."""
+        entry = self._entry()
+        return entry[1] if entry else None
+
+    def _entry(self) -> tuple[str, str] | None:
+        entry: tuple[str, str] | None = ("tree", self._tree)
+        for part in self.parts:
+            entries = self._session.read_tree(entry[1]) if entry[0] == "tree" else None
+            entry = entries.get(part) if entries else None
+            if entry is None:
+                return None
+        return entry
+
+    def exists(self) -> bool:
+        return self._entry() is not None
+
+    def is_dir(self) -> bool:
+        entry = self._entry()
+        return entry is not None and entry[0] == "tree"
+
+    def is_file(self) -> bool:
+        entry = self._entry()
+        return entry is not None and entry[0] == "blob"
+
+    def iterdir(self) -> Iterator["RevPath"]:
+        entry = self._entry()
+        if entry is None or entry[0] != "tree":
+            raise NotADirectoryError(str(self))
+        for name in self._session.read_tree(entry[1]) or {}:
+            yield self._child(self.parts + (name,))
+
+    def glob(self, pattern: str) -> Iterator["RevPath"]:
+        """Match *pattern* segment by segment, with ``**`` spanning any number of directories."""
+        if not self.is_dir():
+            return iter(())
+        return self._glob(pattern.split("/"))
+
+    def _glob(self, segments: list[str]) -> Iterator["RevPath"]:
+        if not segments:
+            yield self
+            return
+        head, rest = segments[0], segments[1:]
+        if head == "**":
+            yield from self._glob(rest)
+            for child in self.iterdir():
+                if child.is_dir():
+                    yield from child._glob(segments)
+            return
+        for child in self.iterdir():
+            if fnmatch.fnmatchcase(child.name, head) and (not rest or child.is_dir()):
+                yield from child._glob(rest)
+
+    def read_bytes(self) -> bytes:
+        entry = self._entry()
+        obj = self._session.read_object(entry[1]) if entry and entry[0] == "blob" else None
+        if obj is None:
+            raise FileNotFoundError(str(self))
+        return obj[1]
+
+    def read_text(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return self.read_bytes().decode(encoding, errors)
+
+    def is_relative_to(self, other: "RevPath") -> bool:
+        return isinstance(other, RevPath) and self.parts[:len(other.parts)] == other.parts
+
+    def relative_to(self, other: "RevPath") -> PurePosixPath:
+        if not self.is_relative_to(other):
+            raise ValueError(f"{self} is not relative to {other}")
+        return PurePosixPath(*self.parts[len(other.parts):])
+
+
+# Tree read by planning commands when --rev is given (see _read_root)
+_READ_REV: RevPath | None = None
+_REV_COMMANDS = ("find-phase", "list-artifacts", "prework-status", "scan-planning-context", "uat-status")
+
+
+def _read_root() -> "Path | RevPath":
+    """Repository root that planning readers use: the --rev tree when set, else the working tree."""
+    return _READ_REV if _READ_REV is not None else find_git_root()
+
+
+def _use_rev(rev: str, command: str) -> None:
+    """Point _read_root() at *rev*'s tree for a read-only *command*, or exit 1."""
+    global _READ_REV
+    if command not in _REV_COMMANDS:
+        print(f"Error: --rev is only supported by: {', '.join(_REV_COMMANDS)}", file=sys.stderr)
+        sys.exit(1)
+    root = RevPath.at(rev, find_git_root())
+    if root is None:
+        print(f"Error: Unknown revision: {rev}", file=sys.stderr)
+        sys.exit(1)
+    _READ_REV = root
+
+
 def parse_json_config(planning: Path) -> dict:
     """Read .planning/config.json."""
     config_path = planning / "config.json"
@@ -198,6 +624,61 @@ def parse_json_config(planning: Path) -> dict:
         return {}
 
 
+def _git_dir(root: Path) -> Path | None:
+    """Resolve the .git directory for *root*, following worktree ``gitdir:`` files."""
+    dot_git = root / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        try:
+            content = dot_git.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        if content.startswith("gitdir:"):
+            gitdir = Path(content[len("gitdir:"):].strip())
+            if not gitdir.is_absolute():
+                gitdir = root / gitdir
+            return gitdir if gitdir.is_dir() else None
+    return None
+
+
+def _tool_cache_dir(root: Path) -> Path | None:
+    """Return ``<git-dir>/ms-tools`` for derived caches, or None outside a git checkout.
+
+    Caches live under the git dir so they are never committed and survive
+    branch switches; callers fall back to uncached computation on None.
+    """
+    if isinstance(root, RevPath):
+        root = root.worktree
+    git_dir = _git_dir(root)
+    if git_dir is None:
+        return None
+    cache_dir = git_dir / "ms-tools"
+    try:
+        cache_dir.mkdir(exist_ok=True)
+    except OSError:
+        return None
+    return cache_dir
+
+
+def _read_json_cache(path: Path) -> Any:
+    """Load a JSON cache file, returning None when missing or corrupt."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_json_cache(path: Path, data: Any) -> None:
+    """Write a compact JSON cache file atomically. Cache write failures are ignored."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data, separators=(",", ":"), cls=_SafeEncoder), encoding="utf-8")
+        os.replace(str(tmp), str(path))
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
 # ---------------------------------------------------------------------------
 # config.json dot-path helpers
 # ---------------------------------------------------------------------------
@@ -309,19 +790,105 @@ _FRONTMATTER_RE = re.compile(r"\A---\s*\n(.*?\n)---\s*\n", re.DOTALL)
 
 def parse_frontmatter(path: Path) -> dict[str, Any] | None:
     """Extract YAML frontmatter from a markdown file."""
-    try:
-        text = path.read_text(encoding="utf-8", errors="replace")
-    except OSError:
-        return None
+    doc = MarkdownArtifact.load(path)
+    return doc.frontmatter if doc is not None else None
 
-    match = _FRONTMATTER_RE.match(text)
-    if not match:
-        return None
 
-    try:
-        return yaml.safe_load(match.group(1)) or {}
-    except yaml.YAMLError:
-        return None
+# ---------------------------------------------------------------------------
+# Markdown artifact loading
+# ---------------------------------------------------------------------------
+
+_HEADING_RE = re.compile(r"^(#{2,3})[ \t]+(.+)$", re.MULTILINE)
+
+
+class MarkdownArtifact:
+    """A markdown file decoded once: frontmatter plus a ``##``/``###`` heading index.
+
+    Each heading is indexed as (level, title, start, body_start, end) where
+    body_start follows the heading line and end is the next heading of the
+    same or higher level. Section bodies are sliced from the decoded text on
+    demand; the index itself is built on first use.
+    """
+
+    def __init__(self, text: str, path: Path | None = None, *, has_frontmatter: bool = True) -> None:
+        self.path = path
+        self.text = text
+        self.frontmatter: dict[str, Any] | None = None
+        self.body_start = 0
+        match = _FRONTMATTER_RE.match(text) if has_frontmatter else None
+        if match:
+            self.body_start = match.end()
+            try:
+                self.frontmatter = yaml.safe_load(match.group(1)) or {}
+            except yaml.YAMLError:
+                self.frontmatter = None
+        self._headings: list[tuple[int, str, int, int, int]] | None = None
+        self._by_title: dict[str, int] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "MarkdownArtifact | None":
+        """Read *path* once, or return None if it can't be read."""
+        try:
+            text = path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return None
+        return cls(text, path)
+
+    @property
+    def body(self) -> str:
+        """Text after the frontmatter block."""
+        return self.text[self.body_start:]
+
+    @property
+    def headings(self) -> list[tuple[int, str, int, int, int]]:
+        """Heading index in document order."""
+        if self._headings is None:
+            self._build_index()
+        return self._headings
+
+    def _build_index(self) -> None:
+        text = self.text
+        found: list[list[Any]] = []
+        open_sections: list[list[Any]] = []
+        for m in _HEADING_RE.finditer(text, self.body_start):
+            level = len(m.group(1))
+            while open_sections and open_sections[-1][0] >= level:
+                open_sections.pop()[4] = m.start()
+            body_start = m.end() + 1 if m.end() < len(text) else m.end()
+            entry = [level, m.group(2).strip(), m.start(), body_start, len(text)]
+            found.append(entry)
+            open_sections.append(entry)
+        self._headings = [tuple(e) for e in found]
+        for i, heading in enumerate(self._headings):
+            self._by_title.setdefault(heading[1], i)
+
+    def has_section(self, title: str) -> bool:
+        """Whether a ``##``/``###`` heading with *title* exists."""
+        if self._headings is None:
+            self._build_index()
+        return title in self._by_title
+
+    def section(self, title: str) -> str | None:
+        """Body of the first section titled *title* (subsections included), or None."""
+        if self._headings is None:
+            self._build_index()
+        idx = self._by_title.get(title)
+        if idx is None:
+            return None
+        _, _, _, body_start, end = self._headings[idx]
+        return self.text[body_start:end]
+
+    def sections(self, level: int = 2) -> dict[str, str]:
+        """{title: body} for every heading at *level*; later duplicates win.
+
+        Bodies drop the newline that precedes the next heading, matching a
+        line-wise split-and-join.
+        """
+        return {
+            title: self.text[body_start:end].removesuffix("\n")
+            for lvl, title, _, body_start, end in self.headings
+            if lvl == level
+        }
 
 
 # ---------------------------------------------------------------------------
@@ -350,9 +917,630 @@ PATCH_EXCLUSIONS = [
 ]
 
 
-def build_exclude_pathspecs() -> list[str]:
-    """Build git pathspec exclusion list."""
-    return [f":!{p}" for p in PATCH_EXCLUSIONS]
+def _patch_config(config: dict | None) -> dict:
+    """The "patch" section of config.json, or {} when absent or malformed."""
+    section = (config or {}).get("patch")
+    return section if isinstance(section, dict) else {}
+
+
+def build_exclude_pathspecs(config: dict | None = None) -> list[str]:
+    """Build git pathspec exclusion list.
+
+    Defaults to PATCH_EXCLUSIONS, extended by ``patch.exclude`` from
+    config.json. ``patch.default_exclusions: false`` drops the defaults.
+    """
+    patch_config = _patch_config(config)
+    patterns = list(PATCH_EXCLUSIONS) if patch_config.get("default_exclusions", True) is not False else []
+    extra = patch_config.get("exclude", [])
+    if isinstance(extra, str):
+        extra = [extra]
+    if isinstance(extra, list):
+        patterns.extend(str(p) for p in extra if str(p).strip() and str(p) not in patterns)
+    return [f":!{p}" for p in patterns]
+
+
+def _attribute_excluded(attrs: dict[str, str]) -> bool:
+    """True for ``linguist-generated`` files and files marked ``-diff``."""
+    return attrs.get("linguist-generated") in ("set", "true") or attrs.get("diff") == "unset"
+
+
+# Per-path exclusions beyond this many go through _tree_without_paths instead
+# of the command line, which ARG_MAX (32 KiB on Windows) would otherwise cap
+_EXCLUDE_ARGV_PATHS = 512
+
+
+def _tree_without_paths(base: str, head: str, paths: set[str]) -> str:
+    """Tree id of *head* with *paths* reset to their state in *base*.
+
+    Diffing *base* against this tree leaves those paths out without naming
+    them on the command line. The tree is built in a throwaway index fed over
+    stdin, so the repository index and worktree are untouched.
+    """
+    cwd = _git_session().cwd
+    raw = subprocess.run(
+        ["git", "diff", "--raw", "-z", "--no-renames", "--no-abbrev", base, head],
+        capture_output=True, text=True, check=True, cwd=cwd,
+    ).stdout.split("\0")
+    index_info: list[str] = []
+    for i in range(0, len(raw) - 1, 2):
+        old_mode, _, old_oid, _, _ = raw[i].lstrip(":").split()
+        path = raw[i + 1]
+        if path in paths:
+            # Mode 0 removes a path that did not exist in base
+            index_info.append(f"{'0' if old_mode == '000000' else old_mode} {old_oid}\t{path}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "GIT_INDEX_FILE": str(Path(tmp) / "index")}
+
+        def git(*args: str, stdin: str | None = None) -> str:
+            return subprocess.run(
+                ["git", *args], input=stdin, capture_output=True, text=True, check=True, cwd=cwd, env=env,
+            ).stdout.strip()
+
+        git("read-tree", head)
+        git("update-index", "-z", "--index-info", stdin="\0".join(index_info) + "\0")
+        return git("write-tree")
+
+
+def patch_diff_args(
+    revs: list[str], options: list[str] | None = None, config: dict | None = None, paths: list[str] | None = None
+) -> tuple[list[str], list[str]]:
+    """Build ``diff <options> <revs> -- . <exclusions>`` with every patch exclusion resolved.
+
+    With *paths*, only those literal paths are diffed instead of ``.``.
+
+    Pattern exclusions (defaults + ``patch.exclude``) become pathspecs. Files
+    marked generated / -diff in .gitattributes (unless ``patch.gitattributes``
+    is false) and files changing more than ``patch.exclude_over_lines`` lines are
+    found from one ``--numstat`` pass and excluded by literal path, so the
+    content diff never reads them. Past _EXCLUDE_ARGV_PATHS such paths, the
+    head revision is swapped for a tree with them reset to base instead (see
+    _tree_without_paths), keeping the command line short. Returns
+    (diff_args, excluded_paths).
+    """
+    patch_config = _patch_config(config)
+    includes = [f":(literal){p}" for p in paths] if paths else ["."]
+    pathspecs = ["--", *includes] + build_exclude_pathspecs(config)
+    max_lines = patch_config.get("exclude_over_lines")
+    if not isinstance(max_lines, int) or isinstance(max_lines, bool) or max_lines <= 0:
+        max_lines = None
+    use_attributes = patch_config.get("gitattributes", True) is not False
+
+    excluded: list[str] = []
+    if use_attributes or max_lines:
+        git = _git_session()
+        try:
+            entries = _parse_numstat_z(git.run("diff", "--numstat", "-z", *revs, *pathspecs))
+            paths = [e["path"] for e in entries]
+            attributes = git.check_attr(["linguist-generated", "diff"], paths) if use_attributes else {}
+        except subprocess.CalledProcessError:
+            entries, attributes = [], {}  # unresolvable range: the content diff reports it
+        for entry in entries:
+            too_large = max_lines is not None and (entry["insertions"] or 0) + (entry["deletions"] or 0) > max_lines
+            if too_large or _attribute_excluded(attributes.get(entry["path"], {})):
+                excluded.extend(p for p in (entry["old_path"], entry["path"]) if p)
+
+    if len(excluded) > _EXCLUDE_ARGV_PATHS and len(revs) == 2:
+        tree = _tree_without_paths(revs[0], revs[1], set(excluded))
+        return ["diff", *(options or []), revs[0], tree, *pathspecs], excluded
+    diff_args = ["diff", *(options or []), *revs, *pathspecs]
+    diff_args.extend(f":(exclude,literal){path}" for path in excluded)
+    return diff_args, excluded
+
+
+_PATCH_CHUNK_SIZE = 64 * 1024
+
+PATCH_COMPRESSION_SUFFIXES = {"gzip": ".gz", "xz": ".xz"}
+
+
+def patch_output_path(path: Path, compress: str | None) -> Path:
+    """*path* with the suffix for *compress* ("gzip"/"xz") appended if missing."""
+    suffix = PATCH_COMPRESSION_SUFFIXES.get(compress or "", "")
+    return path if not suffix or path.name.endswith(suffix) else path.with_name(path.name + suffix)
+
+
+def _open_patch_writer(path: Path, compress: str | None) -> BinaryIO:
+    if compress == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compress == "xz":
+        return lzma.open(path, "wb", preset=6)
+    return open(path, "wb")
+
+
+def open_patch(path: Path) -> BinaryIO:
+    """Open a patch for reading, decompressing gzip/xz by magic bytes."""
+    with open(path, "rb") as f:
+        magic = f.read(6)
+    if magic.startswith(b"\x1f\x8b"):
+        return gzip.open(path, "rb")
+    if magic.startswith(b"\xfd7zXZ\x00"):
+        return lzma.open(path, "rb")
+    return open(path, "rb")
+
+
+def _remove_other_patch_mode(patch_file: Path, split: bool, compress: str | None = None) -> None:
+    """Delete earlier outputs of phase patch *patch_file* other than the one just written.
+
+    *patch_file* is the uncompressed name from _phase_patch_file, so only the
+    tool's own outputs are touched. A --split run removes the single-file
+    patch and its compressed variants; a single-file run removes the variants
+    for other --compress settings and the ``-changes/`` split directory (only
+    if it has a manifest, so unrelated directories are never touched).
+    """
+    written = None if split else patch_output_path(patch_file, compress)
+    for suffix in ("", *PATCH_COMPRESSION_SUFFIXES.values()):
+        variant = patch_file.with_name(patch_file.name + suffix)
+        if variant != written:
+            variant.unlink(missing_ok=True)
+    if split:
+        return
+    split_dir = patch_file.with_name(patch_file.name.removesuffix(".patch"))
+    if (split_dir / "manifest.json").is_file():
+        shutil.rmtree(split_dir)
+
+
+def write_diff_patch(diff_args: list[str], output_path: Path, compress: str | None = None) -> int | None:
+    """Stream ``git <diff_args>`` into *output_path* and return its line count.
+
+    Output is copied in fixed-size binary chunks (through gzip/xz when
+    *compress* is set), so memory stays flat and non-UTF-8 content passes
+    through untouched. The patch is written to a temp file first; on an empty
+    diff or git failure it is discarded, any existing file at *output_path*
+    is left alone, and None is returned.
+    """
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    proc = _git_session().stream(*diff_args)
+    lines = 0
+    size = 0
+    last = b"\n"
+    try:
+        with _open_patch_writer(tmp_path, compress) as out:
+            while chunk := proc.stdout.read(_PATCH_CHUNK_SIZE):
+                out.write(chunk)
+                lines += chunk.count(b"\n")
+                size += len(chunk)
+                last = chunk[-1:]
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+
+    if returncode != 0 or size == 0:
+        tmp_path.unlink(missing_ok=True)
+        return None
+    os.replace(tmp_path, output_path)
+    return lines + (last != b"\n")
+
+
+def _parse_numstat_z(output: str) -> list[dict]:
+    """Parse ``git diff --numstat -z`` output into per-file entries (diff order).
+
+    Binary files have None insertions/deletions and ``binary`` set; renames
+    and copies carry ``old_path``. ``status`` defaults to "M".
+    """
+    fields = output.split("\0")
+    entries: list[dict] = []
+    i = 0
+    while i < len(fields):
+        record = fields[i]
+        i += 1
+        if not record:
+            continue
+        added, deleted, path = record.split("\t", 2)
+        old_path = None
+        if not path:  # rename/copy: old and new paths follow as separate fields
+            old_path, path = fields[i], fields[i + 1]
+            i += 2
+        entries.append({
+            "path": path,
+            "old_path": old_path,
+            "status": "M",
+            "insertions": None if added == "-" else int(added),
+            "deletions": None if deleted == "-" else int(deleted),
+            "binary": added == "-",
+        })
+    return entries
+
+
+def _diff_file_entries(diff_args: list[str]) -> list[dict]:
+    """Per-file status and line counts for ``git <diff_args>``, in diff output order.
+
+    Reads ``--numstat -z`` (order, counts, rename paths) and ``--name-status -z``
+    (status letters) for the same revisions and pathspecs.
+    """
+    git = _git_session()
+    entries = _parse_numstat_z(git.run("diff", "--numstat", "-z", *diff_args[1:]))
+
+    statuses: dict[str, str] = {}
+    fields = git.run("diff", "--name-status", "-z", *diff_args[1:]).split("\0")
+    i = 0
+    while i < len(fields):
+        status = fields[i]
+        i += 1
+        if not status:
+            continue
+        if status[0] in "RC":
+            i += 1
+        statuses[fields[i]] = status
+        i += 1
+    for entry in entries:
+        entry["status"] = statuses.get(entry["path"], entry["status"])
+    return entries
+
+
+def _split_patch_name(index: int, path: str, compress: str | None = None) -> str:
+    """Stable, filesystem-safe patch filename for the index-th changed file."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", path).strip("_")[-80:]
+    return f"{index:04d}-{slug}.patch{PATCH_COMPRESSION_SUFFIXES.get(compress or '', '')}"
+
+
+_TRUNCATION_MARKER = b"# ms-tools:"
+
+
+def _spool_diff_sections(diff_args: list[str], spool: BinaryIO) -> list[dict] | None:
+    """Stream ``git <diff_args>`` into *spool*, indexing each file section and its hunks.
+
+    Each section records byte offsets and line counts for its header (everything
+    before the first ``@@`` or ``GIT binary patch`` line) and for every hunk.
+    Returns None if git fails.
+    """
+    proc = _git_session().stream(*diff_args)
+    sections: list[dict] = []
+    current: dict | None = None
+    at_line_start = True
+    try:
+        while piece := proc.stdout.readline(_PATCH_CHUNK_SIZE):
+            offset = spool.tell()
+            if at_line_start:
+                if piece.startswith(b"diff --git "):
+                    current = {"start": offset, "header_lines": 0, "hunks": []}
+                    sections.append(current)
+                elif current is not None and (piece.startswith(b"@@") or piece.startswith(b"GIT binary patch")):
+                    current["hunks"].append([offset, 0])
+            spool.write(piece)
+            if at_line_start and current is not None:
+                if current["hunks"]:
+                    current["hunks"][-1][1] += 1
+                else:
+                    current["header_lines"] += 1
+            at_line_start = piece.endswith(b"\n")
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        return None
+
+    end = spool.tell()
+    for i, section in enumerate(sections):
+        section["end"] = sections[i + 1]["start"] if i + 1 < len(sections) else end
+        section["header_end"] = section["hunks"][0][0] if section["hunks"] else section["end"]
+        section["lines"] = section["header_lines"] + sum(h[1] for h in section["hunks"])
+    return sections
+
+
+def _budget_sections(
+    sections: list[dict], entries: list[dict], max_lines: int | None, max_file_lines: int | None
+) -> list[tuple[int, int] | None]:
+    """Per section, None to keep it whole or (whole hunks kept, lines kept of the next hunk).
+
+    Sections are ranked by insertions (ascending, then path) so the budget is
+    spent on the smallest changes first. A section is kept whole when it fits
+    both the per-file cap and what is left of the total; otherwise its header,
+    as many leading hunks as fit, and the first lines of the next hunk are
+    kept. A new or rewritten file is a single hunk, so it is cut inside that
+    hunk. Headers are always kept, so the total can exceed *max_lines* by a
+    few header lines.
+    """
+    keep: list[tuple[int, int] | None] = [None] * len(sections)
+    remaining = max_lines if max_lines else math.inf
+    order = sorted(range(len(sections)), key=lambda i: (entries[i]["insertions"] or 0, entries[i]["path"]))
+    for i in order:
+        section = sections[i]
+        allowance = min(max_file_lines or math.inf, remaining)
+        if section["lines"] <= allowance:
+            remaining -= section["lines"]
+            continue
+        used = section["header_lines"]
+        kept = 0
+        partial = 0
+        for _, hunk_lines in section["hunks"]:
+            if used + hunk_lines > allowance:
+                partial = int(max(0, allowance - used))
+                used += partial
+                break
+            used += hunk_lines
+            kept += 1
+        keep[i] = (kept, partial)
+        remaining = max(0, remaining - used)
+    return keep
+
+
+def write_budgeted_patch(
+    diff_args: list[str],
+    output_path: Path,
+    compress: str | None = None,
+    max_lines: int | None = None,
+    max_file_lines: int | None = None,
+) -> tuple[int, list[dict]] | None:
+    """Like write_diff_patch, but fit the patch into a line budget.
+
+    The diff is spooled to a temp file once, so sizes are exact and memory
+    stays flat. Files that don't fit (see _budget_sections) keep their header,
+    a stat line, their first hunks and the start of the next one, followed by
+    a truncation marker. Marker
+    lines make a truncated patch unusable with git apply. Returns
+    (line count, truncated file entries), or None on an empty diff / git failure.
+    """
+    entries = _parse_numstat_z(_git_session().run("diff", "--numstat", "-z", *diff_args[1:]))
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    with tempfile.TemporaryFile() as spool:
+        sections = _spool_diff_sections(diff_args, spool)
+        if not sections or len(sections) != len(entries):
+            return None
+        keep = _budget_sections(sections, entries, max_lines, max_file_lines)
+
+        lines = 0
+        truncated: list[dict] = []
+        with _open_patch_writer(tmp_path, compress) as out:
+
+            def copy(start: int, end: int) -> None:
+                nonlocal lines
+                spool.seek(start)
+                remaining = end - start
+                while remaining:
+                    chunk = spool.read(min(_PATCH_CHUNK_SIZE, remaining))
+                    out.write(chunk)
+                    lines += chunk.count(b"\n")
+                    remaining -= len(chunk)
+
+            def copy_lines(start: int, count: int) -> None:
+                nonlocal lines
+                spool.seek(start)
+                while count:
+                    piece = spool.readline(_PATCH_CHUNK_SIZE)
+                    if not piece:
+                        break
+                    out.write(piece)
+                    if piece.endswith(b"\n"):
+                        lines += 1
+                        count -= 1
+
+            for section, entry, budget in zip(sections, entries, keep):
+                if budget is None:
+                    copy(section["start"], section["end"])
+                    continue
+                kept, partial = budget
+                total = len(section["hunks"])
+                copy(section["start"], section["header_end"])
+                stat = f"+{entry['insertions'] or 0} -{entry['deletions'] or 0}"
+                showing = f"showing {kept} of {total} hunk(s)"
+                if partial:
+                    showing += f" and {partial} line(s) of hunk {kept + 1}"
+                out.write(_TRUNCATION_MARKER + f" {entry['path']} {stat}, {showing}\n".encode())
+                if kept:
+                    copy(section["hunks"][0][0], section["hunks"][kept][0] if kept < total else section["end"])
+                if partial:
+                    copy_lines(section["hunks"][kept][0], partial)
+                omitted = sum(h[1] for h in section["hunks"][kept:]) - partial
+                out.write(_TRUNCATION_MARKER + f" truncated {total - kept} hunk(s), {omitted} line(s) omitted\n".encode())
+                lines += 2
+                truncated.append({**entry, "hunks": total, "kept_hunks": kept, "kept_lines": partial})
+
+    os.replace(tmp_path, output_path)
+    return lines, truncated
+
+
+def _write_patch_file(diff_args: list[str], output_path: Path, args: argparse.Namespace) -> tuple[int, list[dict]] | None:
+    """Write a single patch honouring --compress and --max-lines/--max-file-lines."""
+    compress = getattr(args, "compress", None)
+    max_lines = getattr(args, "max_lines", None)
+    max_file_lines = getattr(args, "max_file_lines", None)
+    if max_lines or max_file_lines:
+        return write_budgeted_patch(diff_args, output_path, compress, max_lines, max_file_lines)
+    line_count = write_diff_patch(diff_args, output_path, compress)
+    return None if line_count is None else (line_count, [])
+
+
+def _print_truncated(truncated: list[dict]) -> None:
+    if not truncated:
+        return
+    print(f"Truncated {len(truncated)} file(s) to fit the line budget (patch is for review, not git apply):")
+    for entry in truncated:
+        partial = f" + {entry['kept_lines']} line(s)" if entry.get("kept_lines") else ""
+        print(f"  {entry['path']} (+{entry['insertions'] or 0} -{entry['deletions'] or 0}, "
+              f"kept {entry['kept_hunks']}/{entry['hunks']} hunks{partial})")
+
+
+def write_split_patches(diff_args: list[str], out_dir: Path, compress: str | None = None) -> dict | None:
+    """Stream ``git <diff_args>`` into one patch per file under *out_dir* plus manifest.json.
+
+    The diff is read once; a new file starts at each ``diff --git`` header and
+    is paired with the matching --numstat entry (same order). Output is built
+    in a sibling temp directory and swapped in, so a stale split from an
+    earlier run never mixes with the new one. Returns the manifest, or None
+    (leaving *out_dir* untouched) when the diff is empty or git fails.
+    """
+    entries = _diff_file_entries(diff_args)
+    if not entries:
+        return None
+
+    tmp_dir = out_dir.with_name(f"{out_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    proc = _git_session().stream(*diff_args)
+    index = -1
+    out = None
+    at_line_start = True
+    try:
+        while piece := proc.stdout.readline(_PATCH_CHUNK_SIZE):
+            if at_line_start and piece.startswith(b"diff --git "):
+                if out is not None:
+                    out.close()
+                index += 1
+                if index >= len(entries):
+                    break
+                entry = entries[index]
+                entry["patch"] = _split_patch_name(index + 1, entry["path"], compress)
+                entry["bytes"] = 0
+                out = _open_patch_writer(tmp_dir / entry["patch"], compress)
+            if out is not None:
+                out.write(piece)
+                entries[index]["bytes"] += len(piece)
+            at_line_start = piece.endswith(b"\n")
+    finally:
+        if out is not None:
+            out.close()
+        proc.stdout.close()
+        returncode = proc.wait()
+
+    if returncode != 0 or index + 1 != len(entries):
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return None
+
+    for entry in entries:
+        entry["patch"] = str(out_dir / entry["patch"])
+    manifest = {
+        "files": entries,
+        "totals": {
+            "files": len(entries),
+            "insertions": sum(e["insertions"] or 0 for e in entries),
+            "deletions": sum(e["deletions"] or 0 for e in entries),
+            "bytes": sum(e["bytes"] for e in entries),
+        },
+    }
+    _write_config_atomic(tmp_dir / "manifest.json", manifest)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return manifest
+
+
+# -------------------------------------------------------------------
+# Helper: change stats (per-directory / per-subsystem diff totals)
+# -------------------------------------------------------------------
+
+_UNMAPPED_SUBSYSTEM = "(unmapped)"
+
+
+def _summary_key_files(fm: dict) -> list[str]:
+    """Repo-relative paths from a SUMMARY's ``key-files.created``/``modified`` lists."""
+    kf = fm.get("key-files", {}) or {}
+    if not isinstance(kf, dict):
+        return []
+    paths: list[str] = []
+    for group in ("created", "modified"):
+        files = kf.get(group, []) or []
+        if isinstance(files, str):
+            files = [files]
+        for f in files:
+            path = str(f).strip().strip("`").split()[0] if str(f).strip() else ""
+            if path:
+                paths.append(path.removeprefix("./"))
+    return paths
+
+
+def _key_file_subsystems(planning: Path) -> dict[str, str]:
+    """Map key-files paths from phase SUMMARY frontmatter to their subsystem.
+
+    Later phases win when a file is listed under several subsystems.
+    """
+    mapping: dict[str, str] = {}
+    phases_dir = planning / "phases"
+    if not phases_dir.is_dir():
+        return mapping
+    for summary in sorted(phases_dir.glob("*/*-SUMMARY.md")):
+        doc = MarkdownArtifact.load(summary)
+        fm = doc.frontmatter if doc else None
+        if not fm or not fm.get("subsystem"):
+            continue
+        for path in _summary_key_files(fm):
+            mapping[path] = str(fm["subsystem"])
+    return mapping
+
+
+def _phase_key_files(phase_dir: Path) -> list[str]:
+    """Sorted union of key-files across the SUMMARYs in one phase directory."""
+    paths: set[str] = set()
+    for summary in phase_dir.glob("*-SUMMARY.md"):
+        doc = MarkdownArtifact.load(summary)
+        if doc and doc.frontmatter:
+            paths.update(_summary_key_files(doc.frontmatter))
+    return sorted(paths)
+
+
+def _subsystem_for(path: str, key_files: dict[str, str]) -> str:
+    """Subsystem of *path*: exact key-files match, else the deepest directory holding a key file."""
+    if path in key_files:
+        return key_files[path]
+    best, best_depth = _UNMAPPED_SUBSYSTEM, -1
+    for key_path, subsystem in key_files.items():
+        key_dir = key_path.rpartition("/")[0]
+        if key_dir and (path + "/").startswith(key_dir + "/"):
+            depth = key_dir.count("/")
+            if depth > best_depth:
+                best, best_depth = subsystem, depth
+    return best
+
+
+def compute_change_stats(diff_args: list[str], key_files: dict[str, str], depth: int = 2) -> dict[str, Any]:
+    """Aggregate one ``git diff --numstat -z`` run per directory and per subsystem.
+
+    *diff_args* is a ``diff`` invocation (revisions and pathspecs); directories
+    are truncated to *depth* components. Binary files count as changed files
+    with zero lines.
+    """
+    entries = _parse_numstat_z(_git_session().run("diff", "--numstat", "-z", *diff_args[1:]))
+
+    def bucket(groups: dict[str, dict], name: str, entry: dict) -> None:
+        row = groups.setdefault(name, {"name": name, "files": 0, "insertions": 0, "deletions": 0})
+        row["files"] += 1
+        row["insertions"] += entry["insertions"] or 0
+        row["deletions"] += entry["deletions"] or 0
+
+    directories: dict[str, dict] = {}
+    subsystems: dict[str, dict] = {}
+    for entry in entries:
+        parts = entry["path"].split("/")[:-1]
+        bucket(directories, "/".join(parts[:depth]) or ".", entry)
+        bucket(subsystems, _subsystem_for(entry["path"], key_files), entry)
+
+    def ranked(groups: dict[str, dict]) -> list[dict]:
+        return sorted(groups.values(), key=lambda r: (-(r["insertions"] + r["deletions"]), r["name"]))
+
+    return {
+        "totals": {
+            "files": len(entries),
+            "insertions": sum(e["insertions"] or 0 for e in entries),
+            "deletions": sum(e["deletions"] or 0 for e in entries),
+            "binary": sum(1 for e in entries if e["binary"]),
+        },
+        "directories": ranked(directories),
+        "subsystems": ranked(subsystems),
+    }
+
+
+def format_change_stats(stats: dict[str, Any]) -> list[str]:
+    """Compact fixed-width table lines for compute_change_stats output."""
+    totals = stats["totals"]
+    lines = [f"Files: {totals['files']} (+{totals['insertions']} -{totals['deletions']}, {totals['binary']} binary)"]
+    for title, key in (("Subsystem", "subsystems"), ("Directory", "directories")):
+        rows = stats[key]
+        if not rows:
+            continue
+        width = max(len(title), *(len(r["name"]) for r in rows))
+        lines.append("")
+        lines.append(f"{title:<{width}}  {'files':>5}  {'+':>7}  {'-':>7}")
+        for r in rows:
+            lines.append(f"{r['name']:<{width}}  {r['files']:>5}  {r['insertions']:>7}  {r['deletions']:>7}")
+    return lines
+
+
+def _phase_base_commit(phase_commits: list[str]) -> str:
+    """Parent of the earliest phase commit, or the root commit when it has none."""
+    git = _git_session()
+    base = git.resolve(f"{phase_commits[-1]}^")
+    if base is None:
+        base = git.run("rev-list", "--max-parents=0", "HEAD")
+    return base
 
 
 # -------------------------------------------------------------------
@@ -360,18 +1548,181 @@ def build_exclude_pathspecs() -> list[str]:
 # -------------------------------------------------------------------
 
 
-def find_phase_commit_hashes(phase_input: str, suffix: str = "") -> list[str]:
-    """Find commit hashes matching a phase's commit convention.
+_PHASE_REF_RE = re.compile(r"\((\d+(?:\.\d+)?)-")
+_PHASE_SUFFIX_RE = re.compile(r"\((\d+(?:\.\d+)?)-([^)]*)\):")
+_COMMIT_INDEX_FILE = "phase-commits.json"
+_COMMIT_INDEX_VERSION = 2
 
-    Contract:
-        Args: phase_input (str), suffix (str, optional)
-        Output: list of commit hash strings (newest first)
-        Side effects: none (reads git log only)
+
+def _raw_phase(phase: str) -> str:
+    """Strip leading zeros from the integer part, preserving decimals: "02.1" -> "2.1"."""
+    m = re.match(r"^(\d+)(.*)", phase)
+    return str(int(m.group(1))) + m.group(2) if m else phase
+
+
+def _short_hashes(oids: list[str]) -> dict[str, str]:
+    """Full commit id -> abbreviation as ``git log --oneline`` prints it today.
+
+    Indexes store full ids, since a prefix unique when it was indexed can
+    become ambiguous as the repository grows. Ids go over stdin, so any
+    number of them costs one ``git log`` call.
     """
-    padded_phase = normalize_phase(phase_input)
-    # Strip leading zeros from integer part, preserve decimal: "02.1" -> "2.1"
-    m = re.match(r"^(\d+)(.*)", padded_phase)
-    raw_phase = str(int(m.group(1))) + m.group(2) if m else padded_phase
+    unique = list(dict.fromkeys(oids))
+    if not unique:
+        return {}
+    result = subprocess.run(
+        ["git", "log", "--no-walk=unsorted", "--stdin", "--format=%h"],
+        input="\n".join(unique) + "\n", capture_output=True, text=True, check=True,
+    )
+    return dict(zip(unique, result.stdout.split()))
+
+
+def _commit_index_keys(subject: str) -> list[str]:
+    """Index keys for a commit subject: "<raw phase>" and "<raw phase>:<suffix>"."""
+    keys = {_raw_phase(m.group(1)) for m in _PHASE_REF_RE.finditer(subject)}
+    keys.update(f"{_raw_phase(m.group(1))}:{m.group(2)}" for m in _PHASE_SUFFIX_RE.finditer(subject))
+    return sorted(keys)
+
+
+def _index_git_log(*rev_args: str) -> list[list[Any]]:
+    """[full hash, keys] for phase-convention commits in ``git log <rev_args>``."""
+    log_output = run_git("log", "--format=%H%x00%s", *rev_args)
+    entries: list[list[Any]] = []
+    for line in log_output.splitlines():
+        parts = line.split("\0", 1)
+        if len(parts) != 2:
+            continue
+        keys = _commit_index_keys(parts[1])
+        if keys:
+            entries.append([parts[0], keys])
+    return entries
+
+
+def _phase_commit_index(cache_dir: Path) -> list[list[Any]]:
+    """Load the phase commit index, extending it from the last indexed tip to HEAD.
+
+    The index is rebuilt from scratch when the stored tip is no longer an
+    ancestor of HEAD (rebase, amend, reset) or the cache is unreadable.
+    Raises CalledProcessError if HEAD can't be resolved.
+    """
+    head = _git_session().resolve("HEAD")
+    if head is None:
+        raise subprocess.CalledProcessError(128, ["git", "cat-file", "--batch-check"])
+    index_path = cache_dir / _COMMIT_INDEX_FILE
+    data = _read_json_cache(index_path)
+    if not isinstance(data, dict) or data.get("version") != _COMMIT_INDEX_VERSION:
+        data = None
+
+    if data is not None and data.get("tip") == head:
+        return data["commits"]
+
+    commits: list[list[Any]] | None = None
+    if data is not None and data.get("tip"):
+        try:
+            run_git("merge-base", "--is-ancestor", data["tip"], head)
+            commits = _index_git_log(f"{data['tip']}..{head}") + data["commits"]
+        except subprocess.CalledProcessError:
+            commits = None
+    if commits is None:
+        commits = _index_git_log(head)
+
+    _write_json_cache(index_path, {"version": _COMMIT_INDEX_VERSION, "tip": head, "commits": commits})
+    return commits
+
+
+_PATH_INDEX_FILE = "phase-paths.json"
+_PATH_INDEX_VERSION = 2
+
+
+def _index_path_log(*rev_args: str) -> dict[str, list[list[str]]]:
+    """path -> [[phase, plan, full hash, date], ...] (newest first) from one ``git log --name-only -z``.
+
+    Only commits whose subject follows the ``type(<phase>-<plan>):`` convention
+    are recorded; the plan is whatever follows the phase ("02", "uat", ...).
+    """
+    out = run_git("log", "-z", "--name-only", "--format=%x01%H%x00%as%x00%s", *rev_args)
+    paths: dict[str, list[list[str]]] = {}
+    for record in out.split("\x01"):
+        fields = record.split("\0")
+        if len(fields) < 3:
+            continue
+        m = _PHASE_SUFFIX_RE.search(fields[2])
+        if not m:
+            continue
+        entry = [normalize_phase(m.group(1)), m.group(2), fields[0], fields[1]]
+        for path in fields[3:]:
+            path = path.lstrip("\n")
+            if path:
+                paths.setdefault(path, []).append(entry)
+    return paths
+
+
+def _phase_path_index(cache_dir: Path | None) -> dict[str, list[list[str]]]:
+    """Load the path -> phase commit index, extending it from the last indexed tip to HEAD.
+
+    Same invalidation rules as _phase_commit_index: a tip that is no longer an
+    ancestor of HEAD forces a full rebuild. Without a cache dir the index is
+    built from scratch. Raises CalledProcessError if HEAD can't be resolved.
+    """
+    head = _git_session().resolve("HEAD")
+    if head is None:
+        raise subprocess.CalledProcessError(128, ["git", "cat-file", "--batch-check"])
+    index_path = cache_dir / _PATH_INDEX_FILE if cache_dir else None
+    data = _read_json_cache(index_path) if index_path else None
+    if not isinstance(data, dict) or data.get("version") != _PATH_INDEX_VERSION:
+        data = None
+
+    if data is not None and data.get("tip") == head:
+        return data["paths"]
+
+    paths: dict[str, list[list[str]]] | None = None
+    if data is not None and data.get("tip"):
+        try:
+            run_git("merge-base", "--is-ancestor", data["tip"], head)
+        except subprocess.CalledProcessError:
+            paths = None
+        else:
+            paths = data["paths"]
+            for path, entries in _index_path_log(f"{data['tip']}..{head}").items():
+                paths[path] = entries + paths.get(path, [])
+    if paths is None:
+        paths = _index_path_log(head)
+
+    if index_path:
+        _write_json_cache(index_path, {"version": _PATH_INDEX_VERSION, "tip": head, "paths": paths})
+    return paths
+
+
+_BOUNDARY_FILE = "boundary.json"
+
+
+def _milestone_boundary(git_root: Path) -> str | None:
+    """Most recently recorded milestone boundary commit that is still an ancestor of HEAD.
+
+    Boundaries are written by archive-milestone-phases to
+    .planning/milestones/<slug>/boundary.json. Commits for the current
+    milestone can only appear after the latest one.
+    """
+    milestones_dir = git_root / ".planning" / "milestones"
+    if not milestones_dir.is_dir():
+        return None
+    recorded: list[tuple[str, str]] = []
+    for path in milestones_dir.glob(f"*/{_BOUNDARY_FILE}"):
+        data = _read_json_cache(path)
+        if isinstance(data, dict) and data.get("commit"):
+            recorded.append((str(data.get("recorded", "")), str(data["commit"])))
+    for _, commit in sorted(recorded, reverse=True):
+        try:
+            run_git("merge-base", "--is-ancestor", commit, "HEAD")
+        except subprocess.CalledProcessError:
+            continue
+        return commit
+    return None
+
+
+def _phase_commit_pattern(padded_phase: str, suffix: str = "") -> str:
+    """Regex matching a phase's commit convention in ``git log --oneline`` lines."""
+    raw_phase = _raw_phase(padded_phase)
 
     # Build alternation pattern matching both padded and raw forms
     if padded_phase == raw_phase:
@@ -382,23 +1733,61 @@ def find_phase_commit_hashes(phase_input: str, suffix: str = "") -> list[str]:
     # Build commit pattern based on suffix
     if suffix:
         if suffix == "uat-fixes":
-            commit_pattern = f"\\({phase_alt}-uat\\):"
-        else:
-            commit_pattern = f"\\({phase_alt}-{re.escape(suffix)}\\):"
-    else:
-        commit_pattern = f"\\({phase_alt}-"
+            return f"\\({phase_alt}-uat\\):"
+        return f"\\({phase_alt}-{re.escape(suffix)}\\):"
+    return f"\\({phase_alt}-"
 
-    # Find matching commits
-    try:
-        log_output = run_git("log", "--oneline")
-    except subprocess.CalledProcessError:
-        raise
 
-    hashes = []
+def find_phase_commit_sets(
+    phase_inputs: list[str], suffix: str = "", since: str | None = None
+) -> dict[str, list[str]]:
+    """Commit hashes for several phases from a single history pass.
+
+    Same matching as find_phase_commit_hashes, keyed by padded phase. The
+    index (or one ``git log --oneline``) is read once for all phases.
+    """
+    padded_phases = list(dict.fromkeys(normalize_phase(p) for p in phase_inputs))
+    sets: dict[str, list[str]] = {p: [] for p in padded_phases}
+
+    cache_dir = _tool_cache_dir(Path.cwd())
+    if cache_dir is not None:
+        index_suffix = "uat" if suffix == "uat-fixes" else suffix
+        wanted: dict[str, list[str]] = {}
+        for padded in padded_phases:
+            raw = _raw_phase(padded)
+            wanted.setdefault(f"{raw}:{index_suffix}" if suffix else raw, []).append(padded)
+        in_range_commits = set(run_git("rev-list", f"{since}..HEAD").splitlines()) if since else None
+        for full, keys in _phase_commit_index(cache_dir):
+            if in_range_commits is not None and full not in in_range_commits:
+                continue
+            for key in keys:
+                for padded in wanted.get(key, ()):
+                    sets[padded].append(full)
+        short = _short_hashes([oid for oids in sets.values() for oid in oids])
+        return {padded: [short[oid] for oid in oids] for padded, oids in sets.items()}
+
+    patterns = {padded: re.compile(_phase_commit_pattern(padded, suffix)) for padded in padded_phases}
+    log_output = run_git("log", "--oneline", *([f"{since}..HEAD"] if since else []))
     for line in log_output.splitlines():
-        if re.search(commit_pattern, line):
-            hashes.append(line.split()[0])
-    return hashes
+        for padded, pattern in patterns.items():
+            if pattern.search(line):
+                sets[padded].append(line.split()[0])
+    return sets
+
+
+def find_phase_commit_hashes(phase_input: str, suffix: str = "", since: str | None = None) -> list[str]:
+    """Find commit hashes matching a phase's commit convention.
+
+    Uses the persistent index under <git-dir>/ms-tools when available (see
+    _phase_commit_index); otherwise scans ``git log --oneline`` directly.
+    With *since* (a milestone boundary), only commits in ``since..HEAD`` count.
+
+    Contract:
+        Args: phase_input (str), suffix (str, optional), since (str, optional)
+        Output: list of commit hash strings (newest first)
+        Side effects: updates <git-dir>/ms-tools/phase-commits.json (reads git log only)
+    """
+    return find_phase_commit_sets([phase_input], suffix, since)[normalize_phase(phase_input)]
 
 
 # -------------------------------------------------------------------
@@ -410,8 +1799,9 @@ def cmd_find_phase_commits(args: argparse.Namespace) -> None:
     """Print commit hashes matching a phase's commit convention.
 
     Contract:
-        Args: phase (str), --suffix (str, optional)
+        Args: phase (str), --suffix (str, optional), --all-history (flag)
         Output: text — one commit hash per line (newest first), empty if no matches
+                Searches commits after the latest milestone boundary unless --all-history
         Exit codes: 0 = success (including zero matches), 1 = git error
         Side effects: none
     """
@@ -420,7 +1810,8 @@ def cmd_find_phase_commits(args: argparse.Namespace) -> None:
     os.chdir(git_root)
 
     try:
-        hashes = find_phase_commit_hashes(args.phase, args.suffix)
+        since = None if args.all_history else _milestone_boundary(Path(git_root))
+        hashes = find_phase_commit_hashes(args.phase, args.suffix, since)
     except subprocess.CalledProcessError:
         print("Error: Failed to read git log", file=sys.stderr)
         sys.exit(1)
@@ -429,6 +1820,92 @@ def cmd_find_phase_commits(args: argparse.Namespace) -> None:
         print(h)
 
 
+# -------------------------------------------------------------------
+# Subcommand: phase-of
+# -------------------------------------------------------------------
+
+
+def _phase_of_entries(index: dict[str, list[list[str]]], path: str) -> list[list[str]]:
+    """Index entries for a file, or for every file under a directory (newest first)."""
+    if path in index:
+        return index[path]
+    prefix = "" if path in ("", ".") else path.rstrip("/") + "/"
+    seen: set[str] = set()
+    entries: list[list[str]] = []
+    for key, rows in index.items():
+        if key.startswith(prefix):
+            for row in rows:
+                if row[2] not in seen:
+                    seen.add(row[2])
+                    entries.append(row)
+    return sorted(entries, key=lambda row: row[3], reverse=True)
+
+
+def cmd_phase_of(args: argparse.Namespace) -> None:
+    """Report which phase and plan introduced and last touched each path.
+
+    Attribution comes from commits following the ``type(<phase>-<plan>):``
+    convention. The path index is cached in <git-dir>/ms-tools and extended
+    from the last indexed commit, so repeated lookups don't re-read history.
+    A directory argument covers every file beneath it.
+
+    Contract:
+        Args: paths (str, one or more), --all (flag), --json (flag)
+        Output: text — per path, the introducing and last-touching phase/plan commits
+                (--all lists every phase commit); --json emits {path: [{phase, plan, commit, date}]}
+        Exit codes: 0 = success (including paths with no phase commits), 1 = git error
+        Side effects: writes <git-dir>/ms-tools/phase-paths.json
+    """
+    git_root = find_git_root()
+    cwd = Path.cwd()
+    os.chdir(git_root)
+
+    try:
+        index = _phase_path_index(_tool_cache_dir(Path(git_root)))
+    except subprocess.CalledProcessError:
+        print("Error: Failed to read git log", file=sys.stderr)
+        sys.exit(1)
+
+    matches: dict[str, list[list[str]]] = {}
+    for raw in args.paths:
+        target = (cwd / raw).resolve()
+        try:
+            path = target.relative_to(Path(git_root).resolve()).as_posix()
+        except ValueError:
+            path = raw.removeprefix("./")
+        matches[raw] = _phase_of_entries(index, path)
+    try:
+        short = _short_hashes([row[2] for rows in matches.values() for row in rows])
+    except subprocess.CalledProcessError:
+        print("Error: Failed to read git log", file=sys.stderr)
+        sys.exit(1)
+    results: dict[str, list[dict[str, str]]] = {
+        raw: [
+            {"phase": phase, "plan": plan, "commit": short[commit], "date": date}
+            for phase, plan, commit, date in rows
+        ]
+        for raw, rows in matches.items()
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, cls=_SafeEncoder)
+        print()
+        return
+
+    for raw, entries in results.items():
+        if not entries:
+            print(f"{raw}: no phase commits")
+            continue
+        if args.all:
+            print(f"{raw}:")
+            for e in entries:
+                print(f"  {e['phase']}-{e['plan']}  {e['commit']}  {e['date']}")
+            continue
+        first, last = entries[-1], entries[0]
+        print(f"{raw}: introduced {first['phase']}-{first['plan']} ({first['commit']}, {first['date']}), "
+              f"last touched {last['phase']}-{last['plan']} ({last['commit']}, {last['date']})")
+
+
 # ===================================================================
 # Subcommand: update-state
 # ===================================================================
@@ -891,9 +2368,12 @@ def cmd_detect_web(args: argparse.Namespace) -> None:
 def cmd_doctor_scan(args: argparse.Namespace) -> None:
     """Single-pass diagnostic scan of the .planning/ tree.
 
+    Each check is an independent function that writes its lines to a buffer;
+    checks run on a thread pool and sections print in the fixed check order.
+
     Contract:
         Args: (none)
-        Output: text — per-check PASS/FAIL/SKIP status and summary
+        Output: text — per-check PASS/FAIL/SKIP status in fixed order, summary, per-check wall times
         Exit codes: 0 = scan completed, 2 = missing .planning/ or config.json
         Side effects: read-only
     """
@@ -950,401 +2430,389 @@ def cmd_doctor_scan(args: argparse.Namespace) -> None:
     subsystem_count = len(subsystems)
 
     # ---- CHECK 1: Subsystem Vocabulary ----
-    print("=== Subsystem Vocabulary ===")
-    if subsystem_count == 0:
-        print("Status: FAIL")
-        print("No subsystems array in config.json (or empty)")
-        record("FAIL", "Subsystem Vocabulary")
-    else:
-        print(f"Subsystems: {subsystem_count} configured")
-        for s in subsystems:
-            print(f"  - {s}")
-
-        # Run artifact scan inline
-        artifact_values = _scan_artifact_subsystem_values(planning)
-        mismatches = [v for v in artifact_values if v not in subsystems]
-
-        if mismatches:
-            print("Status: FAIL")
-            print(f"Artifact values not in canonical list: {' '.join(mismatches)}")
-            record("FAIL", "Subsystem Vocabulary")
+    def check_subsystem_vocabulary(out: Callable[[str], None]) -> str:
+        if subsystem_count == 0:
+            out("Status: FAIL")
+            out("No subsystems array in config.json (or empty)")
+            return "FAIL"
         else:
-            print(f"Artifacts scanned: {len(artifact_values)} (all OK)")
-            print("Status: PASS")
-            record("PASS", "Subsystem Vocabulary")
-    print()
+            out(f"Subsystems: {subsystem_count} configured")
+            for s in subsystems:
+                out(f"  - {s}")
+
+            # Run artifact scan inline
+            artifact_values = _scan_artifact_subsystem_values(planning)
+            mismatches = [v for v in artifact_values if v not in subsystems]
+
+            if mismatches:
+                out("Status: FAIL")
+                out(f"Artifact values not in canonical list: {' '.join(mismatches)}")
+                return "FAIL"
+            else:
+                out(f"Artifacts scanned: {len(artifact_values)} (all OK)")
+                out("Status: PASS")
+                return "PASS"
 
     # ---- CHECK 2: Milestone Directory Structure ----
-    print("=== Milestone Directory Structure ===")
-    if not milestones_dir.is_dir():
-        if milestones_file.is_file() and any(
-            line.startswith("## ")
-            for line in milestones_file.read_text(encoding="utf-8").splitlines()
-        ):
-            print("Status: FAIL")
-            print("MILESTONES.md has entries but no milestones/ directory")
-            record("FAIL", "Milestone Directory Structure")
-        else:
-            print("Status: SKIP")
-            print("No completed milestones")
-            record("SKIP", "Milestone Directory Structure")
-    else:
-        flat_files = sorted(milestones_dir.glob("v*-*.md"))
-        if flat_files:
-            print("Status: FAIL")
-            print(f"Found {len(flat_files)} flat file(s) in milestones/ (old format):")
-            for f in flat_files:
-                version = re.match(r"(v[\d.]+)", f.name)
-                ver = version.group(1) if version else "?"
-                ver_dir = milestones_dir / ver
-                if ver_dir.is_dir():
-                    print(f"  {f.name} → directory {ver}/ exists (can restructure)")
-                else:
-                    print(f"  {f.name} → directory {ver}/ missing (need to create)")
-            record("FAIL", "Milestone Directory Structure")
+    def check_milestone_directory_structure(out: Callable[[str], None]) -> str:
+        if not milestones_dir.is_dir():
+            if milestones_file.is_file() and any(
+                line.startswith("## ")
+                for line in milestones_file.read_text(encoding="utf-8").splitlines()
+            ):
+                out("Status: FAIL")
+                out("MILESTONES.md has entries but no milestones/ directory")
+                return "FAIL"
+            else:
+                out("Status: SKIP")
+                out("No completed milestones")
+                return "SKIP"
         else:
-            ms_dirs = [d for d in milestones_dir.iterdir() if d.is_dir()]
-            if not ms_dirs:
-                print("Status: SKIP")
-                print("No completed milestones")
-                record("SKIP", "Milestone Directory Structure")
+            flat_files = sorted(milestones_dir.glob("v*-*.md"))
+            if flat_files:
+                out("Status: FAIL")
+                out(f"Found {len(flat_files)} flat file(s) in milestones/ (old format):")
+                for f in flat_files:
+                    version = re.match(r"(v[\d.]+)", f.name)
+                    ver = version.group(1) if version else "?"
+                    ver_dir = milestones_dir / ver
+                    if ver_dir.is_dir():
+                        out(f"  {f.name} → directory {ver}/ exists (can restructure)")
+                    else:
+                        out(f"  {f.name} → directory {ver}/ missing (need to create)")
+                return "FAIL"
             else:
-                print("Status: PASS")
-                print(f"{len(ms_dirs)} milestone directories")
-                record("PASS", "Milestone Directory Structure")
-    print()
+                ms_dirs = [d for d in milestones_dir.iterdir() if d.is_dir()]
+                if not ms_dirs:
+                    out("Status: SKIP")
+                    out("No completed milestones")
+                    return "SKIP"
+                else:
+                    out("Status: PASS")
+                    out(f"{len(ms_dirs)} milestone directories")
+                    return "PASS"
 
     # ---- CHECK 3: Phase Archival ----
-    print("=== Phase Archival ===")
-    if not milestones_file.is_file():
-        print("Status: SKIP")
-        print("No completed milestones with phase ranges in MILESTONES.md")
-        record("SKIP", "Phase Archival")
-    else:
-        ms_text = milestones_file.read_text(encoding="utf-8")
-        phase_lines = [l for l in ms_text.splitlines() if "Phases completed" in l]
-        if not phase_lines:
-            print("Status: SKIP")
-            print("No completed milestones with phase ranges in MILESTONES.md")
-            record("SKIP", "Phase Archival")
+    def check_phase_archival(out: Callable[[str], None]) -> str:
+        if not milestones_file.is_file():
+            out("Status: SKIP")
+            out("No completed milestones with phase ranges in MILESTONES.md")
+            return "SKIP"
         else:
-            orphans: list[str] = []
-            for line in phase_lines:
-                for phase_num in parse_phase_numbers(line):
-                    prefix = normalize_phase(phase_num)
-                    if phases_dir.is_dir():
-                        for d in phases_dir.glob(f"{prefix}-*/"):
-                            if d.is_dir():
-                                orphans.append(f"  {d.name} (should be archived)")
-            if orphans:
-                print("Status: FAIL")
-                print(f"Found {len(orphans)} orphaned phase directories from completed milestones:")
-                for o in orphans:
-                    print(o)
-                record("FAIL", "Phase Archival")
+            ms_text = milestones_file.read_text(encoding="utf-8")
+            phase_lines = [l for l in ms_text.splitlines() if "Phases completed" in l]
+            if not phase_lines:
+                out("Status: SKIP")
+                out("No completed milestones with phase ranges in MILESTONES.md")
+                return "SKIP"
             else:
-                print("Status: PASS")
-                print("All completed milestone phases are archived")
-                record("PASS", "Phase Archival")
-    print()
+                orphans: list[str] = []
+                for line in phase_lines:
+                    for phase_num in parse_phase_numbers(line):
+                        prefix = normalize_phase(phase_num)
+                        if phases_dir.is_dir():
+                            for d in phases_dir.glob(f"{prefix}-*/"):
+                                if d.is_dir():
+                                    orphans.append(f"  {d.name} (should be archived)")
+                if orphans:
+                    out("Status: FAIL")
+                    out(f"Found {len(orphans)} orphaned phase directories from completed milestones:")
+                    for o in orphans:
+                        out(o)
+                    return "FAIL"
+                else:
+                    out("Status: PASS")
+                    out("All completed milestone phases are archived")
+                    return "PASS"
 
     # ---- CHECK 4: Knowledge Files ----
-    print("=== Knowledge Files ===")
-    if subsystem_count == 0:
-        print("Status: SKIP")
-        print("No subsystems configured — knowledge check requires subsystem vocabulary")
-        record("SKIP", "Knowledge Files")
-    elif not knowledge_dir.is_dir():
-        print("Status: FAIL")
-        print("Knowledge directory missing: .planning/knowledge/")
-        print(f"Expected files for {subsystem_count} subsystems")
-        record("FAIL", "Knowledge Files")
-    else:
-        missing = [s for s in subsystems if not (knowledge_dir / f"{s}.md").is_file()]
-        orphaned = [
-            f.stem
-            for f in knowledge_dir.glob("*.md")
-            if f.stem not in subsystems
-        ]
-        if missing or orphaned:
-            present = subsystem_count - len(missing)
-            print("Status: FAIL")
-            print(f"Coverage: {present}/{subsystem_count} subsystems have knowledge files")
-            if missing:
-                print("Missing:")
-                for m in missing:
-                    print(f"  {m}.md")
-            if orphaned:
-                print("Orphaned:")
-                for o in orphaned:
-                    print(f"  {o}.md (not in subsystems list)")
-            record("FAIL", "Knowledge Files")
+    def check_knowledge_files(out: Callable[[str], None]) -> str:
+        if subsystem_count == 0:
+            out("Status: SKIP")
+            out("No subsystems configured — knowledge check requires subsystem vocabulary")
+            return "SKIP"
+        elif not knowledge_dir.is_dir():
+            out("Status: FAIL")
+            out("Knowledge directory missing: .planning/knowledge/")
+            out(f"Expected files for {subsystem_count} subsystems")
+            return "FAIL"
         else:
-            print("Status: PASS")
-            print(f"All {subsystem_count} subsystems have knowledge files")
-            record("PASS", "Knowledge Files")
-    print()
+            missing = [s for s in subsystems if not (knowledge_dir / f"{s}.md").is_file()]
+            orphaned = [
+                f.stem
+                for f in knowledge_dir.glob("*.md")
+                if f.stem not in subsystems
+            ]
+            if missing or orphaned:
+                present = subsystem_count - len(missing)
+                out("Status: FAIL")
+                out(f"Coverage: {present}/{subsystem_count} subsystems have knowledge files")
+                if missing:
+                    out("Missing:")
+                    for m in missing:
+                        out(f"  {m}.md")
+                if orphaned:
+                    out("Orphaned:")
+                    for o in orphaned:
+                        out(f"  {o}.md (not in subsystems list)")
+                return "FAIL"
+            else:
+                out("Status: PASS")
+                out(f"All {subsystem_count} subsystems have knowledge files")
+                return "PASS"
 
     # ---- CHECK 5: Phase Summaries ----
-    print("=== Phase Summaries ===")
-    if not milestones_dir.is_dir():
-        print("Status: SKIP")
-        print("No milestones directory")
-        record("SKIP", "Phase Summaries")
-    else:
-        ms_dirs = sorted(d for d in milestones_dir.iterdir() if d.is_dir())
-        if not ms_dirs:
-            print("Status: SKIP")
-            print("No milestone directories")
-            record("SKIP", "Phase Summaries")
+    def check_phase_summaries(out: Callable[[str], None]) -> str:
+        if not milestones_dir.is_dir():
+            out("Status: SKIP")
+            out("No milestones directory")
+            return "SKIP"
         else:
-            missing_summaries = [
-                d.name for d in ms_dirs if not (d / "PHASE-SUMMARIES.md").is_file()
-            ]
-            if missing_summaries:
-                print("Status: FAIL")
-                print(f"Missing PHASE-SUMMARIES.md in {len(missing_summaries)} milestone(s):")
-                for m in missing_summaries:
-                    print(f"  {m}/PHASE-SUMMARIES.md")
-                record("FAIL", "Phase Summaries")
+            ms_dirs = sorted(d for d in milestones_dir.iterdir() if d.is_dir())
+            if not ms_dirs:
+                out("Status: SKIP")
+                out("No milestone directories")
+                return "SKIP"
             else:
-                print("Status: PASS")
-                print(f"All {len(ms_dirs)} milestones have PHASE-SUMMARIES.md")
-                record("PASS", "Phase Summaries")
-    print()
+                missing_summaries = [
+                    d.name for d in ms_dirs if not (d / "PHASE-SUMMARIES.md").is_file()
+                ]
+                if missing_summaries:
+                    out("Status: FAIL")
+                    out(f"Missing PHASE-SUMMARIES.md in {len(missing_summaries)} milestone(s):")
+                    for m in missing_summaries:
+                        out(f"  {m}/PHASE-SUMMARIES.md")
+                    return "FAIL"
+                else:
+                    out("Status: PASS")
+                    out(f"All {len(ms_dirs)} milestones have PHASE-SUMMARIES.md")
+                    return "PASS"
 
     # ---- CHECK 6: PLAN Cleanup ----
-    print("=== PLAN Cleanup ===")
-    if not milestones_file.is_file():
-        print("Status: SKIP")
-        print("No completed milestones — active phase PLANs are expected")
-        record("SKIP", "PLAN Cleanup")
-    else:
-        ms_text = milestones_file.read_text(encoding="utf-8")
-        phase_lines = [l for l in ms_text.splitlines() if "Phases completed" in l]
-        if not phase_lines:
-            print("Status: SKIP")
-            print("No completed milestones — active phase PLANs are expected")
-            record("SKIP", "PLAN Cleanup")
+    def check_plan_cleanup(out: Callable[[str], None]) -> str:
+        if not milestones_file.is_file():
+            out("Status: SKIP")
+            out("No completed milestones — active phase PLANs are expected")
+            return "SKIP"
         else:
-            leftovers: list[str] = []
-            for line in phase_lines:
-                for phase_num in parse_phase_numbers(line):
-                    prefix = normalize_phase(phase_num)
-                    if phases_dir.is_dir():
-                        for d in phases_dir.glob(f"{prefix}-*/"):
-                            if d.is_dir():
-                                for plan in d.glob("*-PLAN.md"):
-                                    rel = plan.relative_to(planning)
-                                    leftovers.append(f"  {rel}")
-
-            # Check archived milestone directories too
-            if milestones_dir.is_dir():
-                for ver_dir in milestones_dir.iterdir():
-                    if not ver_dir.is_dir():
-                        continue
-                    archived_phases = ver_dir / "phases"
-                    if archived_phases.is_dir():
-                        for phase_d in archived_phases.iterdir():
-                            if phase_d.is_dir():
-                                for plan in phase_d.glob("*-PLAN.md"):
-                                    rel = plan.relative_to(planning)
-                                    leftovers.append(f"  {rel}")
-
-            if leftovers:
-                print("Status: FAIL")
-                print(f"Found {len(leftovers)} leftover PLAN file(s) in completed phases:")
-                for l in leftovers:
-                    print(l)
-                record("FAIL", "PLAN Cleanup")
+            ms_text = milestones_file.read_text(encoding="utf-8")
+            phase_lines = [l for l in ms_text.splitlines() if "Phases completed" in l]
+            if not phase_lines:
+                out("Status: SKIP")
+                out("No completed milestones — active phase PLANs are expected")
+                return "SKIP"
             else:
-                print("Status: PASS")
-                print("No leftover PLAN files in completed phases")
-                record("PASS", "PLAN Cleanup")
-    print()
+                leftovers: list[str] = []
+                for line in phase_lines:
+                    for phase_num in parse_phase_numbers(line):
+                        prefix = normalize_phase(phase_num)
+                        if phases_dir.is_dir():
+                            for d in phases_dir.glob(f"{prefix}-*/"):
+                                if d.is_dir():
+                                    for plan in d.glob("*-PLAN.md"):
+                                        rel = plan.relative_to(planning)
+                                        leftovers.append(f"  {rel}")
+
+                # Check archived milestone directories too
+                if milestones_dir.is_dir():
+                    for ver_dir in milestones_dir.iterdir():
+                        if not ver_dir.is_dir():
+                            continue
+                        archived_phases = ver_dir / "phases"
+                        if archived_phases.is_dir():
+                            for phase_d in archived_phases.iterdir():
+                                if phase_d.is_dir():
+                                    for plan in phase_d.glob("*-PLAN.md"):
+                                        rel = plan.relative_to(planning)
+                                        leftovers.append(f"  {rel}")
+
+                if leftovers:
+                    out("Status: FAIL")
+                    out(f"Found {len(leftovers)} leftover PLAN file(s) in completed phases:")
+                    for l in leftovers:
+                        out(l)
+                    return "FAIL"
+                else:
+                    out("Status: PASS")
+                    out("No leftover PLAN files in completed phases")
+                    return "PASS"
 
     # ---- CHECK 7: CLI Wrappers & Environment ----
-    print("=== CLI Wrappers ===")
-    wrapper_names = ["ms-tools", "ms-lookup", "ms-compare-mockups"]
-
-    # 7a: Check bin directory exists
-    global_bin = Path.home() / ".claude" / "bin"
-    local_bin = Path(".claude") / "bin"
-    bin_dir = global_bin if global_bin.is_dir() else (local_bin if local_bin.is_dir() else None)
-
-    if bin_dir is None:
-        print("Status: FAIL")
-        print("Bin directory not found (~/.claude/bin/ or .claude/bin/)")
-        print("Fix: re-run `npx mindsystem-cc` to generate wrappers")
-        record("FAIL", "CLI Wrappers")
-    else:
-        # 7b: Check wrapper files present
-        missing_files = [w for w in wrapper_names if not (bin_dir / w).exists()]
-        if missing_files:
-            print("Status: FAIL")
-            print(f"Wrapper files missing from {bin_dir}: {', '.join(missing_files)}")
-            print("Fix: re-run `npx mindsystem-cc` to regenerate wrappers")
-            record("FAIL", "CLI Wrappers")
+    def check_cli_wrappers(out: Callable[[str], None]) -> str:
+        wrapper_names = ["ms-tools", "ms-lookup", "ms-compare-mockups"]
+
+        # 7a: Check bin directory exists
+        global_bin = Path.home() / ".claude" / "bin"
+        local_bin = Path(".claude") / "bin"
+        bin_dir = global_bin if global_bin.is_dir() else (local_bin if local_bin.is_dir() else None)
+
+        if bin_dir is None:
+            out("Status: FAIL")
+            out("Bin directory not found (~/.claude/bin/ or .claude/bin/)")
+            out("Fix: re-run `npx mindsystem-cc` to generate wrappers")
+            return "FAIL"
         else:
-            # 7c: Check bin dir in PATH
-            path_dirs = os.environ.get("PATH", "").split(os.pathsep)
-            bin_in_path = str(bin_dir.resolve()) in [os.path.realpath(p) for p in path_dirs]
-
-            # 7d: Check wrappers resolvable
-            missing_wrappers = [w for w in wrapper_names if shutil.which(w) is None]
-
-            if missing_wrappers:
-                print("Status: FAIL")
-                print(f"Not resolvable: {', '.join(missing_wrappers)}")
-                if not bin_in_path:
-                    print(f"Cause: {bin_dir} not in PATH")
-                    print("Fix: restart Claude Code session (PATH hook fires on SessionStart)")
-                else:
-                    print("Fix: re-run `npx mindsystem-cc` to regenerate wrappers and PATH hook")
-                record("FAIL", "CLI Wrappers")
+            # 7b: Check wrapper files present
+            missing_files = [w for w in wrapper_names if not (bin_dir / w).exists()]
+            if missing_files:
+                out("Status: FAIL")
+                out(f"Wrapper files missing from {bin_dir}: {', '.join(missing_files)}")
+                out("Fix: re-run `npx mindsystem-cc` to regenerate wrappers")
+                return "FAIL"
             else:
-                print(f"All {len(wrapper_names)} CLI wrappers found on PATH")
-
-                # 7e: Check uv available
-                uv_ok = shutil.which("uv") is not None
-                # 7f: Check Python available
-                py_ok = shutil.which("python3") is not None or shutil.which("python") is not None
-
-                issues = []
-                if not uv_ok:
-                    issues.append("uv not found — install: `curl -LsSf https://astral.sh/uv/install.sh | sh`")
-                if not py_ok:
-                    issues.append("Python not found — install Python 3.10+")
-
-                if issues:
-                    print("Status: WARN")
-                    for issue in issues:
-                        print(f"  {issue}")
-                    record("WARN", "CLI Wrappers")
+                # 7c: Check bin dir in PATH
+                path_dirs = os.environ.get("PATH", "").split(os.pathsep)
+                bin_in_path = str(bin_dir.resolve()) in [os.path.realpath(p) for p in path_dirs]
+
+                # 7d: Check wrappers resolvable
+                missing_wrappers = [w for w in wrapper_names if shutil.which(w) is None]
+
+                if missing_wrappers:
+                    out("Status: FAIL")
+                    out(f"Not resolvable: {', '.join(missing_wrappers)}")
+                    if not bin_in_path:
+                        out(f"Cause: {bin_dir} not in PATH")
+                        out("Fix: restart Claude Code session (PATH hook fires on SessionStart)")
+                    else:
+                        out("Fix: re-run `npx mindsystem-cc` to regenerate wrappers and PATH hook")
+                    return "FAIL"
                 else:
-                    print("Status: PASS")
-                    record("PASS", "CLI Wrappers")
-    print()
+                    out(f"All {len(wrapper_names)} CLI wrappers found on PATH")
+
+                    # 7e: Check uv available
+                    uv_ok = shutil.which("uv") is not None
+                    # 7f: Check Python available
+                    py_ok = shutil.which("python3") is not None or shutil.which("python") is not None
+
+                    issues = []
+                    if not uv_ok:
+                        issues.append("uv not found — install: `curl -LsSf https://astral.sh/uv/install.sh | sh`")
+                    if not py_ok:
+                        issues.append("Python not found — install Python 3.10+")
+
+                    if issues:
+                        out("Status: WARN")
+                        for issue in issues:
+                            out(f"  {issue}")
+                        return "WARN"
+                    else:
+                        out("Status: PASS")
+                        return "PASS"
 
     # ---- CHECK 8: Milestone Naming Convention ----
-    print("=== Milestone Naming Convention ===")
-    if not milestones_dir.is_dir():
-        print("Status: SKIP")
-        print("No milestones directory")
-        record("SKIP", "Milestone Naming Convention")
-    else:
-        ms_dirs = [d for d in milestones_dir.iterdir() if d.is_dir()]
-        if not ms_dirs:
-            print("Status: SKIP")
-            print("No milestone directories")
-            record("SKIP", "Milestone Naming Convention")
+    def check_milestone_naming_convention(out: Callable[[str], None]) -> str:
+        if not milestones_dir.is_dir():
+            out("Status: SKIP")
+            out("No milestones directory")
+            return "SKIP"
         else:
-            versioned = _detect_versioned_milestone_dirs(planning)
-            if versioned:
-                print("Status: FAIL")
-                print(f"Found {len(versioned)} version-prefixed milestone directories:")
-                for v in versioned:
-                    dirname = v["path"].split("/", 1)[1] if "/" in v["path"] else v["path"]
-                    print(f"  {dirname} ({v['type']})")
-                record("FAIL", "Milestone Naming Convention")
+            ms_dirs = [d for d in milestones_dir.iterdir() if d.is_dir()]
+            if not ms_dirs:
+                out("Status: SKIP")
+                out("No milestone directories")
+                return "SKIP"
             else:
-                print("Status: PASS")
-                print("All milestone directories use name-based slugs")
-                record("PASS", "Milestone Naming Convention")
-    print()
+                versioned = _detect_versioned_milestone_dirs(planning)
+                if versioned:
+                    out("Status: FAIL")
+                    out(f"Found {len(versioned)} version-prefixed milestone directories:")
+                    for v in versioned:
+                        dirname = v["path"].split("/", 1)[1] if "/" in v["path"] else v["path"]
+                        out(f"  {dirname} ({v['type']})")
+                    return "FAIL"
+                else:
+                    out("Status: PASS")
+                    out("All milestone directories use name-based slugs")
+                    return "PASS"
 
     # ---- CHECK 9: Research API Keys ----
-    print("=== Research API Keys ===")
-    api_keys = {
-        "CONTEXT7_API_KEY": {
-            "enables": "library documentation lookup via Context7",
-            "without": "falls back to WebSearch/WebFetch (less authoritative)",
-            "url": "https://context7.com → copy API key",
-        },
-        "PERPLEXITY_API_KEY": {
-            "enables": "deep research via Perplexity AI",
-            "without": "falls back to WebSearch/WebFetch (less comprehensive)",
-            "url": "https://perplexity.ai/settings/api → copy API key",
-        },
-    }
-    missing_keys: list[str] = []
-    settings_only_keys: list[str] = []
-    for key_name, info in api_keys.items():
-        env_val = os.environ.get(key_name, "")
-        settings_val = _get_settings_env_var(key_name)
-        if env_val:
-            pass  # configured via environment
-        elif settings_val:
-            settings_only_keys.append(key_name)
-        else:
-            missing_keys.append(key_name)
-            print(f"{key_name}: not set")
-            print(f"  Enables: {info['enables']}")
-            print(f"  Without: {info['without']}")
-            if sys.platform == "win32":
-                print(f"  Set up:  {info['url']} → add to ~/.claude/settings.json env section")
-                print(f"           Or set via Windows System Environment Variables")
+    def check_research_api_keys(out: Callable[[str], None]) -> str:
+        api_keys = {
+            "CONTEXT7_API_KEY": {
+                "enables": "library documentation lookup via Context7",
+                "without": "falls back to WebSearch/WebFetch (less authoritative)",
+                "url": "https://context7.com → copy API key",
+            },
+            "PERPLEXITY_API_KEY": {
+                "enables": "deep research via Perplexity AI",
+                "without": "falls back to WebSearch/WebFetch (less comprehensive)",
+                "url": "https://perplexity.ai/settings/api → copy API key",
+            },
+        }
+        missing_keys: list[str] = []
+        settings_only_keys: list[str] = []
+        for key_name, info in api_keys.items():
+            env_val = os.environ.get(key_name, "")
+            settings_val = _get_settings_env_var(key_name)
+            if env_val:
+                pass  # configured via environment
+            elif settings_val:
+                settings_only_keys.append(key_name)
             else:
-                shell_rc = "~/.zshrc" if sys.platform == "darwin" else "~/.bashrc"
-                print(f"  Set up:  {info['url']} → export {key_name}=<key> in {shell_rc}")
-                print(f"           Or add to ~/.claude/settings.json env section")
-    if missing_keys:
-        print("Status: WARN")
-        record("WARN", "Research API Keys")
-    else:
-        print("Status: PASS")
-        if settings_only_keys:
-            print("All research API keys configured")
-            print(f"  Note: {', '.join(settings_only_keys)} found in settings.json — restart Claude Code session to activate")
+                missing_keys.append(key_name)
+                out(f"{key_name}: not set")
+                out(f"  Enables: {info['enables']}")
+                out(f"  Without: {info['without']}")
+                if sys.platform == "win32":
+                    out(f"  Set up:  {info['url']} → add to ~/.claude/settings.json env section")
+                    out(f"           Or set via Windows System Environment Variables")
+                else:
+                    shell_rc = "~/.zshrc" if sys.platform == "darwin" else "~/.bashrc"
+                    out(f"  Set up:  {info['url']} → export {key_name}=<key> in {shell_rc}")
+                    out(f"           Or add to ~/.claude/settings.json env section")
+        if missing_keys:
+            out("Status: WARN")
+            return "WARN"
         else:
-            print("All research API keys configured")
-        record("PASS", "Research API Keys")
-    print()
+            out("Status: PASS")
+            if settings_only_keys:
+                out("All research API keys configured")
+                out(f"  Note: {', '.join(settings_only_keys)} found in settings.json — restart Claude Code session to activate")
+            else:
+                out("All research API keys configured")
+            return "PASS"
 
     # ---- CHECK 10: Phase Directory Naming ----
-    print("=== Phase Directory Naming ===")
-    roadmap_path = planning / "ROADMAP.md"
-    roadmap_phases = parse_roadmap_phases(roadmap_path)
-    if not roadmap_phases:
-        print("Status: SKIP")
-        print("No ROADMAP.md or no phases found")
-        record("SKIP", "Phase Directory Naming")
-    else:
-        non_canonical: list[str] = []
-        missing_dirs: list[str] = []
-        for num, name in roadmap_phases:
-            padded = normalize_phase(num)
-            slug = slugify(name)
-            canonical = f"{padded}-{slug}"
-            canonical_path = phases_dir / canonical if phases_dir.is_dir() else None
-            if canonical_path and canonical_path.is_dir():
-                continue
-            found = find_phase_dir(planning, padded)
-            if found is not None:
-                non_canonical.append(f"  {found.name} → git mv .planning/phases/{found.name} .planning/phases/{canonical}")
-            else:
-                missing_dirs.append(f"  {canonical} (missing, run: ms-tools create-phase-dirs)")
-        if non_canonical:
-            print("Status: FAIL")
-            print(f"Found {len(non_canonical)} non-canonical phase directory name(s):")
-            for line in non_canonical:
-                print(line)
-            record("FAIL", "Phase Directory Naming")
-        elif missing_dirs:
-            print("Status: WARN")
-            print(f"Found {len(missing_dirs)} missing phase directory(ies):")
-            for line in missing_dirs:
-                print(line)
-            record("WARN", "Phase Directory Naming")
+    def check_phase_directory_naming(out: Callable[[str], None]) -> str:
+        roadmap_path = planning / "ROADMAP.md"
+        roadmap_phases = parse_roadmap_phases(roadmap_path)
+        if not roadmap_phases:
+            out("Status: SKIP")
+            out("No ROADMAP.md or no phases found")
+            return "SKIP"
         else:
-            print("Status: PASS")
-            print("All phase directories use canonical naming")
-            record("PASS", "Phase Directory Naming")
-    print()
+            non_canonical: list[str] = []
+            missing_dirs: list[str] = []
+            for num, name in roadmap_phases:
+                padded = normalize_phase(num)
+                slug = slugify(name)
+                canonical = f"{padded}-{slug}"
+                canonical_path = phases_dir / canonical if phases_dir.is_dir() else None
+                if canonical_path and canonical_path.is_dir():
+                    continue
+                found = find_phase_dir(planning, padded)
+                if found is not None:
+                    non_canonical.append(f"  {found.name} → git mv .planning/phases/{found.name} .planning/phases/{canonical}")
+                else:
+                    missing_dirs.append(f"  {canonical} (missing, run: ms-tools create-phase-dirs)")
+            if non_canonical:
+                out("Status: FAIL")
+                out(f"Found {len(non_canonical)} non-canonical phase directory name(s):")
+                for line in non_canonical:
+                    out(line)
+                return "FAIL"
+            elif missing_dirs:
+                out("Status: WARN")
+                out(f"Found {len(missing_dirs)} missing phase directory(ies):")
+                for line in missing_dirs:
+                    out(line)
+                return "WARN"
+            else:
+                out("Status: PASS")
+                out("All phase directories use canonical naming")
+                return "PASS"
 
     # ---- CHECK 11: Browser Verification ----
-    print("=== Browser Verification ===")
-    is_web, web_signal = False, "not checked"
     bv_enabled = True
     bv_config = config.get("browser_verification", {})
     if isinstance(bv_config, dict):
@@ -1354,187 +2822,237 @@ def cmd_doctor_scan(args: argparse.Namespace) -> None:
     if isinstance(bv_config, dict) and "web_project" in bv_config:
         bv_web_override = bv_config["web_project"]
 
-    bv_hint = ""
-
-    if not bv_enabled:
-        print("Status: SKIP")
-        print("Disabled in config.json")
-        record("SKIP", "Browser Verification")
-    elif bv_web_override is False:
-        is_web = False
-        print("Status: SKIP")
-        print("web_project: false in config.json")
-        record("SKIP", "Browser Verification")
-    else:
-        if bv_web_override is True:
-            is_web, web_signal = True, "config override"
+    web_lock = threading.Lock()
+    web_detection: list[tuple[bool, str, str]] = []
+
+    def web_project() -> tuple[bool, str, str]:
+        """Detect the web project once for CHECK 11 and 12. Returns (is_web, signal, hint)."""
+        with web_lock:
+            if not web_detection:
+                if bv_web_override is False:
+                    web_detection.append((False, "not checked", ""))
+                elif bv_web_override is True:
+                    web_detection.append((True, "config override", ""))
+                else:
+                    is_web, web_signal = _detect_web_project(git_root)
+                    bv_hint = "" if is_web else (
+                        "Tip: If this is a web project, run /ms:config to enable browser verification."
+                    )
+                    web_detection.append((is_web, web_signal, bv_hint))
+            return web_detection[0]
+
+    def check_browser_verification(out: Callable[[str], None]) -> str:
+        if not bv_enabled:
+            out("Status: SKIP")
+            out("Disabled in config.json")
+            return "SKIP"
+        elif bv_web_override is False:
+            out("Status: SKIP")
+            out("web_project: false in config.json")
+            return "SKIP"
         else:
-            is_web, web_signal = _detect_web_project(git_root)
+            is_web, web_signal, bv_hint = web_project()
 
-        if not is_web:
-            bv_hint = "Tip: If this is a web project, run /ms:config to enable browser verification."
-            print("Status: SKIP")
-            print(f"Not a web project ({web_signal})")
-            print(bv_hint)
-            record("SKIP", "Browser Verification")
-        else:
-            bv_missing: list[str] = []
-            cli_path = shutil.which("agent-browser")
-            if not cli_path:
-                bv_missing.append("agent-browser CLI (npm install -g agent-browser)")
-            skill_ok, _ = _check_skill_installed("agent-browser")
-            if not skill_ok:
-                bv_missing.append("agent-browser skill")
-            if bv_missing:
-                print("Status: WARN")
-                print(f"Web project detected ({web_signal}) but missing:")
-                for m in bv_missing:
-                    print(f"  {m}")
-                record("WARN", "Browser Verification")
+            if not is_web:
+                out("Status: SKIP")
+                out(f"Not a web project ({web_signal})")
+                out(bv_hint)
+                return "SKIP"
             else:
-                print("Status: PASS")
-                print(f"Web project ({web_signal}), CLI and skill installed")
-                record("PASS", "Browser Verification")
-    print()
+                bv_missing: list[str] = []
+                cli_path = shutil.which("agent-browser")
+                if not cli_path:
+                    bv_missing.append("agent-browser CLI (npm install -g agent-browser)")
+                skill_ok, _ = _check_skill_installed("agent-browser")
+                if not skill_ok:
+                    bv_missing.append("agent-browser skill")
+                if bv_missing:
+                    out("Status: WARN")
+                    out(f"Web project detected ({web_signal}) but missing:")
+                    for m in bv_missing:
+                        out(f"  {m}")
+                    return "WARN"
+                else:
+                    out("Status: PASS")
+                    out(f"Web project ({web_signal}), CLI and skill installed")
+                    return "PASS"
 
     # ---- CHECK 12: Screenshot Optimization ----
-    print("=== Screenshot Optimization ===")
-    if not bv_enabled:
-        print("Status: SKIP")
-        print("Browser verification disabled")
-        record("SKIP", "Screenshot Optimization")
-    elif not is_web:
-        print("Status: SKIP")
-        print(f"Not a web project ({web_signal})")
-        if bv_hint:
-            print(bv_hint)
-        record("SKIP", "Screenshot Optimization")
-    else:
-        if shutil.which("cwebp"):
-            print("Status: PASS")
-            print("cwebp available — screenshots will be converted to WebP")
-            record("PASS", "Screenshot Optimization")
+    def check_screenshot_optimization(out: Callable[[str], None]) -> str:
+        if not bv_enabled:
+            out("Status: SKIP")
+            out("Browser verification disabled")
+            return "SKIP"
+        is_web, web_signal, bv_hint = web_project()
+        if not is_web:
+            out("Status: SKIP")
+            out(f"Not a web project ({web_signal})")
+            if bv_hint:
+                out(bv_hint)
+            return "SKIP"
         else:
-            print("Status: WARN")
-            print("cwebp not found — browser screenshots will remain as PNG (larger files)")
-            print("Install: brew install webp | apt install webp | choco install webp")
-            record("WARN", "Screenshot Optimization")
-    print()
+            if shutil.which("cwebp"):
+                out("Status: PASS")
+                out("cwebp available — screenshots will be converted to WebP")
+                return "PASS"
+            else:
+                out("Status: WARN")
+                out("cwebp not found — browser screenshots will remain as PNG (larger files)")
+                out("Install: brew install webp | apt install webp | choco install webp")
+                return "WARN"
 
     # ---- CHECK 13: Roadmap Format ----
-    print("=== Roadmap Format ===")
-    roadmap_path = planning / "ROADMAP.md"
-    if not roadmap_path.is_file():
-        print("Status: SKIP")
-        print("No ROADMAP.md found")
-        record("SKIP", "Roadmap Format")
-    else:
-        roadmap_text = roadmap_path.read_text(encoding="utf-8")
-        all_phases = parse_roadmap_phases(roadmap_path)
-
-        if not all_phases:
-            print("Status: SKIP")
-            print("No phases found in ROADMAP.md")
-            record("SKIP", "Roadmap Format")
+    def check_roadmap_format(out: Callable[[str], None]) -> str:
+        roadmap_path = planning / "ROADMAP.md"
+        if not roadmap_path.is_file():
+            out("Status: SKIP")
+            out("No ROADMAP.md found")
+            return "SKIP"
         else:
-            # Find incomplete phases — check overview checklist
-            completed_phases: set[str] = set()
-            for line in roadmap_text.splitlines():
-                done_match = re.match(
-                    r"^-\s*\[x\]\s*\*\*Phase\s+(\d+(?:\.\d+)?)", line
-                )
-                if done_match:
-                    completed_phases.add(done_match.group(1))
-
-            phases_to_check = [
-                (num, name)
-                for num, name in all_phases
-                if num not in completed_phases
-            ]
-
-            if not phases_to_check:
-                print("Status: PASS")
-                print("All phases completed — no pre-work flags to validate")
-                record("PASS", "Roadmap Format")
+            roadmap_doc = MarkdownArtifact(roadmap_path.read_text(encoding="utf-8"), roadmap_path)
+            roadmap_text = roadmap_doc.text
+            all_phases = _roadmap_phases(roadmap_doc)
+
+            if not all_phases:
+                out("Status: SKIP")
+                out("No phases found in ROADMAP.md")
+                return "SKIP"
             else:
-                issues: list[str] = []
-                for num, name in phases_to_check:
-                    padded = normalize_phase(num)
-                    info = _parse_phase_section(roadmap_text, padded)
-                    if info is None:
-                        issues.append(f"Phase {num}: no detail section found")
-                        continue
-                    for flag in ("discuss", "design", "research"):
-                        pw = info["prework"][flag]
-                        if pw.get("status") == "parse_error":
-                            issues.append(
-                                f"Phase {num} ({name}): {flag.capitalize()} flag missing or malformed"
-                            )
-
-                if issues:
-                    print("Status: FAIL")
-                    print(f"{len(issues)} pre-work flag issue(s):")
-                    for issue in issues:
-                        print(f"  - {issue}")
-                    record("FAIL", "Roadmap Format")
-                else:
-                    print("Status: PASS")
-                    print(
-                        f"All {len(phases_to_check)} incomplete phase(s) have valid pre-work flags"
+                # Find incomplete phases — check overview checklist
+                completed_phases: set[str] = set()
+                for line in roadmap_text.splitlines():
+                    done_match = re.match(
+                        r"^-\s*\[x\]\s*\*\*Phase\s+(\d+(?:\.\d+)?)", line
                     )
-                    record("PASS", "Roadmap Format")
-    print()
+                    if done_match:
+                        completed_phases.add(done_match.group(1))
+
+                phases_to_check = [
+                    (num, name)
+                    for num, name in all_phases
+                    if num not in completed_phases
+                ]
+
+                if not phases_to_check:
+                    out("Status: PASS")
+                    out("All phases completed — no pre-work flags to validate")
+                    return "PASS"
+                else:
+                    issues: list[str] = []
+                    for num, name in phases_to_check:
+                        padded = normalize_phase(num)
+                        info = _parse_phase_section(roadmap_doc, padded)
+                        if info is None:
+                            issues.append(f"Phase {num}: no detail section found")
+                            continue
+                        for flag in ("discuss", "design", "research"):
+                            pw = info["prework"][flag]
+                            if pw.get("status") == "parse_error":
+                                issues.append(
+                                    f"Phase {num} ({name}): {flag.capitalize()} flag missing or malformed"
+                                )
+
+                    if issues:
+                        out("Status: FAIL")
+                        out(f"{len(issues)} pre-work flag issue(s):")
+                        for issue in issues:
+                            out(f"  - {issue}")
+                        return "FAIL"
+                    else:
+                        out("Status: PASS")
+                        out(
+                            f"All {len(phases_to_check)} incomplete phase(s) have valid pre-work flags"
+                        )
+                        return "PASS"
 
     # ---- CHECK 14: Phase Skills ----
-    print("=== Phase Skills ===")
-    skills_config = config.get("skills", {})
-    plan_skills = skills_config.get("plan", []) if isinstance(skills_config, dict) else []
-    design_skills = skills_config.get("design", []) if isinstance(skills_config, dict) else []
-    skill_warnings: list[str] = []
-
-    if not plan_skills:
-        skill_warnings.append("plan")
-        print("skills.plan: not configured")
-        print("  Impact: Plan-phase code quality — the highest-leverage skill slot")
-        print("  What to add: A code quality skill encoding your project's framework")
-        print("  best practices. Include rules for common pitfalls, idiomatic patterns,")
-        print("  performance gotchas, and structural conventions specific to your stack.")
-        print("  The executor runs a multi-pass review after implementation, catching")
-        print("  framework misuse and structural problems before they reach verification.")
-        print("  Ideal structure: A SKILL.md with categorized rules (reactivity, typing,")
-        print("  performance, composition) plus reference files with bad/good code examples")
-        print("  for each category. The agent selectively reads only rules relevant to the")
-        print("  changed code, keeping context usage efficient.")
-        print("  Set up: Create a skill with framework-specific rules and reference files,")
-        print("  then run /ms:config to add it to skills.plan")
-    else:
-        print(f"skills.plan: {', '.join(plan_skills)}")
-
-    if not design_skills:
-        skill_warnings.append("design")
-        print("skills.design: not configured")
-        print("  Impact: Design-phase quality — ensures generated designs match your")
-        print("  existing design system instead of generic AI output")
-        print("  What to add: A skill describing your project's design system — color")
-        print("  palette, typography, spacing scale, reusable components, and layout")
-        print("  conventions. The designer agent uses this to produce designs that feel")
-        print("  native to your product rather than starting from scratch.")
-        print("  Ideal structure: Document your design tokens (colors, fonts, sizes),")
-        print("  component inventory (buttons, cards, inputs with their variants), and")
-        print("  brand guidelines (visual tone, density preference, platform conventions).")
-        print("  Set up: Create a skill with your design tokens and component inventory,")
-        print("  then run /ms:config to add it to skills.design")
-    else:
-        print(f"skills.design: {', '.join(design_skills)}")
+    def check_phase_skills(out: Callable[[str], None]) -> str:
+        skills_config = config.get("skills", {})
+        plan_skills = skills_config.get("plan", []) if isinstance(skills_config, dict) else []
+        design_skills = skills_config.get("design", []) if isinstance(skills_config, dict) else []
+        skill_warnings: list[str] = []
+
+        if not plan_skills:
+            skill_warnings.append("plan")
+            out("skills.plan: not configured")
+            out("  Impact: Plan-phase code quality — the highest-leverage skill slot")
+            out("  What to add: A code quality skill encoding your project's framework")
+            out("  best practices. Include rules for common pitfalls, idiomatic patterns,")
+            out("  performance gotchas, and structural conventions specific to your stack.")
+            out("  The executor runs a multi-pass review after implementation, catching")
+            out("  framework misuse and structural problems before they reach verification.")
+            out("  Ideal structure: A SKILL.md with categorized rules (reactivity, typing,")
+            out("  performance, composition) plus reference files with bad/good code examples")
+            out("  for each category. The agent selectively reads only rules relevant to the")
+            out("  changed code, keeping context usage efficient.")
+            out("  Set up: Create a skill with framework-specific rules and reference files,")
+            out("  then run /ms:config to add it to skills.plan")
+        else:
+            out(f"skills.plan: {', '.join(plan_skills)}")
+
+        if not design_skills:
+            skill_warnings.append("design")
+            out("skills.design: not configured")
+            out("  Impact: Design-phase quality — ensures generated designs match your")
+            out("  existing design system instead of generic AI output")
+            out("  What to add: A skill describing your project's design system — color")
+            out("  palette, typography, spacing scale, reusable components, and layout")
+            out("  conventions. The designer agent uses this to produce designs that feel")
+            out("  native to your product rather than starting from scratch.")
+            out("  Ideal structure: Document your design tokens (colors, fonts, sizes),")
+            out("  component inventory (buttons, cards, inputs with their variants), and")
+            out("  brand guidelines (visual tone, density preference, platform conventions).")
+            out("  Set up: Create a skill with your design tokens and component inventory,")
+            out("  then run /ms:config to add it to skills.design")
+        else:
+            out(f"skills.design: {', '.join(design_skills)}")
 
-    if skill_warnings:
-        print(f"Status: WARN")
-        record("WARN", "Phase Skills")
-    else:
-        print("Status: PASS")
-        print("Plan and design phase skills configured")
-        record("PASS", "Phase Skills")
-    print()
+        if skill_warnings:
+            out(f"Status: WARN")
+            return "WARN"
+        else:
+            out("Status: PASS")
+            out("Plan and design phase skills configured")
+            return "PASS"
+
+    checks: list[tuple[str, Callable[[Callable[[str], None]], str]]] = [
+        ("Subsystem Vocabulary", check_subsystem_vocabulary),
+        ("Milestone Directory Structure", check_milestone_directory_structure),
+        ("Phase Archival", check_phase_archival),
+        ("Knowledge Files", check_knowledge_files),
+        ("Phase Summaries", check_phase_summaries),
+        ("PLAN Cleanup", check_plan_cleanup),
+        ("CLI Wrappers", check_cli_wrappers),
+        ("Milestone Naming Convention", check_milestone_naming_convention),
+        ("Research API Keys", check_research_api_keys),
+        ("Phase Directory Naming", check_phase_directory_naming),
+        ("Browser Verification", check_browser_verification),
+        ("Screenshot Optimization", check_screenshot_optimization),
+        ("Roadmap Format", check_roadmap_format),
+        ("Phase Skills", check_phase_skills),
+    ]
+
+    def run_check(check: Callable[[Callable[[str], None]], str]) -> tuple[str, list[str], float]:
+        lines: list[str] = []
+        started = time.perf_counter()
+        status = check(lines.append)
+        return status, lines, time.perf_counter() - started
+
+    # Checks are independent reads, so run them together and print each
+    # section in the fixed order as soon as it and its predecessors finish.
+    timings: list[tuple[str, float]] = []
+    scan_started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        futures = [(name, pool.submit(run_check, check)) for name, check in checks]
+        for name, future in futures:
+            status, lines, elapsed = future.result()
+            print(f"=== {name} ===")
+            for line in lines:
+                print(line)
+            record(status, name)
+            timings.append((name, elapsed))
+            print()
+    scan_elapsed = time.perf_counter() - scan_started
 
     # ---- SUMMARY ----
     total = pass_count + warn_count + fail_count + skip_count
@@ -1548,6 +3066,11 @@ def cmd_doctor_scan(args: argparse.Namespace) -> None:
     else:
         print("All checks passed")
 
+    check_total = sum(elapsed for _, elapsed in timings)
+    print(f"Timings: {scan_elapsed:.3f}s wall, {check_total:.3f}s across checks")
+    for name, elapsed in timings:
+        print(f"  {name}: {elapsed:.3f}s")
+
 
 # ===================================================================
 # Subcommand: create-phase-dirs
@@ -1726,14 +3249,119 @@ def cmd_phase_renumber(args: argparse.Namespace) -> None:
 # ===================================================================
 
 
+def _bucket_phase_commits(targets: list[str], since: str | None = None) -> dict[str, list[str]]:
+    """Bucket "%H %ai %s" lines for commits whose message contains ``(<target>-``.
+
+    One ``git log --all -z`` pass replaces a ``--grep`` traversal per phase
+    spelling; git pre-filters on "(" and the convention prefix is matched here.
+    Commits reachable from *since* (a milestone boundary) are excluded.
+    Buckets keep git log order. A commit lands in every target it mentions.
+    """
+    wanted = set(targets)
+    buckets: dict[str, list[str]] = {}
+    exclude = [f"^{since}"] if since else []
+    try:
+        out = run_git("log", "--all", *exclude, "-z", "--format=%H %ai %s%x01%B", "--grep=(")
+    except subprocess.CalledProcessError:
+        return buckets
+
+    for record in out.split("\0"):
+        header, _, message = record.strip("\n").partition("\x01")
+        if not header:
+            continue
+        mentioned = {m.group(1) for m in _PHASE_REF_RE.finditer(message)} & wanted
+        for target in mentioned:
+            buckets.setdefault(target, []).append(header)
+    return buckets
+
+
+_COMMIT_STATS_FILE = "commit-stats.json"
+_COMMIT_STATS_VERSION = 1
+_COMMIT_STATS_CHUNK = 512
+
+
+def _log_numstat_rows(oids: list[str]) -> dict[str, list[Any]]:
+    """[insertions, deletions, paths] per commit from ``git log --no-walk --numstat -z``.
+
+    Merge commits have no numstat output and get an empty row. Binary files
+    count as touched paths with zero lines.
+    """
+    rows: dict[str, list[Any]] = {oid: [0, 0, []] for oid in oids}
+    for i in range(0, len(oids), _COMMIT_STATS_CHUNK):
+        out = run_git("log", "--no-walk=unsorted", "--numstat", "-z", "--format=%x01%H", *oids[i:i + _COMMIT_STATS_CHUNK])
+        for record in out.split("\x01"):
+            oid, _, body = record.partition("\0")
+            if not oid:
+                continue
+            entries = _parse_numstat_z(body.lstrip("\n"))
+            rows[oid] = [
+                sum(e["insertions"] or 0 for e in entries),
+                sum(e["deletions"] or 0 for e in entries),
+                [e["path"] for e in entries],
+            ]
+    return rows
+
+
+def commit_numstats(oids: list[str], cache_dir: Path | None) -> dict[str, list[Any]]:
+    """Per-commit [insertions, deletions, paths] for full commit OIDs.
+
+    A commit's stats never change, so rows are cached by OID in
+    ``<cache_dir>/commit-stats.json`` and only commits missing from the cache
+    are read, in one ``git log --numstat`` pass. Without a cache dir every
+    requested commit is read.
+    """
+    path = cache_dir / _COMMIT_STATS_FILE if cache_dir else None
+    data = _read_json_cache(path) if path else None
+    if not isinstance(data, dict) or data.get("version") != _COMMIT_STATS_VERSION:
+        data = {"version": _COMMIT_STATS_VERSION, "commits": {}}
+    cached: dict[str, list[Any]] = data["commits"]
+
+    missing = [oid for oid in dict.fromkeys(oids) if oid not in cached]
+    if missing:
+        cached.update(_log_numstat_rows(missing))
+        if path:
+            _write_json_cache(path, data)
+    return {oid: cached[oid] for oid in oids}
+
+
+def _sum_commit_stats(rows: list[list[Any]]) -> dict[str, int]:
+    """Commit count, distinct files and line totals over numstat rows."""
+    files: set[str] = set()
+    for row in rows:
+        files.update(row[2])
+    return {
+        "commits": len(rows),
+        "files": len(files),
+        "insertions": sum(row[0] for row in rows),
+        "deletions": sum(row[1] for row in rows),
+    }
+
+
+def _format_commit_stats(totals: dict[str, int]) -> str:
+    """Summary of _sum_commit_stats totals, pluralised like ``git diff --shortstat``."""
+    files, ins, dels = totals["files"], totals["insertions"], totals["deletions"]
+    parts = [f"{files} file{'' if files == 1 else 's'} changed"]
+    if ins or not dels:
+        parts.append(f"{ins} insertion{'' if ins == 1 else 's'}(+)")
+    if dels or not ins:
+        parts.append(f"{dels} deletion{'' if dels == 1 else 's'}(-)")
+    return ", ".join(parts)
+
+
 def cmd_gather_milestone_stats(args: argparse.Namespace) -> None:
     """Gather milestone readiness status and statistics.
 
     Contract:
-        Args: start_phase (int), end_phase (int)
+        Args: start_phase (int), end_phase (int), --all-history (flag), --change-stats (flag),
+              --breakdown (flag)
         Output: text — readiness status (READY/NOT READY) and git stats
+                Git stats cover commits after the latest milestone boundary unless --all-history
+                Changes is the net git diff --shortstat over first^..last
+                --breakdown adds a Churn line (per-commit numstats summed over the range)
+                and per-phase and per-day churn totals
+                --change-stats adds per-subsystem / per-directory totals (see change-stats)
         Exit codes: 0 = success, 1 = start > end or phases dir missing
-        Side effects: read-only
+        Side effects: --breakdown caches per-commit numstats in <git-dir>/ms-tools/commit-stats.json
     """
     start = args.start_phase
     end = args.end_phase
@@ -1811,34 +3439,24 @@ def cmd_gather_milestone_stats(args: argparse.Namespace) -> None:
     print("=== Git Stats ===")
     print()
 
-    all_commits: list[str] = []
-
-    # Integer phases — try both padded and raw formats
+    # Phase-number spellings to match, in reporting order: integer phases in
+    # padded and raw form, then decimal phases from directory names
+    targets: list[str] = []
     for i in range(start, end + 1):
         padded = normalize_phase(str(i))
         raw = str(i)
-        for p in ([padded, raw] if padded != raw else [padded]):
-            try:
-                out = run_git("log", "--all", "--format=%H %ai %s", f"--grep=({p}-")
-                if out:
-                    all_commits.extend(out.splitlines())
-            except subprocess.CalledProcessError:
-                pass
-
-    # Decimal phases — try both directory-derived and padded forms
+        targets.extend([padded, raw] if padded != raw else [padded])
     for d in sorted(phases_dir.iterdir()):
         if not d.is_dir():
             continue
         phase_num = d.name.split("-", 1)[0]
         if "." in phase_num and in_range(phase_num, start, end):
             padded = normalize_phase(phase_num)
-            for p in ([padded, phase_num] if padded != phase_num else [padded]):
-                try:
-                    out = run_git("log", "--all", "--format=%H %ai %s", f"--grep=({p}-")
-                    if out:
-                        all_commits.extend(out.splitlines())
-                except subprocess.CalledProcessError:
-                    pass
+            targets.extend([padded, phase_num] if padded != phase_num else [padded])
+
+    since = None if args.all_history else _milestone_boundary(git_root)
+    buckets = _bucket_phase_commits(targets, since)
+    all_commits = [c for t in dict.fromkeys(targets) for c in buckets.get(t, [])]
 
     # Deduplicate and sort by date
     seen: set[str] = set()
@@ -1878,6 +3496,59 @@ def cmd_gather_milestone_stats(args: argparse.Namespace) -> None:
                 print(f"Changes:{diffstat}")
         except subprocess.CalledProcessError:
             pass
+
+        if args.breakdown:
+            # Range commits with author dates; their numstats come from the OID
+            # cache. Phase commits that are not ancestors of each other leave
+            # first^..last empty, so fall back to the bucketed commits.
+            try:
+                range_log = run_git("log", "--format=%H %as", f"{first_hash}^..{last_hash}")
+            except subprocess.CalledProcessError:
+                range_log = ""
+            range_commits = [line.split() for line in range_log.splitlines() if len(line.split()) == 2]
+            if not range_commits:
+                range_commits = [c.split()[:2] for c in unique_commits]
+            all_oids = [oid for oid, _ in range_commits] + [c.split()[0] for c in unique_commits]
+            numstats = commit_numstats(all_oids, _tool_cache_dir(git_root))
+            churn = _sum_commit_stats([numstats[oid] for oid, _ in range_commits])
+            print(f"Churn: {churn['commits']} commit(s), {_format_commit_stats(churn)}")
+
+            print()
+            print("=== Per-Phase Changes ===")
+            print()
+            by_phase: dict[str, list[str]] = {}
+            for target in dict.fromkeys(targets):
+                phase_oids = by_phase.setdefault(normalize_phase(target), [])
+                phase_oids.extend(c.split()[0] for c in buckets.get(target, []) if c.split()[0] not in phase_oids)
+            for phase, phase_oids in by_phase.items():
+                if phase_oids:
+                    totals = _sum_commit_stats([numstats[oid] for oid in phase_oids])
+                    print(f"Phase {phase}: {totals['commits']} commit(s), {_format_commit_stats(totals)}")
+
+            print()
+            print("=== Daily Timeline ===")
+            print()
+            by_day: dict[str, list[list[Any]]] = {}
+            for oid, day in range_commits:
+                by_day.setdefault(day, []).append(numstats[oid])
+            for day in sorted(by_day):
+                totals = _sum_commit_stats(by_day[day])
+                print(f"{day}: {totals['commits']} commit(s), {_format_commit_stats(totals)}")
+
+        if args.change_stats:
+            print()
+            print("=== Change Stats ===")
+            print()
+            try:
+                diff_args, _ = patch_diff_args(
+                    [f"{first_hash}^", last_hash], config=parse_json_config(git_root / ".planning")
+                )
+                stats = compute_change_stats(diff_args, _key_file_subsystems(git_root / ".planning"))
+            except subprocess.CalledProcessError:
+                print("Change stats unavailable (git diff failed)")
+            else:
+                for line in format_change_stats(stats):
+                    print(line)
     else:
         print("No commits found matching phase patterns (expected 'feat(XX-YY): ...')")
         print("Determine git range manually from git log")
@@ -1890,15 +3561,264 @@ def cmd_gather_milestone_stats(args: argparse.Namespace) -> None:
 # ===================================================================
 
 
+def _phase_patch_file(padded_phase: str, suffix: str) -> tuple[str, str]:
+    """(phase directory, uncompressed patch path) for a phase, creating the directory."""
+    phases_dir = Path(".planning/phases")
+    phase_dir_matches = sorted(phases_dir.glob(f"{padded_phase}-*")) if phases_dir.is_dir() else []
+    phase_dir = str(phase_dir_matches[0]) if phase_dir_matches else str(phases_dir)
+    Path(phase_dir).mkdir(parents=True, exist_ok=True)
+
+    if suffix:
+        return phase_dir, f"{phase_dir}/{padded_phase}-{suffix}.patch"
+    return phase_dir, f"{phase_dir}/{padded_phase}-changes.patch"
+
+
+_PATCH_SIDECAR_VERSION = 1
+
+
+def _patch_sidecar_path(patch_file: str) -> Path:
+    """Sidecar recording what a phase patch was generated from (``<patch>.meta.json``)."""
+    return Path(f"{patch_file}.meta.json")
+
+
+def _patch_fingerprint(
+    base_commit: str,
+    end_commit: str,
+    suffix: str,
+    args: argparse.Namespace,
+    config: dict,
+    scope_paths: list[str] | None = None,
+) -> dict[str, Any]:
+    """Inputs that determine a phase patch's bytes: base/head OIDs, suffix, options, exclusions.
+
+    The exclusion hash covers PATCH_EXCLUSIONS, the config.json "patch"
+    section, every tracked or untracked ``.gitattributes`` in the working
+    tree (git check-attr reads them all) and info/attributes, so no numstat
+    pass is needed to decide whether the previous output is still current. With --scope
+    key-files, the resolved path list is hashed too.
+    """
+    git = _git_session()
+    digest = hashlib.sha256(
+        json.dumps({"defaults": PATCH_EXCLUSIONS, "patch": _patch_config(config)}, sort_keys=True).encode()
+    )
+    listed = run_git(
+        "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", ":(glob)**/.gitattributes"
+    )
+    attribute_files = [Path(name) for name in sorted(set(listed.split("\0"))) if name]
+    git_dir = _git_dir(Path.cwd())
+    if git_dir is not None:
+        attribute_files.append(git_dir / "info" / "attributes")
+    for path in attribute_files:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            data = b""
+        digest.update(f"\0{path}\0".encode() + data)
+    return {
+        "version": _PATCH_SIDECAR_VERSION,
+        "base": git.resolve(base_commit),
+        "head": git.resolve(end_commit),
+        "suffix": suffix,
+        "options": {
+            "binary": bool(args.binary),
+            "split": bool(args.split),
+            "compress": args.compress,
+            "max_lines": args.max_lines,
+            "max_file_lines": args.max_file_lines,
+            "scope": args.scope,
+        },
+        "scope_paths": hashlib.sha256("\0".join(scope_paths).encode()).hexdigest() if scope_paths else None,
+        "exclusions": digest.hexdigest(),
+    }
+
+
+def _current_patch_output(sidecar: Path, fingerprint: dict[str, Any]) -> str | None:
+    """Output recorded in *sidecar* if it matches *fingerprint* and still exists on disk."""
+    data = _read_json_cache(sidecar)
+    if not isinstance(data, dict) or any(data.get(k) != v for k, v in fingerprint.items()):
+        return None
+    output = data.get("output")
+    return output if isinstance(output, str) and Path(output).exists() else None
+
+
+def _write_phase_patch(
+    padded_phase: str, phase_commits: list[str], base_commit: str, args: argparse.Namespace, config: dict
+) -> dict[str, Any]:
+    """Write one phase's patch (or --split directory) and return its result row.
+
+    Shared by the single-phase command and the --range workers, so it prints
+    nothing and is safe to run in a worker thread. The row has status
+    (generated, unchanged or skipped), a one-line detail, the output path,
+    scope paths, excluded paths, truncated files, the split manifest and the
+    diff args used (None when the patch was reused or skipped).
+    """
+    phase_dir, patch_file = _phase_patch_file(padded_phase, args.suffix)
+    end_commit = phase_commits[0] if args.suffix else "HEAD"
+    split_dir = patch_file[: -len(".patch")]
+    output = f"{split_dir}/" if args.split else str(patch_output_path(Path(patch_file), args.compress))
+    row: dict[str, Any] = {
+        "phase": padded_phase, "commits": len(phase_commits), "phase_dir": phase_dir, "path": output,
+        "scope_paths": None, "excluded": [], "truncated": [], "manifest": None, "diff_args": None,
+    }
+
+    if args.scope == "key-files":
+        row["scope_paths"] = _phase_key_files(Path(phase_dir))
+        if not row["scope_paths"]:
+            row.update(status="skipped", detail="no key-files listed in phase summaries")
+            return row
+    scope_paths = row["scope_paths"]
+
+    # Skip the diff when base, head, options and exclusions match the last run
+    sidecar = _patch_sidecar_path(patch_file)
+    fingerprint = _patch_fingerprint(base_commit, end_commit, args.suffix, args, config, scope_paths)
+    if not args.force and _current_patch_output(sidecar, fingerprint) == output:
+        row.update(status="unchanged", detail="up to date")
+        return row
+
+    binary_args = ["--binary"] if args.binary else []
+    diff_args, excluded = patch_diff_args([base_commit, end_commit], binary_args, config, scope_paths)
+    row.update(diff_args=diff_args, excluded=excluded)
+    if args.split:
+        manifest = write_split_patches(diff_args, Path(split_dir), args.compress)
+        if manifest is not None:
+            row.update(status="generated", manifest=manifest, detail=f"{manifest['totals']['files']} files")
+    else:
+        written = _write_patch_file(diff_args, Path(output), args)
+        if written is not None:
+            line_count, truncated = written
+            detail = f"{line_count} lines" + (f", {len(truncated)} truncated" if truncated else "")
+            row.update(status="generated", lines=line_count, truncated=truncated, detail=detail)
+
+    if row.get("status") == "generated":
+        _remove_other_patch_mode(Path(patch_file), args.split, args.compress)
+        _write_config_atomic(sidecar, {**fingerprint, "output": output})
+    else:
+        sidecar.unlink(missing_ok=True)
+        row.update(status="skipped", detail="no implementation changes outside excluded patterns")
+    return row
+
+
+def _print_phase_patch_notes(row: dict[str, Any]) -> None:
+    """Excluded-path count and truncated files for a phase patch result row."""
+    if row.get("excluded"):
+        print(f"Excluded {len(row['excluded'])} generated/oversized path(s)")
+    _print_truncated(row.get("truncated", []))
+
+
+def _generate_phase_patch_range(args: argparse.Namespace) -> None:
+    """generate-phase-patch --range: resolve all phases in one pass, diff them concurrently."""
+    match = re.fullmatch(r"\s*(\d+)\s*-\s*(\d+)\s*", args.range)
+    if not match or int(match.group(1)) > int(match.group(2)):
+        print(f"Error: Invalid --range '{args.range}' (expected START-END, e.g. 3-7)", file=sys.stderr)
+        sys.exit(1)
+    start, end = int(match.group(1)), int(match.group(2))
+
+    git_root = find_git_root()
+    os.chdir(git_root)
+
+    phases_dir = Path(".planning/phases")
+    phases = [str(i) for i in range(start, end + 1)]
+    if phases_dir.is_dir():
+        for d in phases_dir.iterdir():
+            phase_num = d.name.split("-", 1)[0]
+            if d.is_dir() and "." in phase_num and in_range(phase_num, start, end):
+                phases.append(phase_num)
+    phases.sort(key=_phase_sort_key)
+
+    try:
+        since = None if args.all_history else _milestone_boundary(Path(git_root))
+        commit_sets = find_phase_commit_sets(phases, args.suffix, since)
+    except subprocess.CalledProcessError:
+        print("Error: Failed to read git log", file=sys.stderr)
+        sys.exit(1)
+
+    jobs = max(1, args.jobs or min(4, os.cpu_count() or 1))
+    print(f"Generating patches for phases {start}-{end} ({jobs} job(s))...")
+
+    config = parse_json_config(Path(".planning"))
+    rows: dict[str, dict[str, Any]] = {}
+    pending: dict[str, tuple[list[str], str]] = {}
+    for padded, commits in commit_sets.items():
+        if commits:
+            pending[padded] = (commits, _phase_base_commit(commits))
+        else:
+            rows[padded] = {"phase": padded, "status": "skipped", "detail": "no commits matching phase convention"}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(_write_phase_patch, padded, commits, base, args, config): padded
+            for padded, (commits, base) in pending.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            padded = futures[future]
+            try:
+                rows[padded] = future.result()
+            except (OSError, subprocess.CalledProcessError) as exc:
+                rows[padded] = {"phase": padded, "status": "error", "detail": str(exc)}
+
+    print()
+    for padded in commit_sets:
+        row = rows[padded]
+        if row["status"] in ("generated", "unchanged"):
+            print(f"Phase {padded}: {row['path']} ({row['detail']}, {row['commits']} commit(s))")
+        else:
+            print(f"Phase {padded}: {row['status']} ({row['detail']})")
+        _print_phase_patch_notes(row)
+    statuses = ("generated", "unchanged", "skipped", "error")
+    counts = {status: sum(1 for r in rows.values() if r["status"] == status) for status in statuses}
+    print()
+    print(
+        f"Generated: {counts['generated']}, unchanged: {counts['unchanged']}, "
+        f"skipped: {counts['skipped']}, errors: {counts['error']}"
+    )
+    if counts["error"]:
+        sys.exit(1)
+
+
 def cmd_generate_phase_patch(args: argparse.Namespace) -> None:
     """Generate a patch file with implementation changes from a phase.
 
+    Exclusions come from PATCH_EXCLUSIONS and the config.json "patch"
+    section (see patch_diff_args).
+
     Contract:
-        Args: phase (str), --suffix (str, optional)
+        Args: phase (str) or --range START-END with --jobs N, --suffix (str, optional),
+              --all-history (flag), --binary (flag), --split (flag), --change-stats (flag),
+              --compress (gzip|xz, optional), --force (flag),
+              --max-lines (int, optional), --max-file-lines (int, optional),
+              --scope (all|key-files, default all)
         Output: text — patch generation status and file path
-        Exit codes: 0 = success (or no matching commits), 1 = git error
-        Side effects: writes .patch file to phase directory
+                Phase commits are searched after the latest milestone boundary unless --all-history
+                --binary includes binary file contents so the patch applies with git apply
+                --split writes one patch per file plus manifest.json instead of a single patch
+                --change-stats appends per-subsystem / per-directory totals (see change-stats)
+                --compress writes .patch.gz/.patch.xz (read with patch-cat)
+                --range resolves every phase's commits in one history pass, writes the
+                patches concurrently (--jobs workers) and prints one line per phase plus
+                its excluded-path count and truncated files
+                An unchanged base/head/options/exclusion set reuses the existing patch
+                ("Up to date") unless --force
+                --max-lines/--max-file-lines keep whole files smallest-first and cut the rest
+                after their first hunks/lines with "# ms-tools:" markers (see write_budgeted_patch)
+                --scope key-files diffs only the key-files listed in the phase's SUMMARYs
+        Exit codes: 0 = success (or no matching commits), 1 = git error or any --range phase failed
+        Side effects: writes .patch file to phase directory (streamed, constant memory),
+                      or {phase}-{suffix|changes}/ with --split, plus <patch>.meta.json sidecar;
+                      removes the other mode's output (split directory or single patch)
     """
+    if args.split and (args.max_lines or args.max_file_lines):
+        print("Error: --max-lines/--max-file-lines cannot be combined with --split", file=sys.stderr)
+        sys.exit(1)
+    if getattr(args, "range", None):
+        if args.phase or args.change_stats:
+            print("Error: --range cannot be combined with a phase argument or --change-stats", file=sys.stderr)
+            sys.exit(1)
+        _generate_phase_patch_range(args)
+        return
+    if not args.phase:
+        print("Error: Provide a phase number or --range START-END", file=sys.stderr)
+        sys.exit(1)
+
     phase_input = args.phase
     suffix = args.suffix
 
@@ -1917,7 +3837,8 @@ def cmd_generate_phase_patch(args: argparse.Namespace) -> None:
         print(f"Generating patch for phase {padded_phase}...")
 
     try:
-        phase_commits = find_phase_commit_hashes(phase_input, suffix)
+        since = None if args.all_history else _milestone_boundary(Path(git_root))
+        phase_commits = find_phase_commit_hashes(phase_input, suffix, since)
     except subprocess.CalledProcessError:
         print("Error: Failed to read git log", file=sys.stderr)
         sys.exit(1)
@@ -1930,109 +3851,232 @@ def cmd_generate_phase_patch(args: argparse.Namespace) -> None:
     print(f"Found {len(phase_commits)} commit(s)")
 
     # Determine base commit
-    earliest_commit = phase_commits[-1]
-    try:
-        base_commit = run_git("rev-parse", f"{earliest_commit}^")
-    except subprocess.CalledProcessError:
-        base_commit = run_git("rev-list", "--max-parents=0", "HEAD")
-
-    base_msg = run_git("log", "--oneline", "-1", base_commit)
-    print(f"Base commit: {base_msg}")
+    git = _git_session()
+    base_commit = _phase_base_commit(phase_commits)
 
-    # Find output directory
-    phases_dir = Path(".planning/phases")
-    phase_dir_matches = sorted(phases_dir.glob(f"{padded_phase}-*")) if phases_dir.is_dir() else []
-    phase_dir = str(phase_dir_matches[0]) if phase_dir_matches else str(phases_dir)
+    print(f"Base commit: {git.abbrev(base_commit)} {git.commit_subject(base_commit)}")
 
-    Path(phase_dir).mkdir(parents=True, exist_ok=True)
-    print(f"Output directory: {phase_dir}/")
+    config = parse_json_config(Path(".planning"))
+    row = _write_phase_patch(padded_phase, phase_commits, base_commit, args, config)
+    print(f"Output directory: {row['phase_dir']}/")
+    if row["scope_paths"]:
+        print(f"Scope: {len(row['scope_paths'])} key file(s) from phase summaries")
 
-    # Determine output filename
-    if suffix:
-        patch_file = f"{phase_dir}/{padded_phase}-{suffix}.patch"
+    if row["status"] == "skipped":
+        _print_phase_patch_notes(row)
+        print(row["detail"].capitalize())
+        print("Patch skipped")
+        return
+    if row["status"] == "unchanged":
+        print()
+        print(f"Up to date: {row['path']} (base, head and exclusions unchanged)")
+        print("Use --force to regenerate")
     else:
-        patch_file = f"{phase_dir}/{padded_phase}-changes.patch"
+        _print_generated_phase_patch(row, args.compress)
 
-    # Generate diff
-    exclude_args = build_exclude_pathspecs()
-    if suffix:
-        latest_commit = phase_commits[0]
-        diff_args = ["diff", base_commit, latest_commit, "--", "."] + exclude_args
+    if args.change_stats:
+        diff_args = row["diff_args"]
+        if diff_args is None:
+            end_commit = phase_commits[0] if suffix else "HEAD"
+            diff_args, _ = patch_diff_args([base_commit, end_commit], config=config, paths=row["scope_paths"])
+        print()
+        print("=== Change Stats ===")
+        print()
+        stats = compute_change_stats(diff_args, _key_file_subsystems(Path(".planning")))
+        for line in format_change_stats(stats):
+            print(line)
+
+
+def _print_generated_phase_patch(row: dict[str, Any], compress: str | None) -> None:
+    """Print the result of a freshly written single-phase patch or --split directory."""
+    print()
+    if row["manifest"] is not None:
+        split_dir = row["path"].rstrip("/")
+        totals = row["manifest"]["totals"]
+        print(f"Generated: {split_dir}/ ({totals['files']} files, +{totals['insertions']} -{totals['deletions']})")
+        print(f"Manifest: {split_dir}/manifest.json")
+        _print_phase_patch_notes(row)
+        print()
+        if compress:
+            print(f"Review:  ms-tools patch-cat {split_dir}")
+            print(f"Apply:   ms-tools patch-cat {split_dir} | git apply")
+        else:
+            print(f"Review:  cat {split_dir}/<file>.patch")
+            print(f"Apply:   git apply {split_dir}/*.patch")
+        print(f"Discard: rm -r {split_dir}")
+        return
+
+    patch_file = row["path"]
+    print(f"Generated: {patch_file} ({row['lines']} lines)")
+    _print_phase_patch_notes(row)
+    print()
+    if compress:
+        print(f"Review:  ms-tools patch-cat {patch_file}")
+        print(f"Apply:   ms-tools patch-cat {patch_file} | git apply")
     else:
-        diff_args = ["diff", base_commit, "HEAD", "--", "."] + exclude_args
+        print(f"Review:  cat {patch_file}")
+        print(f"Apply:   git apply {patch_file}")
+    print(f"Discard: rm {patch_file}")
 
-    result = subprocess.run(
-        ["git"] + diff_args,
-        capture_output=True,
-        text=True,
+
+# ===================================================================
+# Subcommand: generate-adhoc-patch
+# ===================================================================
+
+
+def cmd_generate_adhoc_patch(args: argparse.Namespace) -> None:
+    """Generate a patch file from an adhoc commit or commit range.
+
+    Exclusions come from PATCH_EXCLUSIONS and the config.json "patch"
+    section (see patch_diff_args).
+
+    Contract:
+        Args: commit (str) — start commit hash, output (str) — output file path,
+              end (str, optional) — end commit hash for range diffs,
+              --binary (flag) — include binary file contents,
+              --compress (gzip|xz, optional) — append .gz/.xz and compress (read with patch-cat),
+              --max-lines / --max-file-lines (int, optional) — line budget (see write_budgeted_patch)
+        Output: text — patch generation status and file path
+        Exit codes: 0 = success (or no changes), 1 = commit not found
+        Side effects: writes .patch file to output path (streamed, constant memory)
+    """
+    commit_hash = args.commit
+    end_commit = getattr(args, "end", None) or commit_hash
+    output_path = args.output
+
+    git_root = find_git_root()
+    import os
+    os.chdir(git_root)
+
+    # Verify commits exist
+    resolved = _git_session().resolve_many([commit_hash, end_commit])
+    for ref, oid in resolved.items():
+        if oid is None:
+            print(f"Error: Commit {ref} not found", file=sys.stderr)
+            sys.exit(1)
+
+    binary_args = ["--binary"] if getattr(args, "binary", False) else []
+    diff_args, _ = patch_diff_args(
+        [f"{commit_hash}^", end_commit], binary_args, parse_json_config(Path(".planning"))
     )
-    patch_content = result.stdout
 
-    if not patch_content.strip():
+    compress = getattr(args, "compress", None)
+    output_path = str(patch_output_path(Path(output_path), compress))
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    written = _write_patch_file(diff_args, Path(output_path), args)
+    if written is None:
         print("No implementation changes outside excluded patterns")
         print("Patch skipped")
         return
 
-    Path(patch_file).write_text(patch_content, encoding="utf-8")
-    line_count = len(patch_content.splitlines())
+    line_count, truncated = written
+    print(f"Generated: {output_path} ({line_count} lines)")
+    _print_truncated(truncated)
+
+
+# ===================================================================
+# Subcommand: patch-cat
+# ===================================================================
+
+
+def _patch_cat_files(path: Path) -> list[Path] | None:
+    """Files to print for *path*: a patch (or its .gz/.xz variant) or a --split directory."""
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.is_file() and ".patch" in p.name and not p.name.endswith(".tmp"))
+    for suffix in ("", *PATCH_COMPRESSION_SUFFIXES.values()):
+        candidate = path.with_name(path.name + suffix)
+        if candidate.is_file():
+            return [candidate]
+    return None
+
+
+def cmd_patch_cat(args: argparse.Namespace) -> None:
+    """Print patches to stdout, decompressing gzip/xz transparently.
 
-    print()
-    print(f"Generated: {patch_file} ({line_count} lines)")
-    print()
-    print(f"Review:  cat {patch_file}")
-    print(f"Apply:   git apply {patch_file}")
-    print(f"Discard: rm {patch_file}")
+    Contract:
+        Args: paths (list[str]) — patch files (plain, .gz or .xz; the suffix may be omitted)
+              or --split directories (their patches print in file order)
+        Output: raw patch bytes on stdout, suitable for piping into git apply
+        Exit codes: 0 = success, 1 = path not found or unreadable patch
+        Side effects: read-only
+    """
+    files: list[Path] = []
+    for raw in args.paths:
+        found = _patch_cat_files(Path(raw))
+        if found is None:
+            print(f"Error: Patch not found: {raw}", file=sys.stderr)
+            sys.exit(1)
+        files.extend(found)
+
+    out = sys.stdout.buffer
+    for path in files:
+        try:
+            with open_patch(path) as f:
+                while chunk := f.read(_PATCH_CHUNK_SIZE):
+                    out.write(chunk)
+        except (OSError, EOFError, lzma.LZMAError) as exc:
+            out.flush()
+            print(f"Error: Cannot read {path}: {exc}", file=sys.stderr)
+            sys.exit(1)
+    out.flush()
 
 
 # ===================================================================
-# Subcommand: generate-adhoc-patch
+# Subcommand: change-stats
 # ===================================================================
 
 
-def cmd_generate_adhoc_patch(args: argparse.Namespace) -> None:
-    """Generate a patch file from an adhoc commit or commit range.
+def cmd_change_stats(args: argparse.Namespace) -> None:
+    """Summarize a diff per directory and per subsystem without generating a patch.
 
     Contract:
-        Args: commit (str) — start commit hash, output (str) — output file path,
-              end (str, optional) — end commit hash for range diffs
-        Output: text — patch generation status and file path
-        Exit codes: 0 = success (or no changes), 1 = commit not found
-        Side effects: writes .patch file to output path
+        Args: --phase (str) with --suffix/--all-history, or --base (str) with --head (str, default HEAD);
+              --depth (int, default 2), --json (flag)
+        Output: text — totals plus subsystem and directory tables (default)
+                JSON — {range, totals, subsystems, directories} (--json)
+                Subsystems come from SUMMARY key-files; patch exclusions apply
+        Exit codes: 0 = success, 1 = no phase commits or unknown revision
+        Side effects: read-only
     """
-    commit_hash = args.commit
-    end_commit = getattr(args, "end", None) or commit_hash
-    output_path = args.output
-
     git_root = find_git_root()
-    import os
     os.chdir(git_root)
+    git = _git_session()
 
-    # Verify commits exist
-    for ref in {commit_hash, end_commit}:
+    if args.phase:
         try:
-            run_git("rev-parse", ref)
+            since = None if args.all_history else _milestone_boundary(Path(git_root))
+            phase_commits = find_phase_commit_hashes(args.phase, args.suffix, since)
         except subprocess.CalledProcessError:
-            print(f"Error: Commit {ref} not found", file=sys.stderr)
+            print("Error: Failed to read git log", file=sys.stderr)
             sys.exit(1)
+        if not phase_commits:
+            print(f"Error: No commits found for phase {normalize_phase(args.phase)}", file=sys.stderr)
+            sys.exit(1)
+        base = _phase_base_commit(phase_commits)
+        head = phase_commits[0] if args.suffix else "HEAD"
+    else:
+        base, head = args.base, args.head
+        for ref, oid in git.resolve_many([base, head]).items():
+            if oid is None:
+                print(f"Error: Commit {ref} not found", file=sys.stderr)
+                sys.exit(1)
 
-    exclude_args = build_exclude_pathspecs()
-    diff_args = ["diff", f"{commit_hash}^", end_commit, "--", "."] + exclude_args
-
-    result = subprocess.run(
-        ["git"] + diff_args,
-        capture_output=True,
-        text=True,
-    )
+    try:
+        diff_args, _ = patch_diff_args([base, head], config=parse_json_config(Path(git_root) / ".planning"))
+        stats = compute_change_stats(diff_args, _key_file_subsystems(Path(git_root) / ".planning"), args.depth)
+    except subprocess.CalledProcessError:
+        print("Error: git diff failed", file=sys.stderr)
+        sys.exit(1)
 
-    if not result.stdout.strip():
-        print("No implementation changes outside excluded patterns")
-        print("Patch skipped")
+    if args.json:
+        output = {"range": {"base": git.resolve(base), "head": git.resolve(head)}, **stats}
+        json.dump(output, sys.stdout, cls=_SafeEncoder)
+        sys.stdout.write("\n")
         return
 
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    Path(output_path).write_text(result.stdout, encoding="utf-8")
-    line_count = len(result.stdout.splitlines())
-    print(f"Generated: {output_path} ({line_count} lines)")
+    print(f"Range: {git.abbrev(base)}..{git.abbrev(head)}")
+    for line in format_change_stats(stats):
+        print(line)
 
 
 # ===================================================================
@@ -2040,14 +4084,98 @@ def cmd_generate_adhoc_patch(args: argparse.Namespace) -> None:
 # ===================================================================
 
 
+_ARCHIVE_JOURNAL_FILE = ".archive-journal.json"
+_SUMMARY_INDEX_FILE = "PHASE-SUMMARIES.index.json"
+_SUMMARY_INDEX_VERSION = 1
+_ARCHIVE_ARTIFACT_SUFFIXES = (
+    "-CONTEXT.md", "-DESIGN.md", "-RESEARCH.md",
+    "-SUMMARY.md", "-UAT.md", "-VERIFICATION.md",
+    "-EXECUTION-ORDER.md",
+)
+
+
+def _archive_phase_dirs(phases_dir: Path, start: int, end: int) -> list[str]:
+    """Names of in-range phase directories, sorted, from one scandir of *phases_dir*."""
+    with os.scandir(phases_dir) as it:
+        names = [e.name for e in it if e.is_dir() and in_range(e.name.split("-", 1)[0], start, end)]
+    return sorted(names)
+
+
+def _write_phase_summaries(summaries_file: Path, milestone: str, phases_dir: Path, names: list[str]) -> int:
+    """Stream every SUMMARY of *names* into *summaries_file*; returns the summary count.
+
+    Each file is copied in chunks rather than read whole, and the result is
+    written to a temp file and renamed so a crash never leaves a partial file.
+    Alongside it, PHASE-SUMMARIES.index.json records each embedded summary's
+    byte offset, length, line range, frontmatter and readiness flag, so the
+    context scanner can score archived summaries without parsing the file.
+    """
+    entries: list[dict[str, Any]] = []
+    tmp = summaries_file.with_name(f"{summaries_file.name}.tmp")
+    pos, line = 0, 1
+
+    with tmp.open("wb") as out:
+
+        def emit(text: str) -> None:
+            nonlocal pos, line
+            data = text.encode("utf-8")
+            out.write(data)
+            pos += len(data)
+            line += data.count(b"\n")
+
+        emit(f"# Phase Summaries: {milestone}\n")
+        for dirname in names:
+            with os.scandir(phases_dir / dirname) as it:
+                summaries = sorted(e.name for e in it if e.is_file() and e.name.endswith("-SUMMARY.md"))
+            if not summaries:
+                continue
+            phase_num = dirname.split("-", 1)[0]
+            phase_name = dirname.split("-", 1)[1] if "-" in dirname else dirname
+            emit(f"\n## Phase {phase_num}: {phase_name}\n")
+            for name in summaries:
+                plan_id = name[:-len("-SUMMARY.md")]
+                emit(f"\n### {plan_id}\n\n")
+                start, start_line, last = pos, line, ""
+                with (phases_dir / dirname / name).open(encoding="utf-8") as f:
+                    while chunk := f.read(_PATCH_CHUNK_SIZE):
+                        emit(chunk)
+                        last = chunk[-1]
+                doc = MarkdownArtifact.load(phases_dir / dirname / name)
+                entries.append({
+                    "phase": dirname,
+                    "plan": plan_id,
+                    "offset": start,
+                    "length": pos - start,
+                    "lines": [start_line, line - 1 if last == "\n" else line],
+                    "frontmatter": doc.frontmatter if doc else None,
+                    "readiness": _artifact_has_readiness(doc) if doc else False,
+                })
+                emit("\n")
+    os.replace(str(tmp), str(summaries_file))
+    _write_config_atomic(
+        summaries_file.with_name(_SUMMARY_INDEX_FILE),
+        {"version": _SUMMARY_INDEX_VERSION, "file": summaries_file.name, "summaries": entries},
+    )
+    return len(entries)
+
+
 def cmd_archive_milestone_phases(args: argparse.Namespace) -> None:
     """Consolidate summaries, delete artifacts, move phase dirs to milestone archive.
 
+    Phase dirs are listed once; summaries are streamed into PHASE-SUMMARIES.md,
+    then each phase has its artifacts deleted and is moved. Progress is kept in
+    milestones/<slug>/.archive-journal.json, so rerunning after an interruption
+    resumes where it stopped; the journal is removed once the archive completes.
+
     Contract:
-        Args: start_phase (int), end_phase (int), milestone (str — slug)
+        Args: start_phase (int), end_phase (int), milestone (str — slug),
+              --pack (tar.xz|zip, optional — see archive-pack)
         Output: text — per-stage counts and archive summary
-        Exit codes: 0 = success, 1 = start > end or dirs missing
-        Side effects: writes PHASE-SUMMARIES.md, deletes artifact files, moves phase dirs
+        Exit codes: 0 = success, 1 = start > end, dirs missing or a journal for a different range
+        Side effects: writes PHASE-SUMMARIES.md and its offset index, deletes artifact files, moves phase dirs,
+                      records HEAD as the milestone boundary in boundary.json,
+                      writes/removes .archive-journal.json while running,
+                      with --pack replaces milestones/<slug>/phases/ by phases.<format> + phases.index.json
     """
     start = args.start_phase
     end = args.end_phase
@@ -2069,71 +4197,332 @@ def cmd_archive_milestone_phases(args: argparse.Namespace) -> None:
         print("Run archive_milestone step first to create it")
         sys.exit(1)
 
-    # Stage 1: Consolidate summaries
-    summaries_file = milestone_dir / "PHASE-SUMMARIES.md"
-    summary_count = 0
-    lines = [f"# Phase Summaries: {milestone}", ""]
-
-    for d in sorted(phases_dir.iterdir()):
-        if not d.is_dir():
-            continue
-        dirname = d.name
-        phase_num = dirname.split("-", 1)[0]
-        phase_name = dirname.split("-", 1)[1] if "-" in dirname else dirname
+    journal_path = milestone_dir / _ARCHIVE_JOURNAL_FILE
+    journal = _read_json_cache(journal_path)
+    if isinstance(journal, dict):
+        if journal.get("range") != [start, end]:
+            first, last = journal.get("range", ["?", "?"])
+            print(f"Error: An archive of phases {first}-{last} is in progress ({journal_path})", file=sys.stderr)
+            print(f"Rerun with phases {first} {last} to finish it", file=sys.stderr)
+            sys.exit(1)
+        print(f"Resuming archive from {_ARCHIVE_JOURNAL_FILE} ({len(journal['moved'])}/{len(journal['phases'])} phases moved)")
+    else:
+        journal = {
+            "range": [start, end],
+            "phases": _archive_phase_dirs(phases_dir, start, end),
+            "summaries": None,
+            "deleted": 0,
+            "moved": [],
+        }
+        _write_config_atomic(journal_path, journal)
 
-        if in_range(phase_num, start, end):
-            summary_files = sorted(d.glob("*-SUMMARY.md"))
-            if summary_files:
-                lines.append(f"## Phase {phase_num}: {phase_name}")
-                lines.append("")
-                for f in summary_files:
-                    plan_id = f.stem.replace("-SUMMARY", "")
-                    lines.append(f"### {plan_id}")
-                    lines.append("")
-                    lines.append(f.read_text(encoding="utf-8"))
-                    lines.append("")
-                    summary_count += 1
-
-    summaries_file.write_text("\n".join(lines), encoding="utf-8")
+    # Stage 1: Consolidate summaries (skipped on resume once written)
+    if journal["summaries"] is None:
+        journal["summaries"] = _write_phase_summaries(
+            milestone_dir / "PHASE-SUMMARIES.md", milestone, phases_dir, journal["phases"]
+        )
+        _write_config_atomic(journal_path, journal)
+    summary_count = journal["summaries"]
     print(f"Stage 1: Consolidated {summary_count} summaries to PHASE-SUMMARIES.md")
 
-    # Stage 2: Delete artifacts
-    deleted = 0
-    artifact_patterns = [
-        "*-CONTEXT.md", "*-DESIGN.md", "*-RESEARCH.md",
-        "*-SUMMARY.md", "*-UAT.md", "*-VERIFICATION.md",
-        "*-EXECUTION-ORDER.md",
-    ]
-    for d in sorted(phases_dir.iterdir()):
-        if not d.is_dir():
-            continue
-        phase_num = d.name.split("-", 1)[0]
-        if in_range(phase_num, start, end):
-            for pattern in artifact_patterns:
-                for f in d.glob(pattern):
-                    f.unlink()
-                    deleted += 1
-
-    print(f"Stage 2: Deleted {deleted} artifact files")
-
-    # Stage 3: Move phase directories
+    # Stages 2-3: Delete artifacts and move each phase directory, one phase at a time
     archive_phases = milestone_dir / "phases"
     archive_phases.mkdir(exist_ok=True)
-    moved = 0
-
-    for d in sorted(phases_dir.iterdir()):
-        if not d.is_dir():
+    for dirname in journal["phases"]:
+        if dirname in journal["moved"]:
             continue
-        phase_num = d.name.split("-", 1)[0]
-        if in_range(phase_num, start, end):
-            shutil.move(str(d), str(archive_phases / d.name))
-            moved += 1
+        src = phases_dir / dirname
+        if src.is_dir():
+            with os.scandir(src) as it:
+                artifacts = [e.path for e in it if e.is_file() and e.name.endswith(_ARCHIVE_ARTIFACT_SUFFIXES)]
+            for path in artifacts:
+                os.unlink(path)
+            journal["deleted"] += len(artifacts)
+            _write_config_atomic(journal_path, journal)
+            shutil.move(str(src), str(archive_phases / dirname))
+        journal["moved"].append(dirname)
+        _write_config_atomic(journal_path, journal)
+    deleted = journal["deleted"]
+    moved = len(journal["moved"])
 
+    print(f"Stage 2: Deleted {deleted} artifact files")
     print(f"Stage 3: Moved {moved} phase directories to milestones/{milestone}/phases/")
+
+    # Stage 4: Record boundary so later phase-commit searches start after this milestone
+    head = _git_session().resolve("HEAD")
+    if head is None:
+        print("Stage 4: Skipped boundary (no commits yet)")
+    else:
+        _write_config_atomic(milestone_dir / _BOUNDARY_FILE, {
+            "commit": head,
+            "recorded": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "phases": [start, end],
+        })
+        print(f"Stage 4: Recorded milestone boundary {head[:7]} in milestones/{milestone}/{_BOUNDARY_FILE}")
+
+    # Stage 5: Optionally pack the archived phase dirs into a single archive
+    pack = getattr(args, "pack", None)
+    if pack:
+        index = pack_milestone_phases(milestone_dir, pack)
+        print(f"Stage 5: Packed {len(index['members'])} files into milestones/{milestone}/{index['archive']}")
+    journal_path.unlink(missing_ok=True)
     print()
     print(f"Archive complete: {summary_count} summaries, {deleted} artifacts deleted, {moved} dirs moved")
 
 
+# ===================================================================
+# Subcommands: archive-pack / archive-ls / archive-cat
+# ===================================================================
+
+
+ARCHIVE_PACK_FORMATS = {"tar.xz": "phases.tar.xz", "zip": "phases.zip"}
+_ARCHIVE_INDEX_FILE = "phases.index.json"
+_ARCHIVE_INDEX_VERSION = 1
+
+
+def _load_archive_index(milestone_dir: Path) -> dict | None:
+    """The packed-phases member index for a milestone, or None when not packed."""
+    index = _read_json_cache(milestone_dir / _ARCHIVE_INDEX_FILE)
+    if not isinstance(index, dict) or index.get("version") != _ARCHIVE_INDEX_VERSION:
+        return None
+    if not (milestone_dir / index.get("archive", "")).is_file():
+        return None
+    return index
+
+
+def _archive_member_opener(milestone_dir: Path, index: dict, member: str) -> Any:
+    """Context manager yielding a binary stream of one packed member.
+
+    zip members are opened directly; tar.xz members are reached by seeking
+    the decompressed stream to the indexed data offset, so no tar headers are
+    parsed and nothing is extracted.
+    """
+    archive = milestone_dir / index["archive"]
+    entry = index["members"][member]
+    if index["format"] == "zip":
+        zf = zipfile.ZipFile(archive)
+        return _ClosingStream(zf.open(member), zf)
+    stream = lzma.open(archive)
+    stream.seek(entry["offset"])
+    return _ClosingStream(_LimitedReader(stream, entry["size"]), stream)
+
+
+class _LimitedReader:
+    """Read at most *size* bytes from an underlying binary stream."""
+
+    def __init__(self, stream: BinaryIO, size: int) -> None:
+        self._stream = stream
+        self._remaining = size
+
+    def read(self, n: int = -1) -> bytes:
+        if n < 0 or n > self._remaining:
+            n = self._remaining
+        data = self._stream.read(n)
+        self._remaining -= len(data)
+        return data
+
+
+class _ClosingStream:
+    """Wrap a reader so closing it (or leaving its ``with`` block) closes its owners too."""
+
+    def __init__(self, reader: Any, *owners: Any) -> None:
+        self._reader = reader
+        self._owners = owners
+
+    def read(self, n: int = -1) -> bytes:
+        return self._reader.read(n)
+
+    def close(self) -> None:
+        for obj in (self._reader, *self._owners):
+            if hasattr(obj, "close"):
+                obj.close()
+
+    def __enter__(self) -> "_ClosingStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def pack_milestone_phases(milestone_dir: Path, fmt: str) -> dict:
+    """Pack milestones/<slug>/phases/ into one archive plus a member index; returns the index.
+
+    Members already packed are kept (a new file with the same path wins), so
+    packing again after archiving more phases, switching format or an
+    interrupted run loses nothing. The archive and index are written to temp
+    files and renamed before the phases directory is removed.
+    """
+    phases_dir = milestone_dir / "phases"
+    old_index = _load_archive_index(milestone_dir)
+    loose: dict[str, Path] = {}
+    if phases_dir.is_dir():
+        for path in sorted(phases_dir.rglob("*")):
+            if path.is_file():
+                loose[path.relative_to(phases_dir).as_posix()] = path
+    kept = [m for m in (old_index["members"] if old_index else {}) if m not in loose]
+
+    archive = milestone_dir / ARCHIVE_PACK_FORMATS[fmt]
+    tmp = archive.with_name(f"{archive.name}.{os.getpid()}.tmp")
+    try:
+        if fmt == "zip":
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                for member in kept:
+                    with _archive_member_opener(milestone_dir, old_index, member) as src, zf.open(member, "w") as dst:
+                        shutil.copyfileobj(src, dst, _PATCH_CHUNK_SIZE)
+                for member, path in loose.items():
+                    zf.write(path, member)
+            with zipfile.ZipFile(tmp) as zf:
+                members = {
+                    info.filename: {"offset": info.header_offset, "size": info.file_size}
+                    for info in zf.infolist() if not info.is_dir()
+                }
+        else:
+            with tarfile.open(tmp, "w:xz") as tf:
+                if kept and old_index["format"] == "tar.xz":
+                    # One sequential pass over the old archive instead of a seek per member
+                    wanted = set(kept)
+                    with tarfile.open(milestone_dir / old_index["archive"], "r:xz") as old:
+                        for info in old:
+                            if info.isfile() and info.name in wanted:
+                                tf.addfile(info, old.extractfile(info))
+                else:
+                    for member in kept:
+                        info = tarfile.TarInfo(member)
+                        info.size = old_index["members"][member]["size"]
+                        with _archive_member_opener(milestone_dir, old_index, member) as src:
+                            tf.addfile(info, src)
+                for member, path in loose.items():
+                    tf.add(path, arcname=member, recursive=False)
+            with tarfile.open(tmp, "r:xz") as tf:
+                members = {info.name: {"offset": info.offset_data, "size": info.size} for info in tf if info.isfile()}
+        os.replace(str(tmp), str(archive))
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    index = {
+        "version": _ARCHIVE_INDEX_VERSION,
+        "format": fmt,
+        "archive": archive.name,
+        "members": dict(sorted(members.items())),
+    }
+    _write_config_atomic(milestone_dir / _ARCHIVE_INDEX_FILE, index)
+    if old_index and old_index["archive"] != archive.name:
+        (milestone_dir / old_index["archive"]).unlink(missing_ok=True)
+    if phases_dir.is_dir():
+        shutil.rmtree(phases_dir)
+    return index
+
+
+def _milestone_dir_or_exit(milestone: str) -> Path:
+    milestone_dir = find_git_root() / ".planning" / "milestones" / milestone
+    if not milestone_dir.is_dir():
+        print(f"Error: Milestone directory not found at {milestone_dir}", file=sys.stderr)
+        sys.exit(1)
+    return milestone_dir
+
+
+def _milestone_members(milestone_dir: Path) -> tuple[str, dict[str, int]]:
+    """(state, {member path: size}) for a milestone's phases, packed or loose."""
+    index = _load_archive_index(milestone_dir)
+    if index is not None:
+        return index["format"], {m: e["size"] for m, e in index["members"].items()}
+    phases_dir = milestone_dir / "phases"
+    if not phases_dir.is_dir():
+        return "none", {}
+    files = {
+        p.relative_to(phases_dir).as_posix(): p.stat().st_size
+        for p in sorted(phases_dir.rglob("*")) if p.is_file()
+    }
+    return "unpacked", files
+
+
+def cmd_archive_pack(args: argparse.Namespace) -> None:
+    """Pack a milestone's archived phase directories into one compressed archive.
+
+    tar.xz compresses best; zip (deflate) gives true random access per member.
+    Either way phases.index.json maps each member to its offset and size.
+
+    Contract:
+        Args: milestone (str — slug), --format (tar.xz|zip, default tar.xz)
+        Output: text — member count and archive path
+        Exit codes: 0 = success (including nothing to pack), 1 = milestone directory missing
+        Side effects: writes phases.<format> and phases.index.json, removes milestones/<slug>/phases/
+    """
+    milestone_dir = _milestone_dir_or_exit(args.milestone)
+    if not (milestone_dir / "phases").is_dir() and _load_archive_index(milestone_dir) is None:
+        print(f"Nothing to pack: milestones/{args.milestone}/phases/ not found")
+        return
+    index = pack_milestone_phases(milestone_dir, args.format)
+    size = (milestone_dir / index["archive"]).stat().st_size
+    print(f"Packed {len(index['members'])} files into milestones/{args.milestone}/{index['archive']} ({size} bytes)")
+
+
+def cmd_archive_ls(args: argparse.Namespace) -> None:
+    """List milestone archives, or the phase files inside one.
+
+    Contract:
+        Args: milestone (str, optional), --json (flag)
+        Output: text — without milestone: one line per milestone with its state and file count;
+                with milestone: "<size>  <path>" per archived phase file
+                JSON — {milestone: {state, files}} or {state, files: {path: size}} (--json)
+        Exit codes: 0 = success, 1 = milestone directory missing
+        Side effects: read-only
+    """
+    if args.milestone:
+        state, files = _milestone_members(_milestone_dir_or_exit(args.milestone))
+        if args.json:
+            json.dump({"state": state, "files": files}, sys.stdout, cls=_SafeEncoder)
+            print()
+            return
+        for path, size in files.items():
+            print(f"{size:>10}  {path}")
+        return
+
+    milestones_dir = find_git_root() / ".planning" / "milestones"
+    summary: dict[str, dict[str, Any]] = {}
+    if milestones_dir.is_dir():
+        for d in sorted(milestones_dir.iterdir()):
+            if d.is_dir():
+                state, files = _milestone_members(d)
+                summary[d.name] = {"state": state, "files": len(files)}
+    if args.json:
+        json.dump(summary, sys.stdout, cls=_SafeEncoder)
+        print()
+        return
+    for name, info in summary.items():
+        print(f"{name}: {info['state']} ({info['files']} files)")
+
+
+def cmd_archive_cat(args: argparse.Namespace) -> None:
+    """Print one archived phase file without extracting the milestone archive.
+
+    Contract:
+        Args: milestone (str — slug), path (str — relative to phases/, "phases/" prefix optional)
+        Output: raw file bytes on stdout
+        Exit codes: 0 = success, 1 = milestone or file not found
+        Side effects: read-only
+    """
+    milestone_dir = _milestone_dir_or_exit(args.milestone)
+    member = args.path.removeprefix("./").removeprefix("phases/")
+    out = sys.stdout.buffer
+
+    index = _load_archive_index(milestone_dir)
+    if index is not None and member in index["members"]:
+        with _archive_member_opener(milestone_dir, index, member) as src:
+            while chunk := src.read(_PATCH_CHUNK_SIZE):
+                out.write(chunk)
+        out.flush()
+        return
+
+    loose = milestone_dir / "phases" / member
+    if not loose.is_file():
+        print(f"Error: {member} not found in milestones/{args.milestone}", file=sys.stderr)
+        sys.exit(1)
+    with loose.open("rb") as src:
+        shutil.copyfileobj(src, out, _PATCH_CHUNK_SIZE)
+    out.flush()
+
+
 # ===================================================================
 # Subcommand: archive-milestone-files
 # ===================================================================
@@ -2401,7 +4790,7 @@ def cmd_find_phase(args: argparse.Namespace) -> None:
     phase_input = args.phase
     phase = normalize_phase(phase_input)
 
-    git_root = find_git_root()
+    git_root = _read_root()
     planning = git_root / ".planning"
 
     result: dict[str, Any] = {
@@ -2479,35 +4868,42 @@ def cmd_list_artifacts(args: argparse.Namespace) -> None:
 # ===================================================================
 
 
-def _parse_phase_section(roadmap_text: str, phase: str) -> dict[str, Any] | None:
+def _parse_phase_section(roadmap: "MarkdownArtifact | str", phase: str) -> dict[str, Any] | None:
     """Parse a phase section from ROADMAP.md for pre-work flags.
 
-    Returns dict with name, goal, and prework flags, or None if phase not found.
+    Accepts a loaded MarkdownArtifact (callers checking several phases index
+    the roadmap once) or raw text. Returns dict with name, goal, and prework
+    flags, or None if phase not found.
     """
+    if isinstance(roadmap, str):
+        roadmap = MarkdownArtifact(roadmap, has_frontmatter=False)
+
     # Try both padded ("08") and unpadded ("8") forms
     raw_match = re.match(r"^0*(\d.*)", phase)
     raw = raw_match.group(1) if raw_match else phase
     candidates = [phase] if raw == phase else [phase, raw]
 
+    heading = None
     match = None
     for candidate in candidates:
-        pattern = rf"### Phase\s+{re.escape(candidate)}:\s*(.+)"
-        match = re.search(pattern, roadmap_text)
+        pattern = re.compile(rf"Phase\s+{re.escape(candidate)}:\s*(.+)")
+        for h in roadmap.headings:
+            if h[0] == 3:
+                match = pattern.match(h[1])
+                if match:
+                    heading = h
+                    break
         if match:
             break
 
-    if not match:
+    if heading is None or match is None:
         return None
 
     phase_name = match.group(1).strip()
 
-    # Extract section text until next "### " or end
-    start = match.start()
-    next_section = re.search(r"\n### ", roadmap_text[start + 1:])
-    if next_section:
-        section = roadmap_text[start : start + 1 + next_section.start()]
-    else:
-        section = roadmap_text[start:]
+    # Section runs from the heading to the next "## "/"### " heading or end
+    _, _, start, _, end = heading
+    section = roadmap.text[start:end]
 
     # Extract goal
     goal_match = re.search(r"\*\*Goal\*\*:\s*(.+)", section)
@@ -2614,8 +5010,8 @@ def cmd_prework_status(args: argparse.Namespace) -> None:
         print("Error: No ROADMAP.md found", file=sys.stderr)
         sys.exit(1)
 
-    roadmap_text = roadmap.read_text(encoding="utf-8")
-    phase_info = _parse_phase_section(roadmap_text, phase)
+    roadmap_doc = MarkdownArtifact.load(roadmap)
+    phase_info = _parse_phase_section(roadmap_doc, phase) if roadmap_doc is not None else None
     if not phase_info:
         print(f"Error: Phase {phase} not found in ROADMAP.md", file=sys.stderr)
         sys.exit(1)
@@ -2742,18 +5138,15 @@ def cmd_check_artifact(args: argparse.Namespace) -> None:
 
 def _has_readiness_section(path: Path) -> bool:
     """Check if file has a non-empty '## Next Phase Readiness' section."""
-    try:
-        text = path.read_text(encoding="utf-8", errors="replace")
-    except OSError:
-        return False
+    doc = MarkdownArtifact.load(path)
+    return doc is not None and _artifact_has_readiness(doc)
 
-    idx = text.find("## Next Phase Readiness")
-    if idx == -1:
-        return False
 
-    after = text[idx + len("## Next Phase Readiness"):]
-    next_heading = re.search(r"\n## ", after)
-    section = after[:next_heading.start()] if next_heading else after
+def _artifact_has_readiness(doc: MarkdownArtifact) -> bool:
+    """_has_readiness_section for an already-loaded artifact."""
+    section = doc.section("Next Phase Readiness")
+    if section is None:
+        return False
     stripped = section.strip().strip("-").strip()
     return len(stripped) > 0
 
@@ -2770,14 +5163,151 @@ def _is_adjacent_phase(target_num: int, candidate_num: int) -> bool:
     return 1 <= diff <= 2
 
 
+# ---------------------------------------------------------------------------
+# Body relevance (BM25 over cached term vectors)
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+# Applies to scores divided by the idf of a term found in a single summary, so
+# it means the same with 3 summaries as with 300: one mention of a distinctive
+# keyword in an average-length body clears it; terms that appear in most
+# summaries carry little idf relative to that ceiling and fall below it
+_BM25_MEDIUM_THRESHOLD = 1.0
+_TERM_VECTOR_CACHE = "term-vectors.json"
+_TERM_VECTOR_VERSION = 1
+
+
+def _tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens, dropping single characters."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+def _term_vector(path: Path) -> dict[str, Any]:
+    """Term frequencies and token count for a markdown body (frontmatter excluded)."""
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return {"length": 0, "tf": {}}
+    match = _FRONTMATTER_RE.match(text)
+    if match:
+        text = text[match.end():]
+    tf: dict[str, int] = {}
+    tokens = _tokenize(text)
+    for token in tokens:
+        tf[token] = tf.get(token, 0) + 1
+    return {"length": len(tokens), "tf": tf}
+
+
+def _load_term_vectors(planning: Path, paths: list[Path]) -> list[dict[str, Any]]:
+    """Return term vectors for *paths*, reusing cached ones whose fingerprint matches.
+
+    Fingerprint is (mtime_ns, size). The cache lives in the tool cache dir and is
+    rewritten only when an entry was added, refreshed, or dropped.
+    """
+    cache_dir = _tool_cache_dir(planning.parent)
+    cache_path = cache_dir / _TERM_VECTOR_CACHE if cache_dir else None
+    cached: dict[str, Any] = {}
+    if cache_path is not None:
+        data = _read_json_cache(cache_path)
+        if isinstance(data, dict) and data.get("version") == _TERM_VECTOR_VERSION:
+            cached = data.get("entries", {})
+
+    entries: dict[str, Any] = {}
+    vectors: list[dict[str, Any]] = []
+    dirty = False
+    for path in paths:
+        try:
+            if isinstance(path, _EmbeddedSummary):
+                fingerprint = path.fingerprint()
+            elif isinstance(path, RevPath):
+                fingerprint = [path.oid] if path.oid else None  # blob ids are immutable
+            else:
+                st = path.stat()
+                fingerprint = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            fingerprint = None
+        key = str(path.relative_to(planning)) if path.is_relative_to(planning) else str(path)
+        entry = cached.get(key)
+        if entry is None or fingerprint is None or entry.get("fingerprint") != fingerprint:
+            entry = {"fingerprint": fingerprint, **_term_vector(path)}
+            dirty = True
+        entries[key] = entry
+        vectors.append(entry)
+
+    if cache_path is not None and (dirty or len(entries) != len(cached)):
+        _write_json_cache(cache_path, {"version": _TERM_VECTOR_VERSION, "entries": entries})
+    return vectors
+
+
+def _bm25_idf(n_docs: int, df: int) -> float:
+    """Non-negative BM25 idf of a term found in *df* of *n_docs* documents."""
+    return math.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+
+
+def _bm25_scores(vectors: list[dict[str, Any]], terms: list[str]) -> list[float]:
+    """BM25 score of each document for the query *terms*, computed in one batch."""
+    n_docs = len(vectors)
+    if n_docs == 0 or not terms:
+        return [0.0] * n_docs
+    lengths = [v["length"] for v in vectors]
+    avgdl = (sum(lengths) / n_docs) or 1.0
+    tf_rows = [[v["tf"].get(t, 0) for t in terms] for v in vectors]
+    df = [sum(1 for row in tf_rows if row[j]) for j in range(len(terms))]
+
+    if np is not None:
+        tf = np.asarray(tf_rows, dtype=float)
+        dl = np.asarray(lengths, dtype=float)[:, None]
+        idf = np.log((n_docs - np.asarray(df, dtype=float) + 0.5) / (np.asarray(df, dtype=float) + 0.5) + 1.0)
+        norm = _BM25_K1 * (1.0 - _BM25_B + _BM25_B * dl / avgdl)
+        return [float(x) for x in (idf * tf * (_BM25_K1 + 1.0) / (tf + norm)).sum(axis=1)]
+
+    idf = [_bm25_idf(n_docs, d) for d in df]
+    scores: list[float] = []
+    for row, length in zip(tf_rows, lengths):
+        norm = _BM25_K1 * (1.0 - _BM25_B + _BM25_B * length / avgdl)
+        scores.append(sum(
+            w * f * (_BM25_K1 + 1.0) / (f + norm) for w, f in zip(idf, row) if f
+        ))
+    return scores
+
+
+def _summary_body_matches(
+    planning: Path,
+    paths: list[Path],
+    keywords: list[str],
+) -> dict[str, tuple[float, list[str]]]:
+    """Map summary path to (BM25 score, matched terms) for bodies that mention *keywords*.
+
+    Scores are divided by the idf of a term unique to one summary, which
+    takes the corpus size out of the comparison with _BM25_MEDIUM_THRESHOLD.
+    """
+    terms = list(dict.fromkeys(t for k in keywords for t in _tokenize(k)))
+    if not terms or not paths:
+        return {}
+    vectors = _load_term_vectors(planning, paths)
+    ceiling = _bm25_idf(len(vectors), 1)
+    matches: dict[str, tuple[float, list[str]]] = {}
+    for path, vector, score in zip(paths, vectors, _bm25_scores(vectors, terms)):
+        if score > 0:
+            matches[str(path)] = (score / ceiling, [t for t in terms if t in vector["tf"]])
+    return matches
+
+
 def _score_summary(
     fm: dict[str, Any],
     target_phase: str,
     target_num: int | None,
     subsystems: list[str],
     keywords: list[str],
+    body_match: tuple[float, list[str]] | None = None,
 ) -> tuple[str, list[str]]:
-    """Score a SUMMARY's relevance to the target phase."""
+    """Score a SUMMARY's relevance to the target phase.
+
+    body_match is the (normalised BM25 score, matched terms) from _summary_body_matches;
+    scores at or above _BM25_MEDIUM_THRESHOLD add a MEDIUM signal.
+    """
     reasons: list[str] = []
     is_high = False
     is_medium = False
@@ -2818,44 +5348,209 @@ def _score_summary(
         reasons.append(f"overlapping tags: {sorted(overlap)}")
         is_medium = True
 
-    fm_phase = fm.get("phase", "")
-    candidate_num = _extract_phase_number(str(fm_phase))
-    if target_num is not None and candidate_num is not None:
-        if _is_adjacent_phase(target_num, candidate_num):
-            reasons.append(f"adjacent phase (N-{target_num - candidate_num})")
-            is_medium = True
+    fm_phase = fm.get("phase", "")
+    candidate_num = _extract_phase_number(str(fm_phase))
+    if target_num is not None and candidate_num is not None:
+        if _is_adjacent_phase(target_num, candidate_num):
+            reasons.append(f"adjacent phase (N-{target_num - candidate_num})")
+            is_medium = True
+
+    if body_match is not None and body_match[0] >= _BM25_MEDIUM_THRESHOLD:
+        score, terms = body_match
+        reasons.append(f"body mentions {terms} (bm25 {score:.2f})")
+        is_medium = True
+
+    if is_high:
+        return ("HIGH", reasons)
+    if is_medium:
+        return ("MEDIUM", reasons)
+    return ("LOW", reasons)
+
+
+def _transitive_phases(fm: dict[str, Any], target_phase: str) -> set[str]:
+    """Phases pulled into the requires chain by one SUMMARY's frontmatter."""
+    affects = fm.get("affects", []) or []
+    if isinstance(affects, str):
+        affects = [affects]
+    if not any(target_phase in str(a) for a in affects):
+        return set()
+
+    required = {str(fm.get("phase", ""))}
+    requires = fm.get("requires", []) or []
+    if isinstance(requires, list):
+        for req in requires:
+            if isinstance(req, dict):
+                req_phase = str(req.get("phase", ""))
+            else:
+                req_phase = str(req)
+            if req_phase:
+                required.add(req_phase)
+    return required
+
+
+def _resolve_transitive_requires(
+    summaries: list[dict[str, Any]],
+    target_phase: str,
+) -> set[str]:
+    """Find all phases transitively required by the target phase."""
+    required: set[str] = set()
+    for s in summaries:
+        required |= _transitive_phases(s.get("frontmatter", {}), target_phase)
+    return required
+
+
+def _apply_transitive_upgrade(entry: dict[str, Any], transitive: set[str]) -> None:
+    """Upgrade a non-HIGH summary to HIGH when its phase is in the requires chain."""
+    phase_name = str(entry["frontmatter"].get("phase", ""))
+    if phase_name in transitive and entry["relevance"] != "HIGH":
+        entry["relevance"] = "HIGH"
+        entry["match_reasons"].append("in transitive requires chain")
+
+
+class _EmbeddedSummary:
+    """A SUMMARY embedded in a milestone's PHASE-SUMMARIES.md, located by its offset index.
+
+    Frontmatter and readiness come from the index; the body is only read
+    (as one byte range) when keyword matching needs it. ``str()`` is a unique
+    key (the consolidated file plus a ``#L12-L40`` anchor) for internal
+    lookups; scan output reports the real file and line range separately
+    (see _summary_location).
+    """
+
+    def __init__(self, source: "Path | RevPath", entry: dict[str, Any]) -> None:
+        self.source = source
+        self.offset = int(entry["offset"])
+        self.length = int(entry["length"])
+        self.lines = entry.get("lines") or [0, 0]
+        self.name = f"{entry.get('plan', '')}-SUMMARY.md"
+        self.frontmatter: dict[str, Any] = entry["frontmatter"]
+        self.readiness = bool(entry.get("readiness"))
+
+    def __str__(self) -> str:
+        return f"{self.source}#L{self.lines[0]}-L{self.lines[1]}"
+
+    def fingerprint(self) -> list[Any] | None:
+        """Identity of the byte range for the term-vector cache."""
+        if isinstance(self.source, RevPath):
+            return [self.source.oid, self.offset, self.length]
+        try:
+            st = self.source.stat()
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size, self.offset, self.length]
+
+    def is_relative_to(self, other: Any) -> bool:
+        return False
+
+    def read_text(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        if isinstance(self.source, RevPath):
+            data = self.source.read_bytes()[self.offset:self.offset + self.length]
+        else:
+            with open(self.source, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(self.length)
+        return data.decode(encoding, errors)
+
+
+def _summary_location(path: "Path | RevPath | _EmbeddedSummary") -> dict[str, Any]:
+    """``{"path"}`` for a summary record, plus ``"lines": [start, end]`` for an archived one."""
+    if isinstance(path, _EmbeddedSummary):
+        return {"path": str(path.source), "lines": list(path.lines)}
+    return {"path": str(path)}
+
+
+def _archived_summaries(planning: Path) -> list[_EmbeddedSummary]:
+    """Summaries from every milestone's PHASE-SUMMARIES.index.json (entries without frontmatter are skipped)."""
+    milestones_dir = planning / "milestones"
+    if not milestones_dir.is_dir():
+        return []
+    summaries: list[_EmbeddedSummary] = []
+    for index_path in sorted(milestones_dir.glob(f"*/{_SUMMARY_INDEX_FILE}")):
+        index = _read_json_cache(index_path)
+        if not isinstance(index, dict) or index.get("version") != _SUMMARY_INDEX_VERSION:
+            continue
+        source = index_path.parent / index.get("file", "PHASE-SUMMARIES.md")
+        summaries.extend(
+            _EmbeddedSummary(source, entry)
+            for entry in index.get("summaries", [])
+            if isinstance(entry.get("frontmatter"), dict)
+        )
+    return summaries
+
+
+def _iter_summary_docs(
+    planning: Path,
+    keywords: list[str],
+    parse_errors: list[dict[str, str]] | None,
+) -> tuple[Iterator[tuple[Path, dict[str, Any], bool, tuple[float, list[str]] | None]], dict[str, Any]]:
+    """Lazily load phase summaries as (path, frontmatter, has_readiness, body_match).
+
+    Target-independent half of summary scanning: each file is read once and
+    can then be scored against any number of phases. source_info counts files
+    as the iterator is consumed. Pass parse_errors=None to re-walk the tree
+    without counting or re-reporting errors. Summaries archived into
+    milestones/*/PHASE-SUMMARIES.md come first, from their offset index.
+    """
+    phases_dir = planning / "phases"
+    source_info: dict[str, Any] = {"dir": str(phases_dir), "scanned": 0, "skipped": None}
+
+    archived = _archived_summaries(planning)
+    if archived:
+        source_info["archived"] = len(archived)
+    summary_files = sorted(phases_dir.glob("*/*-SUMMARY.md")) if phases_dir.is_dir() else []
+    if not summary_files and not archived:
+        source_info["skipped"] = "directory not found" if not phases_dir.is_dir() else "no SUMMARY.md files found"
+        return iter(()), source_info
+
+    def docs() -> Iterator[tuple[Path, dict[str, Any], bool, tuple[float, list[str]] | None]]:
+        body_matches = _summary_body_matches(planning, [*summary_files, *archived], keywords)
+        for summary in archived:
+            if parse_errors is not None:
+                source_info["scanned"] += 1
+            yield summary, summary.frontmatter, summary.readiness, body_matches.get(str(summary))
+        for path in summary_files:
+            if parse_errors is not None:
+                source_info["scanned"] += 1
+            doc = MarkdownArtifact.load(path)
+            fm = doc.frontmatter if doc is not None else None
+            if fm is None:
+                if parse_errors is not None:
+                    parse_errors.append({"path": str(path), "error": "no valid frontmatter"})
+                continue
+            yield path, fm, _artifact_has_readiness(doc), body_matches.get(str(path))
 
-    if is_high:
-        return ("HIGH", reasons)
-    if is_medium:
-        return ("MEDIUM", reasons)
-    return ("LOW", reasons)
+    return docs(), source_info
 
 
-def _resolve_transitive_requires(
-    summaries: list[dict[str, Any]],
+def _iter_summaries(
+    planning: Path,
     target_phase: str,
-) -> set[str]:
-    """Find all phases transitively required by the target phase."""
-    required: set[str] = set()
-    for s in summaries:
-        fm = s.get("frontmatter", {})
-        phase_name = str(fm.get("phase", ""))
-        affects = fm.get("affects", []) or []
-        if isinstance(affects, str):
-            affects = [affects]
-        if any(target_phase in str(a) for a in affects):
-            required.add(phase_name)
-            requires = fm.get("requires", []) or []
-            if isinstance(requires, list):
-                for req in requires:
-                    if isinstance(req, dict):
-                        req_phase = str(req.get("phase", ""))
-                    else:
-                        req_phase = str(req)
-                    if req_phase:
-                        required.add(req_phase)
-    return required
+    target_num: int | None,
+    subsystems: list[str],
+    keywords: list[str],
+    parse_errors: list[dict[str, str]] | None,
+) -> tuple[Iterator[dict[str, Any]], dict[str, Any]]:
+    """Lazily score phase summary files (before transitive upgrades).
+
+    source_info counts files as the iterator is consumed. Pass parse_errors=None
+    to re-walk the tree without counting or re-reporting errors.
+    """
+    docs, source_info = _iter_summary_docs(planning, keywords, parse_errors)
+
+    def records() -> Iterator[dict[str, Any]]:
+        for path, fm, readiness, body_match in docs:
+            relevance, match_reasons = _score_summary(
+                fm, target_phase, target_num, subsystems, keywords, body_match,
+            )
+            yield {
+                **_summary_location(path),
+                "frontmatter": fm,
+                "relevance": relevance,
+                "match_reasons": match_reasons,
+                "has_readiness_warnings": readiness,
+            }
+
+    return records(), source_info
 
 
 def _scan_summaries(
@@ -2867,252 +5562,407 @@ def _scan_summaries(
     parse_errors: list[dict[str, str]],
 ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
     """Scan phase summary files and score relevance."""
-    phases_dir = planning / "phases"
-    source_info: dict[str, Any] = {"dir": str(phases_dir), "scanned": 0, "skipped": None}
+    records, source_info = _iter_summaries(
+        planning, target_phase, target_num, subsystems, keywords, parse_errors,
+    )
+    results = list(records)
 
-    if not phases_dir.is_dir():
-        source_info["skipped"] = "directory not found"
-        return [], source_info
+    transitive = _resolve_transitive_requires(results, target_phase)
+    for entry in results:
+        _apply_transitive_upgrade(entry, transitive)
 
-    summary_files = sorted(phases_dir.glob("*/*-SUMMARY.md"))
-    if not summary_files:
-        source_info["skipped"] = "no SUMMARY.md files found"
-        return [], source_info
-
-    results: list[dict[str, Any]] = []
-    for path in summary_files:
-        source_info["scanned"] += 1
-        fm = parse_frontmatter(path)
-        if fm is None:
-            parse_errors.append({"path": str(path), "error": "no valid frontmatter"})
+    return results, source_info
+
+
+_RELEVANCE_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+
+
+def _scan_summaries_multi(
+    planning: Path,
+    target_phases: list[str],
+    subsystems: list[str],
+    keywords: list[str],
+    parse_errors: list[dict[str, str]],
+) -> tuple[list[dict[str, Any]], dict[str, list[dict[str, Any]]], dict[str, Any]]:
+    """Parse each summary once and score it against every target phase.
+
+    Returns (shared, per_phase, source_info). Shared entries carry path,
+    frontmatter, readiness and the best relevance across all targets (which
+    drives the shared aggregation); per_phase maps each target to its own
+    path/relevance/match_reasons list in path order.
+    """
+    docs, source_info = _iter_summary_docs(planning, keywords, parse_errors)
+    loaded = list(docs)
+
+    shared = [
+        {**_summary_location(path), "frontmatter": fm, "relevance": "LOW", "has_readiness_warnings": readiness}
+        for path, fm, readiness, _ in loaded
+    ]
+    per_phase: dict[str, list[dict[str, Any]]] = {}
+    for target_phase in target_phases:
+        target_num = _extract_phase_number(target_phase)
+        scored = []
+        for (_, fm, _, body_match), entry in zip(loaded, shared):
+            relevance, match_reasons = _score_summary(
+                fm, target_phase, target_num, subsystems, keywords, body_match,
+            )
+            scored.append({**entry, "relevance": relevance, "match_reasons": match_reasons})
+
+        transitive = _resolve_transitive_requires(scored, target_phase)
+        phase_list: list[dict[str, Any]] = []
+        for (path, *_), entry, base in zip(loaded, scored, shared):
+            _apply_transitive_upgrade(entry, transitive)
+            if _RELEVANCE_RANK[entry["relevance"]] > _RELEVANCE_RANK[base["relevance"]]:
+                base["relevance"] = entry["relevance"]
+            phase_list.append({
+                **_summary_location(path),
+                "relevance": entry["relevance"],
+                "match_reasons": entry["match_reasons"],
+                "has_readiness_warnings": entry["has_readiness_warnings"],
+            })
+        per_phase[target_phase] = phase_list
+
+    return shared, per_phase, source_info
+
+
+def _parse_phase_targets(value: str) -> list[str]:
+    """Parse ``--phase`` into normalized phases: "5", "5,6,7", "5-7" or a mix like "2.1,5-7".
+
+    Ranges expand over integer phases only. Duplicates are dropped, order kept.
+    Raises ValueError on a malformed range.
+    """
+    phases: list[str] = []
+    for part in (p.strip() for p in value.split(",")):
+        if not part:
             continue
+        range_match = re.match(r"^(\d+)\s*(?:-|\.\.)\s*(\d+)$", part)
+        if range_match:
+            start, end = int(range_match.group(1)), int(range_match.group(2))
+            if start > end:
+                raise ValueError(f"invalid phase range '{part}'")
+            phases.extend(normalize_phase(str(n)) for n in range(start, end + 1))
+        else:
+            phases.append(normalize_phase(part))
+    return list(dict.fromkeys(phases))
 
-        relevance, match_reasons = _score_summary(fm, target_phase, target_num, subsystems, keywords)
-        readiness = _has_readiness_section(path)
 
-        results.append({
-            "path": str(path),
-            "frontmatter": fm,
-            "relevance": relevance,
-            "match_reasons": match_reasons,
-            "has_readiness_warnings": readiness,
-        })
+def _stream_summaries(
+    planning: Path,
+    target_phase: str,
+    target_num: int | None,
+    subsystems: list[str],
+    keywords: list[str],
+    parse_errors: list[dict[str, str]],
+) -> tuple[Iterator[dict[str, Any]], dict[str, Any]]:
+    """Yield scored summaries HIGH-first without holding the result set.
 
-    transitive = _resolve_transitive_requires(results, target_phase)
-    for entry in results:
-        fm = entry["frontmatter"]
-        phase_name = str(fm.get("phase", ""))
-        if phase_name in transitive and entry["relevance"] != "HIGH":
-            entry["relevance"] = "HIGH"
-            entry["match_reasons"].append("in transitive requires chain")
+    Transitive upgrades are only known once every HIGH summary has been seen
+    (only summaries whose affects match the target feed the requires chain, and
+    those are HIGH by definition). Pass 1 emits HIGH entries and collects the
+    chain; pass 2 re-walks the tree and emits the rest with upgrades applied.
+    """
+    first_pass, source_info = _iter_summaries(
+        planning, target_phase, target_num, subsystems, keywords, parse_errors,
+    )
 
-    return results, source_info
+    def records() -> Iterator[dict[str, Any]]:
+        transitive: set[str] = set()
+        for entry in first_pass:
+            if entry["relevance"] == "HIGH":
+                transitive |= _transitive_phases(entry["frontmatter"], target_phase)
+                yield entry
+
+        second_pass, _ = _iter_summaries(
+            planning, target_phase, target_num, subsystems, keywords, None,
+        )
+        for entry in second_pass:
+            if entry["relevance"] == "HIGH":
+                continue
+            _apply_transitive_upgrade(entry, transitive)
+            yield entry
 
+    return records(), source_info
 
-def _scan_debug_docs(
+
+def _iter_debug_docs(
     planning: Path,
     parse_errors: list[dict[str, str]],
-) -> tuple[list[dict[str, Any]], dict[str, Any]]:
-    """Scan resolved debug documents for learnings."""
+) -> tuple[Iterator[dict[str, Any]], dict[str, Any]]:
+    """Lazily scan resolved debug documents for learnings."""
     resolved_dir = planning / "debug" / "resolved"
     source_info: dict[str, Any] = {"dir": str(resolved_dir), "scanned": 0, "skipped": None}
 
     if not resolved_dir.is_dir():
         source_info["skipped"] = "directory not found"
-        return [], source_info
-
-    results: list[dict[str, Any]] = []
-    for path in sorted(resolved_dir.glob("*.md")):
-        source_info["scanned"] += 1
-        fm = parse_frontmatter(path)
-        if fm is None:
-            parse_errors.append({"path": str(path), "error": "no valid frontmatter"})
-            continue
+        return iter(()), source_info
+
+    def records() -> Iterator[dict[str, Any]]:
+        for path in sorted(resolved_dir.glob("*.md")):
+            source_info["scanned"] += 1
+            fm = parse_frontmatter(path)
+            if fm is None:
+                parse_errors.append({"path": str(path), "error": "no valid frontmatter"})
+                continue
 
-        results.append({
-            "path": str(path),
-            "slug": path.stem,
-            "subsystem": fm.get("subsystem", ""),
-            "root_cause": fm.get("root_cause", ""),
-            "resolution": fm.get("resolution", ""),
-            "tags": fm.get("tags", []) or [],
-            "phase": fm.get("phase", ""),
-        })
+            yield {
+                "path": str(path),
+                "slug": path.stem,
+                "subsystem": fm.get("subsystem", ""),
+                "root_cause": fm.get("root_cause", ""),
+                "resolution": fm.get("resolution", ""),
+                "tags": fm.get("tags", []) or [],
+                "phase": fm.get("phase", ""),
+            }
 
-    return results, source_info
+    return records(), source_info
 
 
-def _scan_adhoc_summaries(
+def _scan_debug_docs(
     planning: Path,
     parse_errors: list[dict[str, str]],
 ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
-    """Scan adhoc summary files for learnings."""
+    """Scan resolved debug documents for learnings."""
+    records, source_info = _iter_debug_docs(planning, parse_errors)
+    return list(records), source_info
+
+
+def _iter_adhoc_summaries(
+    planning: Path,
+    parse_errors: list[dict[str, str]],
+) -> tuple[Iterator[dict[str, Any]], dict[str, Any]]:
+    """Lazily scan adhoc summary files for learnings."""
     adhoc_dir = planning / "adhoc"
     source_info: dict[str, Any] = {"dir": str(adhoc_dir), "scanned": 0, "skipped": None}
 
     if not adhoc_dir.is_dir():
         source_info["skipped"] = "directory not found"
-        return [], source_info
+        return iter(()), source_info
 
     summary_files = sorted(adhoc_dir.glob("**/*-SUMMARY.md"))
     if not summary_files:
         source_info["skipped"] = "no adhoc SUMMARY.md files found"
-        return [], source_info
-
-    results: list[dict[str, Any]] = []
-    for path in summary_files:
-        source_info["scanned"] += 1
-        fm = parse_frontmatter(path)
-        if fm is None:
-            parse_errors.append({"path": str(path), "error": "no valid frontmatter"})
-            continue
+        return iter(()), source_info
+
+    def records() -> Iterator[dict[str, Any]]:
+        for path in summary_files:
+            source_info["scanned"] += 1
+            fm = parse_frontmatter(path)
+            if fm is None:
+                parse_errors.append({"path": str(path), "error": "no valid frontmatter"})
+                continue
 
-        learnings = fm.get("learnings", []) or []
-        if isinstance(learnings, str):
-            learnings = [learnings]
-        # Fallback: extract from key-decisions if learnings absent (phase-style SUMMARY)
-        if not learnings:
-            key_decisions = fm.get("key-decisions", []) or []
-            if isinstance(key_decisions, str):
-                key_decisions = [key_decisions]
-            learnings = key_decisions
-
-        results.append({
-            "path": str(path),
-            "subsystem": fm.get("subsystem", ""),
-            "learnings": learnings,
-            "related_phase": fm.get("related_phase", ""),
-            "tags": fm.get("tags", []) or [],
-        })
+            learnings = fm.get("learnings", []) or []
+            if isinstance(learnings, str):
+                learnings = [learnings]
+            # Fallback: extract from key-decisions if learnings absent (phase-style SUMMARY)
+            if not learnings:
+                key_decisions = fm.get("key-decisions", []) or []
+                if isinstance(key_decisions, str):
+                    key_decisions = [key_decisions]
+                learnings = key_decisions
+
+            yield {
+                "path": str(path),
+                "subsystem": fm.get("subsystem", ""),
+                "learnings": learnings,
+                "related_phase": fm.get("related_phase", ""),
+                "tags": fm.get("tags", []) or [],
+            }
 
-    return results, source_info
+    return records(), source_info
 
 
-def _scan_todos(
+def _scan_adhoc_summaries(
     planning: Path,
-    subdir: str,
     parse_errors: list[dict[str, str]],
 ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
-    """Scan todo files (done/ or root todos/) for metadata."""
+    """Scan adhoc summary files for learnings."""
+    records, source_info = _iter_adhoc_summaries(planning, parse_errors)
+    return list(records), source_info
+
+
+def _iter_todos(
+    planning: Path,
+    subdir: str,
+    parse_errors: list[dict[str, str]],
+) -> tuple[Iterator[dict[str, Any]], dict[str, Any]]:
+    """Lazily scan todo files (done/ or root todos/) for metadata."""
     todo_dir = planning / "todos" / subdir if subdir else planning / "todos"
     source_info: dict[str, Any] = {"dir": str(todo_dir), "scanned": 0, "skipped": None}
 
     if not todo_dir.is_dir():
         source_info["skipped"] = "directory not found"
-        return [], source_info
+        return iter(()), source_info
 
     md_files = sorted(todo_dir.glob("*.md"))
     if not md_files:
         label = f"{subdir}/" if subdir else "todos/"
         source_info["skipped"] = f"no .md files in {label}"
-        return [], source_info
-
-    results: list[dict[str, Any]] = []
-    for path in md_files:
-        source_info["scanned"] += 1
-        fm = parse_frontmatter(path)
-        if fm is None:
-            parse_errors.append({"path": str(path), "error": "no valid frontmatter"})
-            continue
+        return iter(()), source_info
+
+    def records() -> Iterator[dict[str, Any]]:
+        for path in md_files:
+            source_info["scanned"] += 1
+            fm = parse_frontmatter(path)
+            if fm is None:
+                parse_errors.append({"path": str(path), "error": "no valid frontmatter"})
+                continue
 
-        results.append({
-            "path": str(path),
-            "title": fm.get("title", path.stem),
-            "subsystem": fm.get("subsystem", ""),
-            "priority": fm.get("priority", ""),
-            "estimate": fm.get("estimate", ""),
-        })
+            yield {
+                "path": str(path),
+                "title": fm.get("title", path.stem),
+                "subsystem": fm.get("subsystem", ""),
+                "priority": fm.get("priority", ""),
+                "estimate": fm.get("estimate", ""),
+            }
 
-    return results, source_info
+    return records(), source_info
 
 
-def _scan_knowledge_files(
+def _scan_todos(
     planning: Path,
-    subsystems: list[str],
+    subdir: str,
+    parse_errors: list[dict[str, str]],
 ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
-    """List knowledge files and match by subsystem."""
+    """Scan todo files (done/ or root todos/) for metadata."""
+    records, source_info = _iter_todos(planning, subdir, parse_errors)
+    return list(records), source_info
+
+
+def _iter_knowledge_files(
+    planning: Path,
+    subsystems: list[str],
+) -> tuple[Iterator[dict[str, Any]], dict[str, Any]]:
+    """Lazily list knowledge files and match by subsystem."""
     knowledge_dir = planning / "knowledge"
     source_info: dict[str, Any] = {"dir": str(knowledge_dir), "scanned": 0, "skipped": None}
 
     if not knowledge_dir.is_dir():
         source_info["skipped"] = "directory not found"
-        return [], source_info
+        return iter(()), source_info
 
     md_files = sorted(knowledge_dir.glob("*.md"))
     if not md_files:
         source_info["skipped"] = "no .md files in knowledge/"
-        return [], source_info
+        return iter(()), source_info
 
     subsystems_lower = {s.lower() for s in subsystems}
-    results: list[dict[str, Any]] = []
-    for path in md_files:
-        source_info["scanned"] += 1
-        file_subsystem = path.stem.lower()
-        matched = file_subsystem in subsystems_lower
-
-        results.append({
-            "path": str(path),
-            "subsystem": path.stem,
-            "matched": matched,
-        })
 
-    return results, source_info
+    def records() -> Iterator[dict[str, Any]]:
+        for path in md_files:
+            source_info["scanned"] += 1
+            yield {
+                "path": str(path),
+                "subsystem": path.stem,
+                "matched": path.stem.lower() in subsystems_lower,
+            }
 
+    return records(), source_info
 
-def _aggregate_from_summaries(summaries: list[dict[str, Any]]) -> dict[str, list[str]]:
-    """Aggregate tech stack, patterns, key files, decisions from HIGH+MEDIUM summaries."""
-    tech_added: list[str] = []
-    patterns: list[str] = []
-    key_files_created: list[str] = []
-    key_files_modified: list[str] = []
-    key_decisions: list[str] = []
 
-    for entry in summaries:
-        if entry["relevance"] == "LOW":
-            continue
-        fm = entry["frontmatter"]
-
-        ts = fm.get("tech-stack", {}) or {}
-        if isinstance(ts, dict):
-            added = ts.get("added", []) or []
-            if isinstance(added, str):
-                added = [added]
-            tech_added.extend(str(a) for a in added)
-            pat = ts.get("patterns", []) or []
-            if isinstance(pat, str):
-                pat = [pat]
-            patterns.extend(str(p) for p in pat)
-
-        pe = fm.get("patterns-established", []) or []
-        if isinstance(pe, str):
-            pe = [pe]
-        patterns.extend(str(p) for p in pe)
-
-        kf = fm.get("key-files", {}) or {}
-        if isinstance(kf, dict):
-            created = kf.get("created", []) or []
-            if isinstance(created, str):
-                created = [created]
-            key_files_created.extend(str(f) for f in created)
-            modified = kf.get("modified", []) or []
-            if isinstance(modified, str):
-                modified = [modified]
-            key_files_modified.extend(str(f) for f in modified)
-
-        kd = fm.get("key-decisions", []) or []
-        if isinstance(kd, str):
-            kd = [kd]
-        key_decisions.extend(str(d) for d in kd)
+def _scan_knowledge_files(
+    planning: Path,
+    subsystems: list[str],
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """List knowledge files and match by subsystem."""
+    records, source_info = _iter_knowledge_files(planning, subsystems)
+    return list(records), source_info
+
+
+def _new_aggregate() -> dict[str, Any]:
+    """Empty accumulator for _add_to_aggregate / _finish_aggregate."""
+    return {
+        "tech_stack_added": set(),
+        "patterns_established": set(),
+        "key_files_created": set(),
+        "key_files_modified": set(),
+        "key_decisions": {},
+    }
+
 
+def _add_to_aggregate(acc: dict[str, Any], entry: dict[str, Any]) -> None:
+    """Fold one scored summary into the accumulator (LOW entries are ignored)."""
+    if entry["relevance"] == "LOW":
+        return
+    fm = entry["frontmatter"]
+
+    ts = fm.get("tech-stack", {}) or {}
+    if isinstance(ts, dict):
+        added = ts.get("added", []) or []
+        if isinstance(added, str):
+            added = [added]
+        acc["tech_stack_added"].update(str(a) for a in added)
+        pat = ts.get("patterns", []) or []
+        if isinstance(pat, str):
+            pat = [pat]
+        acc["patterns_established"].update(str(p) for p in pat)
+
+    pe = fm.get("patterns-established", []) or []
+    if isinstance(pe, str):
+        pe = [pe]
+    acc["patterns_established"].update(str(p) for p in pe)
+
+    kf = fm.get("key-files", {}) or {}
+    if isinstance(kf, dict):
+        created = kf.get("created", []) or []
+        if isinstance(created, str):
+            created = [created]
+        acc["key_files_created"].update(str(f) for f in created)
+        modified = kf.get("modified", []) or []
+        if isinstance(modified, str):
+            modified = [modified]
+        acc["key_files_modified"].update(str(f) for f in modified)
+
+    kd = fm.get("key-decisions", []) or []
+    if isinstance(kd, str):
+        kd = [kd]
+    acc["key_decisions"].update(dict.fromkeys(str(d) for d in kd))
+
+
+def _finish_aggregate(acc: dict[str, Any]) -> dict[str, list[str]]:
+    """Convert the accumulator into the output's aggregated block."""
     return {
-        "tech_stack_added": sorted(set(tech_added)),
-        "patterns_established": sorted(set(patterns)),
-        "key_files_created": sorted(set(key_files_created)),
-        "key_files_modified": sorted(set(key_files_modified)),
-        "key_decisions": list(dict.fromkeys(key_decisions)),
+        "tech_stack_added": sorted(acc["tech_stack_added"]),
+        "patterns_established": sorted(acc["patterns_established"]),
+        "key_files_created": sorted(acc["key_files_created"]),
+        "key_files_modified": sorted(acc["key_files_modified"]),
+        "key_decisions": list(acc["key_decisions"]),
     }
 
 
+def _aggregate_from_summaries(summaries: list[dict[str, Any]]) -> dict[str, list[str]]:
+    """Aggregate tech stack, patterns, key files, decisions from HIGH+MEDIUM summaries."""
+    acc = _new_aggregate()
+    for entry in summaries:
+        _add_to_aggregate(acc, entry)
+    return _finish_aggregate(acc)
+
+
+def _line_range_note(summary: dict[str, Any]) -> str:
+    """" (lines 12-40)" for an archived summary, "" for a standalone file."""
+    lines = summary.get("lines")
+    return f" (lines {lines[0]}-{lines[1]})" if lines else ""
+
+
+def _format_summary_sections(summaries: list[dict[str, Any]], suffix: str = "") -> list[str]:
+    """Markdown sections listing summaries to read, split by readiness warnings."""
+    sections: list[str] = []
+    needs_read = [s for s in summaries if s.get("relevance") == "HIGH" and s.get("has_readiness_warnings")]
+    other_relevant = [s for s in summaries if s.get("relevance") in ("HIGH", "MEDIUM") and not s.get("has_readiness_warnings")]
+
+    if needs_read:
+        lines = [f"### Summaries Needing Full Read{suffix}"]
+        lines.extend(f"- `{s['path']}`{_line_range_note(s)}" for s in needs_read)
+        sections.append("\n".join(lines))
+
+    if other_relevant:
+        lines = [f"### Other Relevant Summaries{suffix}"]
+        lines.extend(f"- `{s['path']}`{_line_range_note(s)} [{s.get('relevance', '')}]" for s in other_relevant)
+        sections.append("\n".join(lines))
+
+    return sections
+
+
 def _format_markdown(output: dict[str, Any]) -> str:
     """Format scanner output as readable markdown for LLM consumption."""
     sections: list[str] = []
@@ -3169,19 +6019,11 @@ def _format_markdown(output: dict[str, Any]) -> str:
                 lines.append(f"  - {learning}")
         sections.append("\n".join(lines))
 
-    summaries = output.get("summaries", [])
-    needs_read = [s for s in summaries if s.get("relevance") == "HIGH" and s.get("has_readiness_warnings")]
-    other_relevant = [s for s in summaries if s.get("relevance") in ("HIGH", "MEDIUM") and not s.get("has_readiness_warnings")]
-
-    if needs_read:
-        lines = ["### Summaries Needing Full Read"]
-        lines.extend(f"- `{s['path']}`" for s in needs_read)
-        sections.append("\n".join(lines))
-
-    if other_relevant:
-        lines = ["### Other Relevant Summaries"]
-        lines.extend(f"- `{s['path']}` [{s.get('relevance', '')}]" for s in other_relevant)
-        sections.append("\n".join(lines))
+    if "phases" in output:
+        for phase, info in output["phases"].items():
+            sections.extend(_format_summary_sections(info.get("summaries", []), f" (Phase {phase})"))
+    else:
+        sections.extend(_format_summary_sections(output.get("summaries", [])))
 
     matched_knowledge = [k for k in output.get("knowledge_files", []) if k.get("matched")]
     if matched_knowledge:
@@ -3222,16 +6064,186 @@ def _format_markdown(output: dict[str, Any]) -> str:
     return "\n\n".join(sections)
 
 
+def _emit_ndjson(source: str, record: Any) -> None:
+    """Write one NDJSON line tagged by source and flush so consumers see it immediately."""
+    sys.stdout.write(json.dumps({"source": source, "record": record}, cls=_SafeEncoder) + "\n")
+    sys.stdout.flush()
+
+
+def _stream_planning_context(
+    planning: Path | None,
+    target: dict[str, Any],
+    target_num: int | None,
+) -> None:
+    """Emit scan-planning-context as NDJSON, one record per artifact.
+
+    Order: target, summaries (HIGH first), debug_learnings, adhoc_learnings,
+    completed_todos, pending_todos, knowledge_files, then the trailing
+    aggregated and sources records. Only the aggregation accumulator and
+    per-source counters are held in memory.
+
+    A consumer that stops reading early (``| head``) ends the run quietly:
+    stdout is pointed at devnull so the interpreter's final flush cannot
+    fail again, and the process exits 0.
+    """
+    try:
+        _emit_planning_context_records(planning, target, target_num)
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(0)
+
+
+def _emit_planning_context_records(
+    planning: Path | None,
+    target: dict[str, Any],
+    target_num: int | None,
+) -> None:
+    """Write the NDJSON records for _stream_planning_context."""
+    _emit_ndjson("target", target)
+
+    if planning is None:
+        empty_src = {"dir": "", "scanned": 0, "skipped": ".planning/ not found"}
+        _emit_ndjson("aggregated", _finish_aggregate(_new_aggregate()))
+        _emit_ndjson("sources", {
+            "summaries": empty_src, "debug_docs": empty_src, "adhoc_summaries": empty_src,
+            "completed_todos": empty_src, "pending_todos": empty_src, "knowledge_files": empty_src,
+            "parse_errors": [],
+        })
+        return
+
+    phase, subsystems, keywords = target["phase"], target["subsystems"], target["keywords"]
+    parse_errors: list[dict[str, str]] = []
+    acc = _new_aggregate()
+
+    summaries, summaries_src = _stream_summaries(planning, phase, target_num, subsystems, keywords, parse_errors)
+    for entry in summaries:
+        _add_to_aggregate(acc, entry)
+        _emit_ndjson("summaries", entry)
+
+    streams = [
+        ("debug_learnings", "debug_docs", _iter_debug_docs(planning, parse_errors)),
+        ("adhoc_learnings", "adhoc_summaries", _iter_adhoc_summaries(planning, parse_errors)),
+        ("completed_todos", "completed_todos", _iter_todos(planning, "done", parse_errors)),
+        ("pending_todos", "pending_todos", _iter_todos(planning, "", parse_errors)),
+        ("knowledge_files", "knowledge_files", _iter_knowledge_files(planning, subsystems)),
+    ]
+    sources: dict[str, Any] = {"summaries": summaries_src}
+    for source, src_key, (records, source_info) in streams:
+        for record in records:
+            _emit_ndjson(source, record)
+        sources[src_key] = source_info
+    sources["parse_errors"] = parse_errors
+
+    _emit_ndjson("aggregated", _finish_aggregate(acc))
+    _emit_ndjson("sources", sources)
+
+
+_SCAN_CACHE_DIR = "scan-context"
+_SCAN_CACHE_KEEP = 32
+
+
+def _update_dir_fingerprint(digest: Any, directory: Path, depth: int) -> None:
+    """Feed entry names, mtimes and sizes under *directory* into *digest*.
+
+    Descends *depth* levels of subdirectories (-1 = unlimited). Missing
+    directories contribute a marker so creating one changes the fingerprint.
+    """
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.name)
+    except OSError:
+        digest.update(f"-{directory}\0".encode())
+        return
+    digest.update(f"+{directory}\0".encode())
+    for entry in entries:
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        digest.update(f"{entry.name}\0{st.st_mtime_ns}\0{st.st_size}\0".encode())
+        if depth != 0 and entry.is_dir():
+            _update_dir_fingerprint(digest, Path(entry.path), depth - 1)
+
+
+def _planning_tree_fingerprint(planning: Path) -> str:
+    """Cheap fingerprint of every directory scan-planning-context reads (no file contents).
+
+    At a --rev tree the .planning tree id already identifies every file.
+    """
+    if isinstance(planning, RevPath):
+        return f"tree:{planning.oid}"
+    digest = hashlib.sha256()
+    _update_dir_fingerprint(digest, planning / "phases", 1)
+    _update_dir_fingerprint(digest, planning / "debug" / "resolved", 0)
+    _update_dir_fingerprint(digest, planning / "adhoc", -1)
+    _update_dir_fingerprint(digest, planning / "todos", 1)
+    _update_dir_fingerprint(digest, planning / "knowledge", 0)
+    _update_dir_fingerprint(digest, planning / "milestones", 1)
+    return digest.hexdigest()
+
+
+def _scan_cache_path(planning: Path, normalized_args: dict[str, Any]) -> Path | None:
+    """Cache file for this argument set and tree state, or None when caching is unavailable."""
+    cache_root = _tool_cache_dir(planning.parent)
+    if cache_root is None:
+        return None
+    cache_dir = cache_root / _SCAN_CACHE_DIR
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        tool_mtime = Path(__file__).stat().st_mtime_ns
+    except OSError:
+        return None
+    key_material = json.dumps(
+        {"args": normalized_args, "planning": str(planning), "tool": tool_mtime,
+         "tree": _planning_tree_fingerprint(planning)},
+        sort_keys=True,
+    )
+    return cache_dir / f"{hashlib.sha256(key_material.encode()).hexdigest()[:32]}.out"
+
+
+def _store_scan_cache(cache_path: Path, rendered: str) -> None:
+    """Write a rendered scan result and drop the oldest entries beyond _SCAN_CACHE_KEEP."""
+    tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(rendered, encoding="utf-8")
+        os.replace(str(tmp), str(cache_path))
+        entries = sorted(cache_path.parent.glob("*.out"), key=lambda p: p.stat().st_mtime_ns, reverse=True)
+        for stale in entries[_SCAN_CACHE_KEEP:]:
+            stale.unlink(missing_ok=True)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
 def cmd_scan_planning_context(args: argparse.Namespace) -> None:
     """Scan .planning/ artifacts and score relevance for plan-phase context assembly.
 
     Contract:
-        Args: --phase (str, required), --phase-name (str), --subsystem (repeatable), --keywords (csv), --json (flag)
-        Output: JSON (--json) or markdown — scored summaries, learnings, todos, knowledge, aggregated context
+        Args: --phase (str, required; "5", "5,6,7" or "5-7"), --phase-name (str), --subsystem (repeatable),
+              --keywords (csv), --json (flag) | --ndjson (flag, single phase only), --no-cache (flag),
+              --verbose (flag)
+        Output: JSON (--json) or markdown — scored summaries, learnings, todos, knowledge, aggregated context.
+                With several phases, artifacts are parsed once: target.phases lists the targets,
+                summaries holds each file once with its best relevance, phases.<N>.summaries holds
+                per-phase relevance, and aggregation/learnings/todos/knowledge are shared
+                --ndjson streams one {"source", "record"} object per line: target first, HIGH summaries
+                before the rest, trailing aggregated and sources records; a reader that closes
+                the pipe early (e.g. | head) ends the run quietly with exit 0
+                --verbose: "cache: hit" / "cache: miss" on stderr when the result cache is in use
         Exit codes: 0 = success (empty result if no .planning/)
-        Side effects: read-only
+        Side effects: writes rendered JSON/markdown results to <git-dir>/ms-tools/scan-context/,
+                      keyed by normalized args plus a name/mtime fingerprint of the scanned dirs
+                      (skipped with --no-cache and for --ndjson)
     """
-    phase = normalize_phase(args.phase)
+    try:
+        phases = _parse_phase_targets(args.phase)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not phases:
+        print("Error: --phase is empty", file=sys.stderr)
+        sys.exit(1)
+    phase = phases[0]
+    multi = len(phases) > 1
     phase_name = args.phase_name.strip() if args.phase_name else ""
     subsystems = [s for s in (args.subsystems or []) if s]
     keywords = [k.strip() for k in (args.keywords or "").split(",") if k.strip()]
@@ -3241,20 +6253,33 @@ def cmd_scan_planning_context(args: argparse.Namespace) -> None:
         keywords.extend(name_words)
 
     target_num = _extract_phase_number(phase)
+    target: dict[str, Any] = {
+        ("phases" if multi else "phase"): phases if multi else phase,
+        "phase_name": phase_name, "subsystems": subsystems, "keywords": keywords,
+    }
 
     planning = find_planning_dir_optional()
+    if args.ndjson:
+        if multi:
+            print("Error: --ndjson supports a single --phase", file=sys.stderr)
+            sys.exit(1)
+        _stream_planning_context(planning, target, target_num)
+        return
+
     if planning is None:
         if args.json:
             empty_src = {"dir": "", "scanned": 0, "skipped": ".planning/ not found"}
             output: dict[str, Any] = {
                 "success": True,
-                "target": {"phase": phase, "phase_name": phase_name, "subsystems": subsystems, "keywords": keywords},
+                "target": target,
                 "sources": {
                     "summaries": empty_src, "debug_docs": empty_src, "adhoc_summaries": empty_src,
                     "completed_todos": empty_src, "pending_todos": empty_src, "knowledge_files": empty_src,
                     "parse_errors": [],
                 },
-                "summaries": [], "debug_learnings": [], "adhoc_learnings": [],
+                "summaries": [],
+                **({"phases": {p: {"summaries": []} for p in phases}} if multi else {}),
+                "debug_learnings": [], "adhoc_learnings": [],
                 "completed_todos": [], "pending_todos": [], "knowledge_files": [],
                 "aggregated": {
                     "tech_stack_added": [], "patterns_established": [],
@@ -3267,9 +6292,36 @@ def cmd_scan_planning_context(args: argparse.Namespace) -> None:
             print("No .planning/ directory found. No prior context available.")
         return
 
+    cache_path = None
+    if not args.no_cache:
+        normalized_args = {
+            "phases": phases, "phase_name": phase_name, "subsystems": subsystems,
+            "keywords": keywords, "format": "json" if args.json else "markdown",
+        }
+        cache_path = _scan_cache_path(planning, normalized_args)
+    if cache_path is not None:
+        try:
+            cached = cache_path.read_text(encoding="utf-8")
+        except OSError:
+            cached = None
+        verbose = getattr(args, "verbose", False)
+        if cached is not None:
+            if verbose:
+                print("cache: hit", file=sys.stderr)
+            sys.stdout.write(cached)
+            return
+        if verbose:
+            print("cache: miss", file=sys.stderr)
+
     parse_errors: list[dict[str, str]] = []
 
-    summaries, summaries_src = _scan_summaries(planning, phase, target_num, subsystems, keywords, parse_errors)
+    per_phase: dict[str, list[dict[str, Any]]] = {}
+    if multi:
+        summaries, per_phase, summaries_src = _scan_summaries_multi(
+            planning, phases, subsystems, keywords, parse_errors,
+        )
+    else:
+        summaries, summaries_src = _scan_summaries(planning, phase, target_num, subsystems, keywords, parse_errors)
     debug_learnings, debug_src = _scan_debug_docs(planning, parse_errors)
     adhoc_learnings, adhoc_src = _scan_adhoc_summaries(planning, parse_errors)
     completed_todos, completed_src = _scan_todos(planning, "done", parse_errors)
@@ -3280,13 +6332,14 @@ def cmd_scan_planning_context(args: argparse.Namespace) -> None:
 
     output = {
         "success": True,
-        "target": {"phase": phase, "phase_name": phase_name, "subsystems": subsystems, "keywords": keywords},
+        "target": target,
         "sources": {
             "summaries": summaries_src, "debug_docs": debug_src, "adhoc_summaries": adhoc_src,
             "completed_todos": completed_src, "pending_todos": pending_src,
             "knowledge_files": knowledge_src, "parse_errors": parse_errors,
         },
         "summaries": summaries,
+        **({"phases": {p: {"summaries": lst} for p, lst in per_phase.items()}} if multi else {}),
         "debug_learnings": debug_learnings,
         "adhoc_learnings": adhoc_learnings,
         "completed_todos": completed_todos,
@@ -3296,10 +6349,12 @@ def cmd_scan_planning_context(args: argparse.Namespace) -> None:
     }
 
     if args.json:
-        json.dump(output, sys.stdout, indent=2, cls=_SafeEncoder)
-        sys.stdout.write("\n")
+        rendered = json.dumps(output, indent=2, cls=_SafeEncoder) + "\n"
     else:
-        print(_format_markdown(output))
+        rendered = _format_markdown(output) + "\n"
+    sys.stdout.write(rendered)
+    if cache_path is not None:
+        _store_scan_cache(cache_path, rendered)
 
 
 # ===================================================================
@@ -3308,7 +6363,6 @@ def cmd_scan_planning_context(args: argparse.Namespace) -> None:
 
 _TEST_HEADER_RE = re.compile(r"^###\s+(\d+)\.\s+(.+)$")
 _BATCH_HEADER_RE = re.compile(r"^###\s+Batch\s+(\d+):\s+(.+)$")
-_SECTION_HEADER_RE = re.compile(r"^##\s+(.+)$")
 _KV_LINE_RE = re.compile(r"^(\w[\w_]*)\s*:\s*(.*)$")
 _LIST_ITEM_START_RE = re.compile(r"^-\s+(\w[\w_]*)\s*:\s*(.*)$")
 _LIST_ITEM_CONT_RE = re.compile(r"^\s+(\w[\w_]*)\s*:\s*(.*)$")
@@ -3348,19 +6402,11 @@ class UATFile:
         """Parse UAT.md text into structured representation."""
         uat = cls()
 
-        # Parse frontmatter
-        fm_match = _FRONTMATTER_RE.match(text)
-        if fm_match:
-            try:
-                uat.frontmatter = yaml.safe_load(fm_match.group(1)) or {}
-            except yaml.YAMLError:
-                uat.frontmatter = {}
-            body = text[fm_match.end():]
-        else:
-            body = text
+        doc = MarkdownArtifact(text)
+        uat.frontmatter = doc.frontmatter or {}
 
         # Split into sections by ## headers
-        sections = cls._split_sections(body)
+        sections = doc.sections(2)
 
         for name, content in sections.items():
             if name == "Progress":
@@ -3378,28 +6424,6 @@ class UATFile:
 
         return uat
 
-    @staticmethod
-    def _split_sections(body: str) -> dict[str, str]:
-        """Split body text into {section_name: content} dict."""
-        sections: dict[str, str] = {}
-        current_name: str | None = None
-        current_lines: list[str] = []
-
-        for line in body.splitlines():
-            m = _SECTION_HEADER_RE.match(line)
-            if m:
-                if current_name is not None:
-                    sections[current_name] = "\n".join(current_lines)
-                current_name = m.group(1).strip()
-                current_lines = []
-            else:
-                current_lines.append(line)
-
-        if current_name is not None:
-            sections[current_name] = "\n".join(current_lines)
-
-        return sections
-
     @staticmethod
     def _parse_kv_block(text: str) -> dict[str, str]:
         """Parse a block of key: value lines."""
@@ -4040,9 +7064,9 @@ def cmd_uat_pop_mocks(args: argparse.Namespace) -> None:
             sys.exit(1)
 
         # Resolve conflicts by taking the fix version (theirs)
-        for f in conflicts:
-            run_git("checkout", "--theirs", f)
-            run_git("add", f)
+        git = _git_session()
+        git.run_paths(["checkout", "--theirs"], conflicts)
+        git.run_paths(["add"], conflicts)
 
         # Drop the stash (failed pop doesn't auto-drop)
         try:
@@ -4091,20 +7115,20 @@ def cmd_uat_fix_commit(args: argparse.Namespace) -> None:
             prev_fix_commit = t.get("fix_commit", "")
             break
 
-    run_git("add", *args.files)
+    git = _git_session()
+    git.run_paths(["add"], args.files)
 
     amend = False
     if prev_fix_commit:
-        head_short = run_git("rev-parse", "--short", "HEAD")
-        if head_short == prev_fix_commit:
-            amend = True
+        head = git.resolve("HEAD") or ""
+        amend = head.startswith(prev_fix_commit)
 
     if amend:
-        run_git("commit", "--amend", "--no-edit")
+        git.run("commit", "--amend", "--no-edit")
     else:
-        run_git("commit", "-m", args.message)
+        git.run("commit", "-m", args.message)
 
-    new_hash = run_git("rev-parse", "--short", "HEAD")
+    new_hash = git.abbrev("HEAD")
     uat.update_test(test_num, {"fix_status": "applied", "fix_commit": new_hash})
     uat_path.write_text(uat.serialize(), encoding="utf-8")
 
@@ -4135,7 +7159,7 @@ def cmd_uat_revert_mocks(args: argparse.Namespace) -> None:
         return
 
     try:
-        run_git("checkout", "--", *mocked_files)
+        _git_session().run_paths(["checkout"], mocked_files)
     except subprocess.CalledProcessError as e:
         print(f"Error: git checkout failed: {e.stderr}", file=sys.stderr)
         sys.exit(1)
@@ -4248,6 +7272,11 @@ def build_parser() -> argparse.ArgumentParser:
         prog="ms-tools",
         description="Mindsystem CLI tools — unified subcommands for mechanical operations.",
     )
+    parser.add_argument(
+        "--rev",
+        default=None,
+        help=f"Read .planning/ at this commit without checking it out ({', '.join(_REV_COMMANDS)})",
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # --- update-state ---
@@ -4292,34 +7321,96 @@ def build_parser() -> argparse.ArgumentParser:
     p = subparsers.add_parser("gather-milestone-stats", help="Gather milestone readiness and git statistics")
     p.add_argument("start_phase", type=int, help="Start phase number")
     p.add_argument("end_phase", type=int, help="End phase number")
+    p.add_argument("--all-history", action="store_true", help="Search all history instead of commits since the last milestone boundary")
+    p.add_argument("--change-stats", action="store_true", help="Add per-subsystem and per-directory change totals")
+    p.add_argument("--breakdown", action="store_true", help="Add per-phase and per-day change totals")
     p.set_defaults(func=cmd_gather_milestone_stats)
 
     # --- generate-phase-patch ---
     p = subparsers.add_parser("generate-phase-patch", help="Generate patch from phase commits")
-    p.add_argument("phase", help="Phase number (e.g., 04 or 4)")
+    p.add_argument("phase", nargs="?", help="Phase number (e.g., 04 or 4)")
+    p.add_argument("--range", default=None, help="Generate patches for every phase in START-END (e.g., 3-7)")
+    p.add_argument("--jobs", type=int, default=None, help="Concurrent diffs with --range (default: min(4, CPUs))")
     p.add_argument("--suffix", default="", help="Filter commits and customize output filename")
+    p.add_argument("--all-history", action="store_true", help="Search all history instead of commits since the last milestone boundary")
+    p.add_argument("--binary", action="store_true", help="Include binary file contents (git diff --binary)")
+    p.add_argument("--split", action="store_true", help="Write one patch per changed file plus manifest.json")
+    p.add_argument("--change-stats", action="store_true", help="Append per-subsystem and per-directory change totals")
+    p.add_argument("--compress", choices=sorted(PATCH_COMPRESSION_SUFFIXES), default=None, help="Compress the patch (.patch.gz / .patch.xz)")
+    p.add_argument("--force", action="store_true", help="Regenerate even if the existing patch is up to date")
+    p.add_argument("--max-lines", type=int, default=None, help="Total patch line budget; oversized files are truncated")
+    p.add_argument("--max-file-lines", type=int, default=None, help="Per-file patch line cap; larger files are truncated (config patch.exclude_over_lines drops them instead)")
+    p.add_argument("--scope", choices=["all", "key-files"], default="all", help="Diff the whole tree (default) or only the phase SUMMARY key-files")
     p.set_defaults(func=cmd_generate_phase_patch)
 
     # --- find-phase-commits ---
     p = subparsers.add_parser("find-phase-commits", help="Find commit hashes matching phase convention")
     p.add_argument("phase", help="Phase number (e.g., 04 or 4)")
     p.add_argument("--suffix", default="", help="Filter by suffix (e.g., uat)")
+    p.add_argument("--all-history", action="store_true", help="Search all history instead of commits since the last milestone boundary")
     p.set_defaults(func=cmd_find_phase_commits)
 
+    # --- phase-of ---
+    p = subparsers.add_parser("phase-of", help="Show which phase/plan introduced and last touched files")
+    p.add_argument("paths", nargs="+", help="Files or directories (relative to the current directory)")
+    p.add_argument("--all", action="store_true", help="List every phase commit touching each path")
+    p.add_argument("--json", action="store_true", help="Emit JSON instead of text")
+    p.set_defaults(func=cmd_phase_of)
+
     # --- generate-adhoc-patch ---
     p = subparsers.add_parser("generate-adhoc-patch", help="Generate patch from an adhoc commit or range")
     p.add_argument("commit", help="Start commit hash")
     p.add_argument("output", help="Output path for the patch file")
     p.add_argument("--end", default=None, help="End commit hash for range diffs (default: same as commit)")
+    p.add_argument("--binary", action="store_true", help="Include binary file contents (git diff --binary)")
+    p.add_argument("--compress", choices=sorted(PATCH_COMPRESSION_SUFFIXES), default=None, help="Compress the patch (.patch.gz / .patch.xz)")
+    p.add_argument("--max-lines", type=int, default=None, help="Total patch line budget; oversized files are truncated")
+    p.add_argument("--max-file-lines", type=int, default=None, help="Per-file patch line cap; larger files are truncated (config patch.exclude_over_lines drops them instead)")
     p.set_defaults(func=cmd_generate_adhoc_patch)
 
+    # --- patch-cat ---
+    p = subparsers.add_parser("patch-cat", help="Print patches, decompressing .gz/.xz transparently")
+    p.add_argument("paths", nargs="+", help="Patch files or --split directories")
+    p.set_defaults(func=cmd_patch_cat)
+
+    # --- change-stats ---
+    p = subparsers.add_parser("change-stats", help="Per-directory and per-subsystem diff totals")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--phase", help="Phase number whose commits define the range")
+    target.add_argument("--base", help="Base revision of the range")
+    p.add_argument("--head", default="HEAD", help="End revision when using --base (default: HEAD)")
+    p.add_argument("--suffix", default="", help="With --phase: filter commits by suffix (e.g., uat-fixes)")
+    p.add_argument("--all-history", action="store_true", help="With --phase: search all history instead of commits since the last milestone boundary")
+    p.add_argument("--depth", type=int, default=2, help="Directory depth for aggregation (default: 2)")
+    p.add_argument("--json", action="store_true", help="Output JSON instead of a table")
+    p.set_defaults(func=cmd_change_stats)
+
     # --- archive-milestone-phases ---
     p = subparsers.add_parser("archive-milestone-phases", help="Archive phase dirs to milestone directory")
     p.add_argument("start_phase", type=int, help="Start phase number")
     p.add_argument("end_phase", type=int, help="End phase number")
     p.add_argument("milestone", help="Milestone slug (e.g., mvp, push-notifications)")
+    p.add_argument("--pack", choices=list(ARCHIVE_PACK_FORMATS), default=None, help="Pack the archived phase dirs into one archive")
     p.set_defaults(func=cmd_archive_milestone_phases)
 
+    # --- archive-pack ---
+    p = subparsers.add_parser("archive-pack", help="Pack a milestone's archived phase dirs into one archive")
+    p.add_argument("milestone", help="Milestone slug")
+    p.add_argument("--format", choices=list(ARCHIVE_PACK_FORMATS), default="tar.xz", help="Archive format (default tar.xz)")
+    p.set_defaults(func=cmd_archive_pack)
+
+    # --- archive-ls ---
+    p = subparsers.add_parser("archive-ls", help="List milestone archives or the files inside one")
+    p.add_argument("milestone", nargs="?", default=None, help="Milestone slug (omit to list all milestones)")
+    p.add_argument("--json", action="store_true", help="Emit JSON instead of text")
+    p.set_defaults(func=cmd_archive_ls)
+
+    # --- archive-cat ---
+    p = subparsers.add_parser("archive-cat", help="Print one archived phase file without extracting")
+    p.add_argument("milestone", help="Milestone slug")
+    p.add_argument("path", help="File path relative to the milestone's phases/ directory")
+    p.set_defaults(func=cmd_archive_cat)
+
     # --- archive-milestone-files ---
     p = subparsers.add_parser("archive-milestone-files", help="Archive optional milestone files")
     p.add_argument("milestone", help="Milestone slug (e.g., mvp, push-notifications)")
@@ -4336,11 +7427,15 @@ def build_parser() -> argparse.ArgumentParser:
 
     # --- scan-planning-context ---
     p = subparsers.add_parser("scan-planning-context", help="Scan .planning/ and score relevance for plan-phase")
-    p.add_argument("--phase", required=True, help='Phase number (e.g., "05" or "5" or "2.1")')
+    p.add_argument("--phase", required=True, help='Phase number(s) (e.g., "05", "2.1", "5,6,7" or "5-7")')
     p.add_argument("--phase-name", default="", help="Phase name for keyword matching")
     p.add_argument("--subsystem", action="append", default=[], dest="subsystems", help="Subsystem(s) for matching (repeatable)")
     p.add_argument("--keywords", default="", help="Comma-separated keywords for tag matching")
-    p.add_argument("--json", action="store_true", help="Output raw JSON (default: formatted markdown)")
+    output_group = p.add_mutually_exclusive_group()
+    output_group.add_argument("--json", action="store_true", help="Output raw JSON (default: formatted markdown)")
+    output_group.add_argument("--ndjson", action="store_true", help="Stream newline-delimited JSON records as they are scanned")
+    p.add_argument("--no-cache", action="store_true", help="Ignore and do not update the cached result")
+    p.add_argument("--verbose", action="store_true", help="Report cache hit/miss on stderr")
     p.set_defaults(func=cmd_scan_planning_context)
 
     # --- find-phase ---
@@ -4435,6 +7530,8 @@ def build_parser() -> argparse.ArgumentParser:
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
+    if args.rev is not None:
+        _use_rev(args.rev, args.command)
     args.func(args)
 
 
@@ -5,6 +5,9 @@ import datetime
 import importlib.util
 import io
 import json
+import os
+import re
+import time
 from pathlib import Path
 from unittest import mock
 
@@ -425,6 +428,94 @@ class TestScoreSummary:
         assert score == "HIGH"
 
 
+    def test_medium_via_body_match(self):
+        fm = {"affects": [], "subsystem": "", "requires": [], "tags": [], "phase": "01"}
+        score, reasons = _score_summary(fm, "06", 6, [], ["jwt"], (1.8, ["jwt"]))
+        assert score == "MEDIUM"
+        assert any("body mentions" in r for r in reasons)
+
+    def test_weak_body_match_ignored(self):
+        fm = {"affects": [], "subsystem": "", "requires": [], "tags": [], "phase": "01"}
+        score, _ = _score_summary(fm, "06", 6, [], ["jwt"], (0.4, ["jwt"]))
+        assert score == "LOW"
+
+
+class TestBodyRelevance:
+    """BM25 body scoring and the term-vector cache."""
+
+    def _write_bodies(self, tmp_path, bodies):
+        planning = tmp_path / ".planning"
+        paths = []
+        for i, body in enumerate(bodies, start=1):
+            d = planning / "phases" / f"0{i}-p"
+            d.mkdir(parents=True)
+            path = d / f"0{i}-01-SUMMARY.md"
+            path.write_text(f"---\nphase: 0{i}-p\n---\n{body}\n")
+            paths.append(path)
+        return planning, paths
+
+    def test_tokenize_ignores_frontmatter(self, tmp_path):
+        _, (path,) = self._write_bodies(tmp_path, ["Rotated JWT keys, jwt cache."])
+        vector = _mod._term_vector(path)
+        assert vector["tf"]["jwt"] == 2
+        assert "phase" not in vector["tf"]
+
+    def test_pure_python_matches_numpy_formula(self):
+        vectors = [
+            {"length": 10, "tf": {"jwt": 3}},
+            {"length": 40, "tf": {"jwt": 1, "token": 2}},
+            {"length": 20, "tf": {}},
+        ]
+        with mock.patch.object(_mod, "np", None):
+            scores = _mod._bm25_scores(vectors, ["jwt", "token"])
+        assert scores[2] == 0.0
+        assert scores[0] > 0 and scores[1] > 0
+        if _mod.np is not None:
+            assert _mod._bm25_scores(vectors, ["jwt", "token"]) == pytest.approx(scores)
+
+    def test_body_matches_rank_repeated_mentions(self, tmp_path):
+        planning, paths = self._write_bodies(tmp_path, [
+            "JWT refresh flow. The jwt secret rotates; jwt expiry is short.",
+            "Database migrations only.",
+            "Logging setup.",
+        ])
+        matches = _mod._summary_body_matches(planning, paths, ["jwt"])
+        assert list(matches) == [str(paths[0])]
+        assert matches[str(paths[0])][1] == ["jwt"]
+        assert matches[str(paths[0])][0] >= _mod._BM25_MEDIUM_THRESHOLD
+
+    def test_threshold_holds_for_small_projects(self, tmp_path):
+        planning, paths = self._write_bodies(tmp_path, ["Issued a jwt. The jwt is signed; jwt expiry is short."])
+        (score, terms), = _mod._summary_body_matches(planning, paths, ["jwt"]).values()
+        fm = {"affects": [], "subsystem": "", "requires": [], "tags": [], "phase": "01"}
+        assert _score_summary(fm, "06", 6, [], ["jwt"], (score, terms))[0] == "MEDIUM"
+
+        planning, paths = self._write_bodies(tmp_path / "shared", ["jwt here.", "jwt there.", "jwt everywhere."])
+        matches = _mod._summary_body_matches(planning, paths, ["jwt"])
+        assert all(score < _mod._BM25_MEDIUM_THRESHOLD for score, _ in matches.values())
+
+    def test_cache_reused_until_fingerprint_changes(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        planning, paths = self._write_bodies(tmp_path, ["jwt jwt", "other text"])
+        _mod._load_term_vectors(planning, paths)
+        assert (tmp_path / ".git" / "ms-tools" / "term-vectors.json").is_file()
+
+        with mock.patch.object(_mod, "_term_vector", side_effect=AssertionError("re-read")):
+            vectors = _mod._load_term_vectors(planning, paths)
+        assert vectors[0]["tf"] == {"jwt": 2}
+
+        paths[1].write_text("---\nphase: 02-p\n---\njwt added later\n")
+        os.utime(paths[1], ns=(1, 1))
+        vectors = _mod._load_term_vectors(planning, paths)
+        assert vectors[1]["tf"]["jwt"] == 1
+
+    def test_no_keywords_skips_vectors(self, tmp_path):
+        planning, paths = self._write_bodies(tmp_path, ["jwt"])
+        with mock.patch.object(_mod, "_load_term_vectors") as load:
+            assert _mod._summary_body_matches(planning, paths, []) == {}
+        load.assert_not_called()
+
+
 class TestResolveTransitiveRequires:
     def test_direct_affects(self):
         summaries = [
@@ -642,6 +733,66 @@ class TestHasReadinessSection:
         assert _has_readiness_section(f) is False
 
 
+class TestMarkdownArtifact:
+    """Single-read loader with ##/### heading index."""
+
+    TEXT = (
+        "---\nphase: '05'\n---\n\n# Title\n\n## Summary\n\nDone.\n\n"
+        "### Detail\n\nNested.\n\n## Next Phase Readiness\n\n- Token refresh\n"
+    )
+
+    def test_frontmatter_and_headings(self):
+        doc = _mod.MarkdownArtifact(self.TEXT)
+        assert doc.frontmatter == {"phase": "05"}
+        assert [(h[0], h[1]) for h in doc.headings] == [
+            (2, "Summary"), (3, "Detail"), (2, "Next Phase Readiness"),
+        ]
+
+    def test_section_includes_subsections(self):
+        doc = _mod.MarkdownArtifact(self.TEXT)
+        summary = doc.section("Summary")
+        assert "Done." in summary and "### Detail" in summary
+        assert "Token refresh" not in summary
+        assert doc.section("Detail").strip() == "Nested."
+        assert doc.section("Missing") is None
+        assert doc.has_section("Next Phase Readiness")
+
+    def test_sections_match_line_split(self):
+        body = "## A\nk: v\n### sub\nx\n## B\ny"
+        assert _mod.MarkdownArtifact(body, has_frontmatter=False).sections(2) == {
+            "A": "k: v\n### sub\nx", "B": "y",
+        }
+
+    def test_invalid_frontmatter(self):
+        doc = _mod.MarkdownArtifact("---\n: [bad\n---\n## A\n")
+        assert doc.frontmatter is None
+        assert doc.has_section("A")
+
+    def test_readiness_as_subsection(self, tmp_path):
+        f = tmp_path / "test.md"
+        f.write_text("## Summary\n\n### Next Phase Readiness\n\n- Pending migration\n")
+        assert _has_readiness_section(f) is True
+
+    def test_scan_reads_each_summary_once(self, tmp_path):
+        planning = tmp_path / ".planning"
+        d = planning / "phases" / "05-auth"
+        d.mkdir(parents=True)
+        summary = d / "05-01-SUMMARY.md"
+        summary.write_text(self.TEXT)
+
+        reads: list[Path] = []
+        original = Path.read_text
+
+        def counting(self, *args, **kwargs):
+            reads.append(self)
+            return original(self, *args, **kwargs)
+
+        with mock.patch.object(Path, "read_text", counting):
+            entries, _ = _scan_summaries(planning, "06", 6, [], [], [])
+        assert entries[0]["has_readiness_warnings"] is True
+        assert reads.count(summary) == 1
+
+
 # ===================================================================
 # Part 2: Golden-File Integration Test
 # ===================================================================
@@ -814,6 +965,290 @@ class TestScanIntegrationTargeted:
         assert output["sources"]["parse_errors"] == []
 
 
+def _write_scan_tree(tmp_path: Path) -> Path:
+    """Create a minimal .planning/ tree with summaries at mixed relevance."""
+    planning = tmp_path / ".planning"
+    summaries = {
+        "02-infra": "phase: 02-infra\nsubsystem: infra\ntech-stack:\n  added: [postgres]\n",
+        "04-setup": "phase: 04-setup\nsubsystem: setup\ntech-stack:\n  added: [dotenv]\n",
+        "05-auth": (
+            "phase: 05-auth\nsubsystem: auth\naffects: [06-dashboard]\n"
+            "requires:\n  - phase: 04-setup\ntech-stack:\n  added: [jose]\n"
+        ),
+    }
+    for name, fm in summaries.items():
+        d = planning / "phases" / name
+        d.mkdir(parents=True)
+        (d / f"{name[:2]}-01-SUMMARY.md").write_text(f"---\n{fm}---\n\n# Summary\n")
+    todos = planning / "todos"
+    todos.mkdir()
+    (todos / "logout.md").write_text("---\ntitle: Add logout endpoint\nsubsystem: auth\n---\n")
+    knowledge = planning / "knowledge"
+    knowledge.mkdir()
+    (knowledge / "auth.md").write_text("# Auth\n")
+    return planning
+
+
+class TestArchivedSummaryIndex:
+    """PHASE-SUMMARIES.index.json offsets and archived summaries in scan-planning-context."""
+
+    def _archive(self, tmp_path):
+        planning = _write_scan_tree(tmp_path)
+        (planning / "phases" / "04-setup" / "04-01-SUMMARY.md").write_text(
+            "---\nphase: 04-setup\nsubsystem: setup\ntech-stack:\n  added: [dotenv]\n---\n\n"
+            "# Summary\n\nRotated the JWT signing keys.\n\n## Next Phase Readiness\n\n- env vars needed\n"
+        )
+        milestone = planning / "milestones" / "mvp"
+        milestone.mkdir(parents=True)
+        with mock.patch.object(_mod, "find_git_root", return_value=tmp_path), \
+                mock.patch.object(_mod.GitSession, "resolve", return_value=None):
+            _mod.cmd_archive_milestone_phases(argparse.Namespace(start_phase=2, end_phase=4, milestone="mvp"))
+        return planning, milestone
+
+    def test_index_records_offsets_and_frontmatter(self, tmp_path, capsys):
+        _, milestone = self._archive(tmp_path)
+        data = (milestone / "PHASE-SUMMARIES.md").read_bytes()
+        index = json.loads((milestone / "PHASE-SUMMARIES.index.json").read_text())
+
+        assert [e["plan"] for e in index["summaries"]] == ["02-01", "04-01"]
+        entry = index["summaries"][1]
+        body = data[entry["offset"]:entry["offset"] + entry["length"]].decode()
+        assert body.startswith("---\nphase: 04-setup") and body.endswith("- env vars needed\n")
+        lines = data.decode().splitlines()
+        assert lines[entry["lines"][0] - 1] == "---" and lines[entry["lines"][1] - 1] == "- env vars needed"
+        assert entry["frontmatter"]["subsystem"] == "setup" and entry["readiness"] is True
+
+    def test_scan_includes_archived_summaries(self, tmp_path, capsys):
+        planning, milestone = self._archive(tmp_path)
+        capsys.readouterr()
+        reads: list[Path] = []
+        original = Path.read_text
+
+        def counting(self, *args, **kwargs):
+            reads.append(self)
+            return original(self, *args, **kwargs)
+
+        args = argparse.Namespace(phase="6", phase_name="", subsystems=["auth"], keywords="jwt",
+                                  json=True, ndjson=False, no_cache=True)
+        with mock.patch.object(_mod, "find_planning_dir_optional", return_value=planning), \
+                mock.patch.object(Path, "read_text", counting):
+            _mod.cmd_scan_planning_context(args)
+        out = json.loads(capsys.readouterr().out)
+
+        assert out["sources"]["summaries"]["archived"] == 2
+        assert not any(p.name == "PHASE-SUMMARIES.md" for p in reads)  # bodies read by byte range only
+        setup = next(s for s in out["summaries"] if s["frontmatter"]["phase"] == "04-setup")
+        assert setup["path"] == str(milestone / "PHASE-SUMMARIES.md")
+        start, end = setup["lines"]
+        assert (milestone / "PHASE-SUMMARIES.md").read_text().splitlines()[start - 1] == "---"
+        assert setup["relevance"] == "HIGH"  # required by 05-auth, which affects 06
+        assert setup["has_readiness_warnings"] is True
+        archived = _mod._archived_summaries(planning)
+        matches = _mod._summary_body_matches(planning, archived, ["jwt"])
+        key = f"{setup['path']}#L{start}-L{end}"
+        assert list(matches) == [key] and matches[key][1] == ["jwt"]
+        assert [s["frontmatter"]["phase"] for s in out["summaries"]].count("05-auth") == 1
+
+        args.json = False
+        with mock.patch.object(_mod, "find_planning_dir_optional", return_value=planning):
+            _mod.cmd_scan_planning_context(args)
+        markdown = capsys.readouterr().out
+        assert f"- `{setup['path']}` (lines {start}-{end})" in markdown
+        assert "#L" not in markdown
+
+
+class TestScanPlanningContextNdjson:
+    """--ndjson streams tagged records with HIGH summaries first."""
+
+    def _run(self, planning, capsys, fmt="ndjson"):
+        args = argparse.Namespace(
+            phase="06", phase_name="", subsystems=["auth"], keywords="",
+            json=fmt == "json", ndjson=fmt == "ndjson", no_cache=False,
+        )
+        with mock.patch.object(_mod, "find_planning_dir_optional", return_value=planning):
+            _mod.cmd_scan_planning_context(args)
+        out = capsys.readouterr().out
+        if fmt == "json":
+            return json.loads(out)
+        return [json.loads(line) for line in out.splitlines()]
+
+    def test_record_order(self, tmp_path, capsys):
+        records = self._run(_write_scan_tree(tmp_path), capsys)
+        sources = [r["source"] for r in records]
+        assert sources[0] == "target"
+        assert sources[-2:] == ["aggregated", "sources"]
+        summaries = [r["record"] for r in records if r["source"] == "summaries"]
+        # 05-auth is directly HIGH; the rest follow in path order, with 04-setup
+        # upgraded via transitive requires on the second pass
+        assert [s["frontmatter"]["phase"] for s in summaries] == ["05-auth", "02-infra", "04-setup"]
+        assert summaries[1]["relevance"] == "LOW"
+        assert summaries[2]["relevance"] == "HIGH"
+        assert any("transitive" in r for r in summaries[2]["match_reasons"])
+
+    def test_matches_json_output(self, tmp_path, capsys):
+        planning = _write_scan_tree(tmp_path)
+        records = self._run(planning, capsys)
+        full = self._run(planning, capsys, fmt="json")
+
+        by_source: dict[str, list] = {}
+        for r in records:
+            by_source.setdefault(r["source"], []).append(r["record"])
+        assert by_source["aggregated"][0] == full["aggregated"]
+        assert by_source["sources"][0] == full["sources"]
+        assert by_source["target"][0] == full["target"]
+        assert by_source["pending_todos"] == full["pending_todos"]
+        assert by_source["knowledge_files"] == full["knowledge_files"]
+        key = lambda s: s["path"]
+        assert sorted(by_source["summaries"], key=key) == sorted(full["summaries"], key=key)
+
+    def test_no_planning_dir(self, capsys):
+        records = self._run(None, capsys)
+        assert [r["source"] for r in records] == ["target", "aggregated", "sources"]
+        assert records[2]["record"]["summaries"]["skipped"] == ".planning/ not found"
+
+    def test_closed_pipe_exits_quietly(self, tmp_path):
+        with open(tmp_path / "stdout", "wb") as target:
+
+            class ClosedPipe(io.StringIO):
+                def write(self, s):
+                    raise BrokenPipeError
+
+                def fileno(self):
+                    return target.fileno()
+
+            args = argparse.Namespace(
+                phase="06", phase_name="", subsystems=["auth"], keywords="",
+                json=False, ndjson=True, no_cache=False,
+            )
+            with mock.patch.object(_mod, "find_planning_dir_optional", return_value=_write_scan_tree(tmp_path)), \
+                    mock.patch.object(_mod.sys, "stdout", ClosedPipe()), pytest.raises(SystemExit) as exc:
+                _mod.cmd_scan_planning_context(args)
+            os.write(target.fileno(), b"after")  # now devnull
+        assert exc.value.code == 0
+        assert (tmp_path / "stdout").read_bytes() == b""
+
+
+class TestScanPlanningContextMultiPhase:
+    """--phase with several targets parses artifacts once and scores per phase."""
+
+    def _run(self, planning, capsys, phase):
+        args = argparse.Namespace(
+            phase=phase, phase_name="", subsystems=[], keywords="",
+            json=True, ndjson=False, no_cache=True,
+        )
+        with mock.patch.object(_mod, "find_planning_dir_optional", return_value=planning):
+            _mod.cmd_scan_planning_context(args)
+        return json.loads(capsys.readouterr().out)
+
+    def test_parse_phase_targets(self):
+        assert _mod._parse_phase_targets("5") == ["05"]
+        assert _mod._parse_phase_targets("5,6,7") == ["05", "06", "07"]
+        assert _mod._parse_phase_targets("5-7,2.1,6") == ["05", "06", "07", "02.1"]
+        with pytest.raises(ValueError):
+            _mod._parse_phase_targets("7-5")
+
+    def test_per_phase_relevance(self, tmp_path, capsys):
+        out = self._run(_write_scan_tree(tmp_path), capsys, "6-7")
+        assert out["target"]["phases"] == ["06", "07"]
+        assert list(out["phases"]) == ["06", "07"]
+
+        def relevance(phase):
+            return {Path(s["path"]).parent.name: s["relevance"] for s in out["phases"][phase]["summaries"]}
+
+        # 05-auth affects 06 (HIGH, pulling 04-setup in transitively); for 07 it is only adjacent
+        assert relevance("06") == {"02-infra": "LOW", "04-setup": "HIGH", "05-auth": "HIGH"}
+        assert relevance("07") == {"02-infra": "LOW", "04-setup": "LOW", "05-auth": "MEDIUM"}
+
+        shared = {Path(s["path"]).parent.name: s["relevance"] for s in out["summaries"]}
+        assert shared == {"02-infra": "LOW", "04-setup": "HIGH", "05-auth": "HIGH"}
+        assert out["aggregated"]["tech_stack_added"] == ["dotenv", "jose"]
+
+    def test_matches_single_phase_scoring(self, tmp_path, capsys):
+        planning = _write_scan_tree(tmp_path)
+        multi = self._run(planning, capsys, "6,7")
+        single = self._run(planning, capsys, "7")
+        assert [(s["path"], s["relevance"], s["match_reasons"]) for s in multi["phases"]["07"]["summaries"]] == [
+            (s["path"], s["relevance"], s["match_reasons"]) for s in single["summaries"]
+        ]
+
+    def test_summaries_read_once(self, tmp_path, capsys):
+        planning = _write_scan_tree(tmp_path)
+        reads: list[Path] = []
+        original = Path.read_text
+
+        def counting(self, *args, **kwargs):
+            reads.append(self)
+            return original(self, *args, **kwargs)
+
+        with mock.patch.object(Path, "read_text", counting):
+            self._run(planning, capsys, "5-9")
+        summary_reads = [p for p in reads if p.name.endswith("-SUMMARY.md")]
+        assert len(summary_reads) == 3
+
+
+class TestScanPlanningContextCache:
+    """Rendered results are memoized per normalized args and tree fingerprint."""
+
+    def _run(self, planning, capsys, keywords="", no_cache=False, verbose=True):
+        args = argparse.Namespace(
+            phase="6", phase_name="", subsystems=["auth"], keywords=keywords,
+            json=True, ndjson=False, no_cache=no_cache, verbose=verbose,
+        )
+        with mock.patch.object(_mod, "find_planning_dir_optional", return_value=planning):
+            _mod.cmd_scan_planning_context(args)
+        captured = capsys.readouterr()
+        return captured.out, captured.err
+
+    def test_hit_on_identical_args(self, tmp_path, capsys):
+        (tmp_path / ".git").mkdir()
+        planning = _write_scan_tree(tmp_path)
+        first, err = self._run(planning, capsys)
+        assert "cache: miss" in err
+
+        with mock.patch.object(_mod, "_scan_summaries", side_effect=AssertionError("rescanned")):
+            second, err = self._run(planning, capsys)
+        assert "cache: hit" in err
+        assert second == first
+
+    def test_quiet_without_verbose(self, tmp_path, capsys):
+        (tmp_path / ".git").mkdir()
+        planning = _write_scan_tree(tmp_path)
+        first, err = self._run(planning, capsys, verbose=False)
+        assert err == ""
+        second, err = self._run(planning, capsys, verbose=False)
+        assert err == "" and second == first
+
+    def test_miss_when_args_differ(self, tmp_path, capsys):
+        (tmp_path / ".git").mkdir()
+        planning = _write_scan_tree(tmp_path)
+        self._run(planning, capsys)
+        _, err = self._run(planning, capsys, keywords="jwt")
+        assert "cache: miss" in err
+
+    def test_miss_after_file_change(self, tmp_path, capsys):
+        (tmp_path / ".git").mkdir()
+        planning = _write_scan_tree(tmp_path)
+        self._run(planning, capsys)
+        todo = planning / "todos" / "logout.md"
+        todo.write_text("---\ntitle: Add logout and refresh endpoints\nsubsystem: auth\n---\n")
+        os.utime(todo, ns=(1, 1))
+        out, err = self._run(planning, capsys)
+        assert "cache: miss" in err
+        assert json.loads(out)["pending_todos"][0]["title"] == "Add logout and refresh endpoints"
+
+    def test_no_cache_flag(self, tmp_path, capsys):
+        (tmp_path / ".git").mkdir()
+        planning = _write_scan_tree(tmp_path)
+        self._run(planning, capsys)
+        _, err = self._run(planning, capsys, no_cache=True)
+        assert "cache:" not in err
+
+    def test_no_git_dir_disables_cache(self, tmp_path, capsys):
+        planning = _write_scan_tree(tmp_path)
+        _, err = self._run(planning, capsys)
+        assert "cache:" not in err
+
+
 # ===================================================================
 # Part 3: Milestone Naming Detection Tests
 # ===================================================================
@@ -1139,7 +1574,7 @@ class TestCmdGatherMilestoneStats:
     def test_both_plan_and_summary(self, tmp_path, capsys):
         self._make_phase(tmp_path, "01-auth",
                          plans=["01-01-PLAN.md"], summaries=["01-01-SUMMARY.md"])
-        args = argparse.Namespace(start_phase=1, end_phase=1)
+        args = argparse.Namespace(start_phase=1, end_phase=1, all_history=False, change_stats=False, breakdown=False)
         with self._patch_git_root(tmp_path), self._patch_run_git():
             cmd_gather_milestone_stats(args)
         out = capsys.readouterr().out
@@ -1150,7 +1585,7 @@ class TestCmdGatherMilestoneStats:
         """PLAN.md cleaned up after execution — SUMMARY.md alone counts."""
         self._make_phase(tmp_path, "09-persistence",
                          summaries=["09-01-SUMMARY.md", "09-02-SUMMARY.md"])
-        args = argparse.Namespace(start_phase=9, end_phase=9)
+        args = argparse.Namespace(start_phase=9, end_phase=9, all_history=False, change_stats=False, breakdown=False)
         with self._patch_git_root(tmp_path), self._patch_run_git():
             cmd_gather_milestone_stats(args)
         out = capsys.readouterr().out
@@ -1160,7 +1595,7 @@ class TestCmdGatherMilestoneStats:
     def test_plan_only_no_summary_is_incomplete(self, tmp_path, capsys):
         self._make_phase(tmp_path, "03-setup",
                          plans=["03-01-PLAN.md"])
-        args = argparse.Namespace(start_phase=3, end_phase=3)
+        args = argparse.Namespace(start_phase=3, end_phase=3, all_history=False, change_stats=False, breakdown=False)
         with self._patch_git_root(tmp_path), self._patch_run_git():
             cmd_gather_milestone_stats(args)
         out = capsys.readouterr().out
@@ -1174,7 +1609,7 @@ class TestCmdGatherMilestoneStats:
         self._make_phase(tmp_path, "10-transactions",
                          plans=["10-01-PLAN.md"],
                          summaries=["10-01-SUMMARY.md"])
-        args = argparse.Namespace(start_phase=9, end_phase=10)
+        args = argparse.Namespace(start_phase=9, end_phase=10, all_history=False, change_stats=False, breakdown=False)
         with self._patch_git_root(tmp_path), self._patch_run_git():
             cmd_gather_milestone_stats(args)
         out = capsys.readouterr().out
@@ -1183,7 +1618,7 @@ class TestCmdGatherMilestoneStats:
 
     def test_no_plans_or_summaries(self, tmp_path, capsys):
         self._make_phase(tmp_path, "01-auth")
-        args = argparse.Namespace(start_phase=1, end_phase=1)
+        args = argparse.Namespace(start_phase=1, end_phase=1, all_history=False, change_stats=False, breakdown=False)
         with self._patch_git_root(tmp_path), self._patch_run_git():
             cmd_gather_milestone_stats(args)
         out = capsys.readouterr().out
@@ -1191,6 +1626,106 @@ class TestCmdGatherMilestoneStats:
         assert "Status: NOT READY" in out
 
 
+    def test_git_stats_single_log_pass(self, tmp_path, capsys, monkeypatch):
+        """Formerly two `git log --all --grep` runs per phase spelling; now one log + one diff."""
+        repo = _init_repo(tmp_path)
+        self._make_phase(repo, "01-auth", summaries=["01-01-SUMMARY.md"])
+        self._make_phase(repo, "02.1-hotfix", summaries=["02.1-01-SUMMARY.md"])
+        _commit(repo, "chore: scaffold")
+        _commit(repo, "feat(01-auth): login", "src/a.txt")
+        _commit(repo, "fix(1-auth): typo", "src/a.txt")
+        _commit(repo, "feat(02.1-hotfix): patch", "src/b.txt")
+        _commit(repo, "chore: cleanup\n\nFollow-up to (02-api- work", "src/c.txt")
+        _commit(repo, "feat(03-billing): later", "src/d.txt")
+
+        calls = []
+        real_run_git = _mod.run_git
+
+        def spy(*args):
+            calls.append(args)
+            return real_run_git(*args)
+
+        monkeypatch.chdir(repo)
+        args = argparse.Namespace(start_phase=1, end_phase=2, all_history=False, change_stats=False, breakdown=False)
+        with self._patch_git_root(repo), mock.patch.object(_mod, "run_git", side_effect=spy):
+            cmd_gather_milestone_stats(args)
+        out = capsys.readouterr().out
+
+        assert [c[0] for c in calls] == ["log", "diff"]
+        # feat(01-auth), fix(1-auth), feat(02.1-hotfix) and the body mention of (02-
+        assert "Commits: 4" in out
+        assert "feat(01-auth): login" in out
+        assert "billing" not in out
+        assert "Changes:" in out and "insertions(+)" in out
+
+    def test_commit_stats_cached_by_oid(self, tmp_path, capsys, monkeypatch):
+        repo = _init_repo(tmp_path)
+        self._make_phase(repo, "01-auth", summaries=["01-01-SUMMARY.md"])
+        self._make_phase(repo, "02-api", summaries=["02-01-SUMMARY.md"])
+        _commit(repo, "chore: scaffold")
+        _commit(repo, "feat(01-auth): login", "src/a.txt")
+        _commit(repo, "feat(02-api): routes", "src/b.txt")
+        _commit(repo, "fix(02-api): routes", "src/b.txt")
+        monkeypatch.chdir(repo)
+        args = argparse.Namespace(start_phase=1, end_phase=2, all_history=True, change_stats=False, breakdown=True)
+        with self._patch_git_root(repo):
+            cmd_gather_milestone_stats(args)
+        first = capsys.readouterr().out
+
+        calls = []
+        real_run_git = _mod.run_git
+
+        def spy(*args):
+            calls.append(args)
+            return real_run_git(*args)
+
+        with self._patch_git_root(repo), mock.patch.object(_mod, "run_git", side_effect=spy):
+            cmd_gather_milestone_stats(args)
+        second = capsys.readouterr().out
+
+        assert not any("--numstat" in c for c in calls)  # every row served from the cache
+        assert second == first
+        assert "Phase 01: 1 commit(s), 1 file changed, 1 insertion(+)" in first
+        assert "Phase 02: 2 commit(s), 1 file changed, 2 insertions(+)" in first
+        today = datetime.date.today().isoformat()
+        assert f"=== Daily Timeline ===\n\n{today}: " in first
+
+    def test_changes_is_net_diff_and_churn_is_separate(self, tmp_path, capsys, monkeypatch):
+        repo = _init_repo(tmp_path)
+        self._make_phase(repo, "01-auth", summaries=["01-01-SUMMARY.md"])
+        _commit(repo, "chore: scaffold")
+        _commit(repo, "feat(01-auth): add keep", "src/keep.txt")
+        _commit(repo, "feat(01-auth): add temp", "src/temp.txt")
+        (repo / "src" / "temp.txt").unlink()
+        _commit(repo, "fix(01-auth): drop temp")
+        monkeypatch.chdir(repo)
+        args = argparse.Namespace(start_phase=1, end_phase=1, all_history=True, change_stats=False, breakdown=True)
+        with self._patch_git_root(repo), mock.patch.object(_mod, "_tool_cache_dir", return_value=None):
+            cmd_gather_milestone_stats(args)
+        out = capsys.readouterr().out
+
+        first, last = re.search(r"^Git range: (\w+)\.\.(\w+)$", out, re.M).groups()
+        net = _git(repo, "diff", "--shortstat", f"{first}^..{last}")
+        assert f"Changes:{net}\n" in out
+        assert "Churn: 3 commit(s), 3 files changed, 3 insertions(+), 1 deletion(-)" in out
+
+    def test_format_commit_stats_pluralises_like_git(self):
+        fmt = _mod._format_commit_stats
+        assert fmt({"files": 1, "insertions": 1, "deletions": 0}) == "1 file changed, 1 insertion(+)"
+        assert fmt({"files": 2, "insertions": 0, "deletions": 3}) == "2 files changed, 3 deletions(-)"
+        assert fmt({"files": 1, "insertions": 0, "deletions": 0}) == "1 file changed, 0 insertions(+), 0 deletions(-)"
+
+    def test_bucket_phase_commits_matches_spellings(self):
+        log = "\0".join([
+            "c3 2024-01-03 10:00:00 +0000 feat(5-api): raw\x01feat(5-api): raw\n",
+            "c2 2024-01-02 10:00:00 +0000 feat(05.1-fix): dec\x01feat(05.1-fix): dec\n",
+            "c1 2024-01-01 10:00:00 +0000 feat(15-x): other\x01feat(15-x): other\n",
+        ])
+        with mock.patch.object(_mod, "run_git", return_value=log):
+            buckets = _mod._bucket_phase_commits(["05", "5", "05.1"])
+        assert {k: [h.split()[0] for h in v] for k, v in buckets.items()} == {"5": ["c3"], "05.1": ["c2"]}
+
+
 # ===================================================================
 # Part 4: UAT File Management Tests
 # ===================================================================
@@ -2085,6 +2620,14 @@ class TestCmdUatFixCommit:
         uat_path.write_text(content)
         return uat_path
 
+    def _patch_head(self, short):
+        """Make the git session report HEAD as a commit whose hash starts with *short*."""
+        return mock.patch.multiple(
+            _mod.GitSession,
+            resolve=mock.Mock(return_value=short + "0" * (40 - len(short))),
+            abbrev=mock.Mock(return_value=short),
+        )
+
     def test_new_commit(self, tmp_path, capsys):
         uat_path = self._setup_uat(tmp_path)
         # Test 4 has no fix_commit
@@ -2096,13 +2639,12 @@ class TestCmdUatFixCommit:
                 return ""
             if args[0] == "commit":
                 return ""
-            if args[:2] == ("rev-parse", "--short"):
-                return "def5678"
             return ""
 
         args = argparse.Namespace(phase="5", test=4, message="fix(05-uat): fix expired token", files=["auth.dart"])
         with self._patch_git_root(tmp_path), \
-             mock.patch.object(_mod, "run_git", side_effect=mock_run_git):
+             mock.patch.object(_mod, "run_git", side_effect=mock_run_git), \
+             self._patch_head("def5678"):
             cmd_uat_fix_commit(args)
 
         captured = capsys.readouterr()
@@ -2127,15 +2669,14 @@ class TestCmdUatFixCommit:
         def mock_run_git(*args):
             if args[0] == "add":
                 return ""
-            if args[:2] == ("rev-parse", "--short"):
-                return "abc1234"  # HEAD matches fix_commit → amend
             if args[0] == "commit":
                 return ""
             return ""
 
         args = argparse.Namespace(phase="5", test=3, message="fix(05-uat): better error", files=["auth.dart"])
         with self._patch_git_root(tmp_path), \
-             mock.patch.object(_mod, "run_git", side_effect=mock_run_git):
+             mock.patch.object(_mod, "run_git", side_effect=mock_run_git), \
+             self._patch_head("abc1234"):
             cmd_uat_fix_commit(args)
 
         captured = capsys.readouterr()
@@ -2152,15 +2693,14 @@ class TestCmdUatFixCommit:
             call_log.append(args)
             if args[0] == "add":
                 return ""
-            if args[:2] == ("rev-parse", "--short"):
-                return "zzz9999"  # HEAD different from abc1234 → new commit
             if args[0] == "commit":
                 return ""
             return ""
 
         args = argparse.Namespace(phase="5", test=3, message="fix(05-uat): retry fix", files=["auth.dart"])
         with self._patch_git_root(tmp_path), \
-             mock.patch.object(_mod, "run_git", side_effect=mock_run_git):
+             mock.patch.object(_mod, "run_git", side_effect=mock_run_git), \
+             self._patch_head("zzz9999"):
             cmd_uat_fix_commit(args)
 
         captured = capsys.readouterr()
@@ -2606,6 +3146,10 @@ class TestCmdConfigDelete:
 class TestFindPhaseCommitHashes:
     """Unit tests for find_phase_commit_hashes (mock run_git)."""
 
+    @pytest.fixture(autouse=True)
+    def _no_index(self, monkeypatch):
+        monkeypatch.setattr(_mod, "_tool_cache_dir", lambda root: None)
+
     def _mock_log(self, lines):
         return mock.patch.object(_mod, "run_git", return_value="\n".join(lines))
 
@@ -2702,9 +3246,919 @@ class TestFindPhaseCommitHashes:
         assert result == []
 
 
+def _git(repo: Path, *args: str) -> str:
+    """Run git in a scratch repo with a fixed identity."""
+    import subprocess
+    result = subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", "-c", "commit.gpgsign=false", *args],
+        cwd=repo, capture_output=True, text=True, check=True,
+    )
+    return result.stdout.strip()
+
+
+def _init_repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    return repo
+
+
+def _commit(repo: Path, message: str, path: str = "file.txt") -> str:
+    target = repo / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with target.open("a") as f:
+        f.write(message + "\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", message)
+    return _git(repo, "rev-parse", "--short", "HEAD")
+
+
+def _patch_repo(tmp_path: Path, monkeypatch, commits=(), init_path: str = "file.txt", cache: bool = False) -> Path:
+    """Scratch repo made the working directory: a ``chore: init`` commit plus *commits*.
+
+    *commits* are (message, path) pairs passed to _commit. find_git_root points
+    at the repo and, unless *cache* is set, the tool cache dir is stubbed out.
+    """
+    repo = _init_repo(tmp_path)
+    _commit(repo, "chore: init", init_path)
+    for message, path in commits:
+        _commit(repo, message, path)
+    monkeypatch.chdir(repo)
+    monkeypatch.setattr(_mod, "find_git_root", lambda: repo)
+    if not cache:
+        monkeypatch.setattr(_mod, "_tool_cache_dir", lambda root: None)
+    return repo
+
+
+def _phase_patch_args(**overrides) -> argparse.Namespace:
+    """generate-phase-patch args at their CLI defaults, with --all-history on for scratch repos."""
+    args = dict(phase=None, range=None, jobs=None, suffix="", all_history=True, binary=False, split=False,
+                change_stats=False, compress=None, force=False, max_lines=None, max_file_lines=None, scope="all")
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+class TestGitSession:
+    """GitSession lookups over persistent cat-file processes (real git repo)."""
+
+    def test_resolve_and_abbrev(self, tmp_path):
+        repo = _init_repo(tmp_path)
+        short = _commit(repo, "feat(01-setup): init")
+        session = _mod.GitSession(str(repo))
+        try:
+            assert session.resolve("HEAD") == _git(repo, "rev-parse", "HEAD")
+            assert session.abbrev("HEAD") == short
+            assert session.resolve("no-such-ref") is None
+            assert session.resolve("HEAD^") is None
+        finally:
+            session.close()
+
+    def test_abbrev_honours_core_abbrev(self, tmp_path):
+        repo = _init_repo(tmp_path)
+        _commit(repo, "feat(01-setup): init")
+        _git(repo, "config", "core.abbrev", "12")
+        session = _mod.GitSession(str(repo))
+        try:
+            assert session.abbrev("HEAD") == _git(repo, "log", "-1", "--format=%h")
+            assert len(session.abbrev("HEAD")) == 12
+        finally:
+            session.close()
+
+    def test_read_blob_at_old_revision(self, tmp_path):
+        repo = _init_repo(tmp_path)
+        _commit(repo, "feat(01-setup): first")
+        _commit(repo, "feat(01-setup): second")
+        session = _mod.GitSession(str(repo))
+        try:
+            assert session.read_blob("HEAD~1", "file.txt") == b"feat(01-setup): first\n"
+            assert session.read_blob("HEAD", "file.txt").count(b"\n") == 2
+            assert session.read_blob("HEAD", "missing.txt") is None
+            assert session.read_blob("HEAD", "no such.txt") is None
+            assert session.object_info("HEAD:a b c.txt") is None
+            assert session.resolve_many(["HEAD:no such.txt"]) == {"HEAD:no such.txt": None}
+            assert session.commit_subject("HEAD~1") == "feat(01-setup): first"
+        finally:
+            session.close()
+
+    def test_reuses_process_and_sees_new_commits(self, tmp_path):
+        repo = _init_repo(tmp_path)
+        _commit(repo, "feat(01-setup): first")
+        session = _mod.GitSession(str(repo))
+        try:
+            session.resolve("HEAD")
+            proc = session._procs["--batch-check"]
+            _commit(repo, "feat(01-setup): second")
+            assert session.resolve("HEAD") == _git(repo, "rev-parse", "HEAD")
+            assert session._procs["--batch-check"] is proc
+        finally:
+            session.close()
+
+    def test_run_paths_batches_into_one_call(self):
+        session = _mod.GitSession()
+        with mock.patch.object(_mod, "run_git", return_value="") as run:
+            session.run_paths(["checkout", "--theirs"], ["a.txt", "b.txt", "c.txt"])
+        run.assert_called_once_with("checkout", "--theirs", "--", "a.txt", "b.txt", "c.txt")
+
+
+class TestPatchStreaming:
+    """Streamed, binary-safe patch generation (real git repo)."""
+
+    def test_non_utf8_content_preserved(self, tmp_path, monkeypatch, capsys):
+        repo = _patch_repo(tmp_path, monkeypatch)
+        (repo / "latin1.txt").write_bytes(b"caf\xe9\nna\xefve\n")
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "feat(03-data): latin1")
+        _mod.cmd_generate_phase_patch(_phase_patch_args(phase="3"))
+
+        patch = repo / ".planning" / "phases" / "03-changes.patch"
+        content = patch.read_bytes()
+        assert b"+caf\xe9" in content
+        lines = content.count(b"\n")
+        assert f"Generated: .planning/phases/03-changes.patch ({lines} lines)" in capsys.readouterr().out
+
+    def test_binary_flag_includes_blob(self, tmp_path, monkeypatch, capsys):
+        repo = _patch_repo(tmp_path, monkeypatch)
+        (repo / "logo.bin").write_bytes(bytes(range(256)))
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "feat(03-data): logo")
+        first = _git(repo, "rev-parse", "HEAD")
+
+        out = tmp_path / "plain.patch"
+        _mod.cmd_generate_adhoc_patch(argparse.Namespace(commit=first, output=str(out), end=None, binary=False))
+        assert b"Binary files" in out.read_bytes()
+
+        out = tmp_path / "binary.patch"
+        _mod.cmd_generate_adhoc_patch(argparse.Namespace(commit=first, output=str(out), end=None, binary=True))
+        assert b"GIT binary patch" in out.read_bytes()
+
+    def test_empty_diff_keeps_existing_file(self, tmp_path, monkeypatch, capsys):
+        repo = _patch_repo(tmp_path, monkeypatch)
+        _commit(repo, "docs: planning only", path=".planning/notes.md")
+        head = _git(repo, "rev-parse", "HEAD")
+        out = tmp_path / "adhoc.patch"
+        out.write_text("previous")
+        _mod.cmd_generate_adhoc_patch(argparse.Namespace(commit=head, output=str(out), end=None, binary=False))
+
+        assert "Patch skipped" in capsys.readouterr().out
+        assert out.read_text() == "previous"
+        assert list(tmp_path.glob("*.tmp")) == []
+
+
+class TestCompressedPatches:
+    """--compress and patch-cat (real git repo)."""
+
+    def _repo(self, tmp_path, monkeypatch):
+        repo = _patch_repo(tmp_path, monkeypatch, [("feat(03-data): add rows", "data.txt")])
+        (repo / ".planning" / "phases" / "03-data").mkdir(parents=True)
+        return repo
+
+    @pytest.mark.parametrize("compress,suffix", [("gzip", ".gz"), ("xz", ".xz")])
+    def test_round_trip_through_patch_cat(self, tmp_path, monkeypatch, capsysbinary, compress, suffix):
+        repo = self._repo(tmp_path, monkeypatch)
+        phase_dir = repo / ".planning" / "phases" / "03-data"
+        (phase_dir / "03-changes.patch").write_text("stale")
+        _mod.cmd_generate_phase_patch(_phase_patch_args(phase="3", compress=compress))
+
+        assert f"03-changes.patch{suffix} (".encode() in capsysbinary.readouterr().out
+        assert not (phase_dir / "03-changes.patch").exists()  # plain variant replaced
+        _mod.cmd_patch_cat(argparse.Namespace(paths=[str(phase_dir / "03-changes.patch")]))
+        out = capsysbinary.readouterr().out
+        assert out == _git(repo, "diff", "HEAD~1", "HEAD", "--", ".").encode() + b"\n"
+
+    def test_adhoc_output_gets_suffix(self, tmp_path, monkeypatch):
+        self._repo(tmp_path, monkeypatch)
+        out = tmp_path / "adhoc.patch"
+        _mod.cmd_generate_adhoc_patch(argparse.Namespace(commit="HEAD", output=str(out), end=None, binary=False, compress="gzip"))
+        assert (tmp_path / "adhoc.patch.gz").read_bytes()[:2] == b"\x1f\x8b"
+
+    def test_adhoc_write_keeps_sibling_files(self, tmp_path, monkeypatch):
+        self._repo(tmp_path, monkeypatch)
+        (tmp_path / "notes.txt").write_text("mine")
+        (tmp_path / "adhoc.patch.gz").write_bytes(b"mine")
+        _mod.cmd_generate_adhoc_patch(argparse.Namespace(
+            commit="HEAD", output=str(tmp_path / "notes.txt.gz"), end=None, binary=False, compress="gzip"))
+        _mod.cmd_generate_adhoc_patch(argparse.Namespace(
+            commit="HEAD", output=str(tmp_path / "adhoc.patch"), end=None, binary=False, compress=None))
+        assert (tmp_path / "notes.txt").read_text() == "mine"
+        assert (tmp_path / "adhoc.patch.gz").read_bytes() == b"mine"
+
+    def test_patch_cat_split_directory(self, tmp_path, monkeypatch, capsysbinary):
+        repo = self._repo(tmp_path, monkeypatch)
+        _mod.cmd_generate_phase_patch(_phase_patch_args(phase="3", split=True, compress="xz"))
+        capsysbinary.readouterr()
+        split_dir = repo / ".planning" / "phases" / "03-data" / "03-changes"
+        _mod.cmd_patch_cat(argparse.Namespace(paths=[str(split_dir)]))
+        assert capsysbinary.readouterr().out.startswith(b"diff --git a/data.txt")
+
+    def test_patch_cat_missing_exits(self, tmp_path):
+        with pytest.raises(SystemExit) as exc:
+            _mod.cmd_patch_cat(argparse.Namespace(paths=[str(tmp_path / "nope.patch")]))
+        assert exc.value.code == 1
+
+
+class TestPhasePatchRange:
+    """generate-phase-patch --range (real git repo)."""
+
+    def _repo(self, tmp_path, monkeypatch):
+        repo = _patch_repo(tmp_path, monkeypatch, [
+            ("feat(01-setup): scaffold", "setup.py"),
+            ("feat(03-api): routes", "api.py"),
+            ("fix(03-api): typo", "api.py"),
+        ])
+        for name in ("01-setup", "02-db", "03-api"):
+            (repo / ".planning" / "phases" / name).mkdir(parents=True)
+        return repo
+
+    def test_consolidated_report(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        calls = []
+        real_run_git = _mod.run_git
+
+        def spy(*args):
+            calls.append(args)
+            return real_run_git(*args)
+
+        with mock.patch.object(_mod, "run_git", side_effect=spy):
+            _mod.cmd_generate_phase_patch(_phase_patch_args(range="1-3", jobs=2))
+        out = capsys.readouterr().out
+
+        assert [c for c in calls if c[0] == "log"] == [("log", "--oneline")]  # one history pass
+        assert "Phase 01: .planning/phases/01-setup/01-changes.patch" in out
+        assert "Phase 02: skipped (no commits matching phase convention)" in out
+        assert "lines, 2 commit(s))" in out
+        assert "Generated: 2, unchanged: 0, skipped: 1, errors: 0" in out
+        patch = (repo / ".planning" / "phases" / "03-api" / "03-changes.patch").read_text()
+        assert "api.py" in patch and "setup.py" not in patch
+
+    def test_reports_exclusions_and_truncation_per_phase(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        config = repo / ".planning" / "config.json"
+        config.write_text(json.dumps({"patch": {"exclude_over_lines": 1}}))
+        _mod.cmd_generate_phase_patch(_phase_patch_args(range="1-3", jobs=2))
+        phase_03 = capsys.readouterr().out.split("Phase 03: ", 1)[1]
+        assert phase_03.startswith("skipped (no implementation changes outside excluded patterns)")
+        assert "Excluded 1 generated/oversized path(s)" in phase_03
+
+        config.unlink()
+        _mod.cmd_generate_phase_patch(_phase_patch_args(range="1-3", jobs=2, max_file_lines=1))
+        phase_03 = capsys.readouterr().out.split("Phase 03: ", 1)[1]
+        assert "Truncated 1 file(s)" in phase_03 and "  api.py (+2 -0, kept 0/1 hunks)" in phase_03
+
+    def test_phase_and_range_conflict(self, tmp_path, monkeypatch):
+        self._repo(tmp_path, monkeypatch)
+        with pytest.raises(SystemExit) as exc:
+            _mod.cmd_generate_phase_patch(_phase_patch_args(phase="1", range="1-3"))
+        assert exc.value.code == 1
+
+    def test_invalid_range(self, tmp_path, monkeypatch):
+        self._repo(tmp_path, monkeypatch)
+        with pytest.raises(SystemExit) as exc:
+            _mod.cmd_generate_phase_patch(_phase_patch_args(range="5-2"))
+        assert exc.value.code == 1
+
+
+class TestPatchSidecar:
+    """Phase patch reuse via the <patch>.meta.json sidecar (real git repo)."""
+
+    def _repo(self, tmp_path, monkeypatch):
+        repo = _patch_repo(tmp_path, monkeypatch, [("feat(01-setup): scaffold", "setup.py")])
+        (repo / ".planning" / "phases" / "01-setup").mkdir(parents=True)
+        return repo
+
+    def _run(self, capsys, **overrides):
+        with mock.patch.object(_mod.GitSession, "stream", autospec=True, side_effect=_mod.GitSession.stream) as stream:
+            _mod.cmd_generate_phase_patch(_phase_patch_args(**{"phase": "1", **overrides}))
+        return capsys.readouterr().out, stream.call_count
+
+    def test_second_run_skips_diff(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        out, diffs = self._run(capsys)
+        assert "Generated:" in out and diffs == 1
+        sidecar = json.loads((repo / ".planning/phases/01-setup/01-changes.patch.meta.json").read_text())
+        assert sidecar["head"] == _git(repo, "rev-parse", "HEAD")
+        assert sidecar["output"] == ".planning/phases/01-setup/01-changes.patch"
+
+        out, diffs = self._run(capsys)
+        assert "Up to date: .planning/phases/01-setup/01-changes.patch" in out and diffs == 0
+
+    def test_regenerates_on_new_head_force_or_config(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        self._run(capsys)
+        _commit(repo, "feat(01-setup): more", path="setup.py")
+        assert self._run(capsys)[1] == 1
+        assert self._run(capsys, force=True)[1] == 1
+        (repo / ".planning" / "config.json").write_text(json.dumps({"patch": {"exclude": ["*.md"]}}))
+        assert self._run(capsys)[1] == 1
+        assert self._run(capsys)[1] == 0
+
+    def test_nested_gitattributes_invalidate(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        _commit(repo, "feat(01-setup): data", path="src/big.txt")
+        self._run(capsys)
+        (repo / "src" / ".gitattributes").write_text("*.txt linguist-generated\n")
+        out, diffs = self._run(capsys)
+        assert diffs == 1 and "Up to date" not in out
+        assert "src/big.txt" not in (repo / ".planning/phases/01-setup/01-changes.patch").read_text()
+        assert self._run(capsys)[1] == 0
+
+    def test_options_and_missing_output_invalidate(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        self._run(capsys)
+        assert self._run(capsys, compress="gzip")[1] == 1
+        (repo / ".planning/phases/01-setup/01-changes.patch.gz").unlink()
+        assert self._run(capsys, compress="gzip")[1] == 1
+
+    def test_range_reports_unchanged(self, tmp_path, monkeypatch, capsys):
+        self._repo(tmp_path, monkeypatch)
+        self._run(capsys, phase=None, range="1-1")
+        out, diffs = self._run(capsys, phase=None, range="1-1")
+        assert diffs == 0
+        assert "Generated: 0, unchanged: 1, skipped: 0, errors: 0" in out
+
+
+class TestBudgetedPatches:
+    """--max-lines / --max-file-lines budgeting (real git repo)."""
+
+    def _repo(self, tmp_path, monkeypatch):
+        repo = _patch_repo(tmp_path, monkeypatch, cache=True)
+        # Far-apart edits in big.txt produce several hunks
+        (repo / "big.txt").write_text("".join(f"line {i}\n" for i in range(200)))
+        _commit(repo, "chore: big file", "big.txt")
+        text = (repo / "big.txt").read_text().splitlines(keepends=True)
+        for i in (10, 60, 110, 160):
+            text[i] = f"changed {i}\n"
+        (repo / "big.txt").write_text("".join(text))
+        (repo / "small.py").write_text("print('hi')\n")
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "feat(05-x): change")
+        return repo
+
+    def _adhoc(self, tmp_path, **budget):
+        out = tmp_path / "adhoc.patch"
+        args = argparse.Namespace(commit="HEAD", output=str(out), end=None, binary=False, compress=None, **budget)
+        _mod.cmd_generate_adhoc_patch(args)
+        return out.read_text()
+
+    def test_per_file_cap_keeps_leading_hunks(self, tmp_path, monkeypatch, capsys):
+        self._repo(tmp_path, monkeypatch)
+        content = self._adhoc(tmp_path, max_lines=None, max_file_lines=25)
+        out = capsys.readouterr().out
+
+        assert "+print('hi')" in content  # small file kept whole
+        assert "# ms-tools: big.txt +4 -4, showing 2 of 4 hunk(s) and 3 line(s) of hunk 3" in content
+        assert "# ms-tools: truncated 2 hunk(s)" in content
+        assert "+changed 60" in content and "+changed 110" not in content
+        assert "big.txt (+4 -4, kept 2/4 hunks + 3 line(s))" in out
+        assert f"({len(content.splitlines())} lines)" in out
+
+    def test_new_file_truncated_inside_its_hunk(self, tmp_path, monkeypatch, capsys):
+        repo = _init_repo(tmp_path)
+        _commit(repo, "chore: init")
+        monkeypatch.chdir(repo)
+        monkeypatch.setattr(_mod, "find_git_root", lambda: repo)
+        (repo / "new.txt").write_text("".join(f"row {i}\n" for i in range(100)))
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "feat(05-x): add")
+
+        content = self._adhoc(tmp_path, max_lines=None, max_file_lines=20)
+        out = capsys.readouterr().out
+
+        body = [l for l in content.splitlines() if l.startswith("+row ")]
+        assert body and body[0] == "+row 0" and "+row 99" not in content
+        assert "showing 0 of 1 hunk(s) and" in content
+        assert "line(s) omitted" in content
+        assert len(content.splitlines()) <= 22
+        assert "kept 0/1 hunks + " in out
+
+    def test_total_budget_prefers_fewest_insertions(self, tmp_path, monkeypatch, capsys):
+        self._repo(tmp_path, monkeypatch)
+        content = self._adhoc(tmp_path, max_lines=12, max_file_lines=None)
+
+        assert "+print('hi')" in content
+        assert "showing 0 of 4 hunk(s)" in content
+
+    def test_within_budget_is_plain_diff(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        content = self._adhoc(tmp_path, max_lines=10_000, max_file_lines=None)
+        assert content == _git(repo, "diff", "HEAD^", "HEAD", "--", ".") + "\n"
+
+
+class TestPhasePatchScope:
+    """generate-phase-patch --scope key-files (real git repo)."""
+
+    def _repo(self, tmp_path, monkeypatch, key_files):
+        repo = _patch_repo(tmp_path, monkeypatch, [
+            ("feat(01-auth): session", "session.py"),
+            ("chore: unrelated", "notes.txt"),
+        ])
+        phase_dir = repo / ".planning" / "phases" / "01-auth"
+        phase_dir.mkdir(parents=True)
+        (phase_dir / "01-01-SUMMARY.md").write_text(
+            "---\nphase: 01-auth\nkey-files:\n  created:\n" + "".join(f"    - {f}\n" for f in key_files) + "---\n"
+        )
+        return repo
+
+    def test_only_key_files_diffed(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch, ["./session.py"])
+        _mod.cmd_generate_phase_patch(_phase_patch_args(phase="1", scope="key-files"))
+        out = capsys.readouterr().out
+
+        assert "Scope: 1 key file(s) from phase summaries" in out
+        patch = (repo / ".planning" / "phases" / "01-auth" / "01-changes.patch").read_text()
+        assert "session.py" in patch and "notes.txt" not in patch
+
+    def test_scope_change_invalidates_sidecar(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch, ["session.py"])
+        _mod.cmd_generate_phase_patch(_phase_patch_args(phase="1", scope="key-files"))
+        _mod.cmd_generate_phase_patch(_phase_patch_args(phase="1"))
+        out = capsys.readouterr().out
+
+        assert "Up to date" not in out
+        assert "notes.txt" in (repo / ".planning" / "phases" / "01-auth" / "01-changes.patch").read_text()
+
+    def test_no_key_files_skips(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch, [])
+        _mod.cmd_generate_phase_patch(_phase_patch_args(phase="1", scope="key-files"))
+        out = capsys.readouterr().out
+
+        assert "No key-files listed in phase summaries" in out
+        assert not (repo / ".planning" / "phases" / "01-auth" / "01-changes.patch").exists()
+
+
+class TestSplitPatches:
+    """generate-phase-patch --split (real git repo)."""
+
+    def _run(self, tmp_path, monkeypatch):
+        repo = _patch_repo(tmp_path, monkeypatch, init_path="old_name.py")
+        (repo / ".planning" / "phases" / "04-api").mkdir(parents=True)
+        _git(repo, "mv", "old_name.py", "new_name.py")
+        (repo / "src").mkdir()
+        (repo / "src" / "app.py").write_text("a\nb\n")
+        (repo / "icon.bin").write_bytes(b"\x00\x01\x02")
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "feat(04-api): add app")
+        _mod.cmd_generate_phase_patch(_phase_patch_args(phase="4", split=True))
+        return repo / ".planning" / "phases" / "04-api" / "04-changes"
+
+    def test_manifest_records_each_file(self, tmp_path, monkeypatch, capsys):
+        split_dir = self._run(tmp_path, monkeypatch)
+        manifest = json.loads((split_dir / "manifest.json").read_text())
+        by_path = {f["path"]: f for f in manifest["files"]}
+
+        assert set(by_path) == {"icon.bin", "new_name.py", "src/app.py"}
+        assert by_path["src/app.py"]["status"] == "A"
+        assert by_path["src/app.py"]["insertions"] == 2
+        assert by_path["new_name.py"]["status"].startswith("R")
+        assert by_path["new_name.py"]["old_path"] == "old_name.py"
+        assert by_path["icon.bin"]["binary"] is True
+        assert manifest["totals"]["files"] == 3
+        assert "3 files" in capsys.readouterr().out
+
+    def test_each_patch_holds_one_file(self, tmp_path, monkeypatch):
+        split_dir = self._run(tmp_path, monkeypatch)
+        manifest = json.loads((split_dir / "manifest.json").read_text())
+        for entry in manifest["files"]:
+            content = Path(entry["patch"]).read_bytes()
+            assert content.count(b"diff --git ") == 1
+            assert entry["path"].encode() in content.splitlines()[0]
+            assert len(content) == entry["bytes"]
+        assert not (split_dir.parent / "04-changes.patch").exists()
+
+    def test_switching_modes_removes_other_output(self, tmp_path, monkeypatch, capsys):
+        split_dir = self._run(tmp_path, monkeypatch)
+        patch = split_dir.parent / "04-changes.patch"
+        args = _phase_patch_args(phase="4")
+        _mod.cmd_generate_phase_patch(args)
+        assert patch.is_file() and not split_dir.exists()
+
+        args.split = True
+        _mod.cmd_generate_phase_patch(args)
+        assert (split_dir / "manifest.json").is_file() and not patch.exists()
+
+
+class TestChangeStats:
+    """change-stats and the --change-stats modes (real git repo)."""
+
+    SUMMARY = (
+        "---\nphase: 01-auth\nsubsystem: auth\n"
+        "key-files:\n  created: [src/auth/session.ts]\n  modified: []\n---\n\n# Summary\n"
+    )
+
+    def _repo(self, tmp_path, monkeypatch):
+        repo = _patch_repo(tmp_path, monkeypatch, init_path="README.md")
+        summary = repo / ".planning" / "phases" / "01-auth" / "01-01-SUMMARY.md"
+        summary.parent.mkdir(parents=True)
+        summary.write_text(self.SUMMARY)
+        (repo / "src" / "auth").mkdir(parents=True)
+        (repo / "src" / "ui").mkdir()
+        (repo / "src" / "auth" / "session.ts").write_text("a\nb\nc\n")
+        (repo / "src" / "auth" / "token.ts").write_text("t\n")
+        (repo / "src" / "ui" / "button.tsx").write_text("x\ny\n")
+        (repo / "logo.png").write_bytes(b"\x89PNG\x00\x01")
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "feat(01-auth): session")
+        return repo
+
+    def _args(self, **overrides):
+        args = dict(phase="1", base=None, head="HEAD", suffix="", all_history=True, depth=2, json=True)
+        args.update(overrides)
+        return argparse.Namespace(**args)
+
+    def test_json_groups_by_subsystem_and_directory(self, tmp_path, monkeypatch, capsys):
+        self._repo(tmp_path, monkeypatch)
+        _mod.cmd_change_stats(self._args())
+        out = json.loads(capsys.readouterr().out)
+
+        assert out["totals"] == {"files": 4, "insertions": 6, "deletions": 0, "binary": 1}
+        subsystems = {r["name"]: r for r in out["subsystems"]}
+        assert subsystems["auth"]["files"] == 2  # session.ts by key-files, token.ts by directory
+        assert subsystems["auth"]["insertions"] == 4
+        assert subsystems["(unmapped)"]["files"] == 2
+        directories = {r["name"]: r["insertions"] for r in out["directories"]}
+        assert directories == {"src/auth": 4, "src/ui": 2, ".": 0}
+        assert out["directories"][0]["name"] == "src/auth"
+
+    def test_base_range_table(self, tmp_path, monkeypatch, capsys):
+        self._repo(tmp_path, monkeypatch)
+        _mod.cmd_change_stats(self._args(phase=None, base="HEAD~1", json=False, depth=1))
+        out = capsys.readouterr().out
+
+        assert "Files: 4 (+6 -0, 1 binary)" in out
+        assert any(line.startswith("src ") for line in out.splitlines())
+
+    def test_unknown_base_exits(self, tmp_path, monkeypatch):
+        self._repo(tmp_path, monkeypatch)
+        with pytest.raises(SystemExit) as exc:
+            _mod.cmd_change_stats(self._args(phase=None, base="nope"))
+        assert exc.value.code == 1
+
+    def test_gather_milestone_stats_mode(self, tmp_path, monkeypatch, capsys):
+        self._repo(tmp_path, monkeypatch)
+        _mod.cmd_gather_milestone_stats(argparse.Namespace(start_phase=1, end_phase=1, all_history=True, change_stats=True, breakdown=False))
+        out = capsys.readouterr().out
+
+        assert "=== Change Stats ===" in out
+        assert "Files: 4 (+6 -0, 1 binary)" in out
+
+
+class TestPatchExclusions:
+    """config.json / .gitattributes / size driven patch exclusions."""
+
+    def test_config_extends_defaults(self):
+        specs = _mod.build_exclude_pathspecs({"patch": {"exclude": ["*.pb.go", "*.lock"]}})
+        assert specs[: len(_mod.PATCH_EXCLUSIONS)] == [f":!{p}" for p in _mod.PATCH_EXCLUSIONS]
+        assert specs.count(":!*.lock") == 1
+        assert specs[-1] == ":!*.pb.go"
+
+    def test_defaults_can_be_dropped(self):
+        assert _mod.build_exclude_pathspecs({"patch": {"default_exclusions": False, "exclude": "vendor"}}) == [":!vendor"]
+        assert _mod.build_exclude_pathspecs({"patch": "bogus"}) == _mod.build_exclude_pathspecs()
+
+    def _repo(self, tmp_path, monkeypatch):
+        repo = _patch_repo(tmp_path, monkeypatch, init_path="README.md", cache=True)
+        (repo / ".gitattributes").write_text("*.pb.go linguist-generated\nsnapshots/** -diff\n")
+        _commit(repo, "chore: attributes", ".gitattributes")
+        (repo / "api.pb.go").write_text("generated\n")
+        (repo / "snapshots").mkdir()
+        (repo / "snapshots" / "home.snap").write_text("snap\n")
+        (repo / "bundle.min.js").write_text("x\n")
+        (repo / "big.txt").write_text("line\n" * 50)
+        (repo / "app.py").write_text("print(1)\n")
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "feat(02-api): stuff")
+        return repo
+
+    def test_attributes_and_size_resolved_from_numstat(self, tmp_path, monkeypatch):
+        self._repo(tmp_path, monkeypatch)
+        config = {"patch": {"exclude": ["*.min.js"], "exclude_over_lines": 10}}
+        diff_args, excluded = _mod.patch_diff_args(["HEAD~1", "HEAD"], config=config)
+
+        assert sorted(excluded) == ["api.pb.go", "big.txt", "snapshots/home.snap"]
+        assert ":!*.min.js" in diff_args
+        assert ":(exclude,literal)big.txt" in diff_args
+
+    def test_many_exclusions_use_tree_not_argv(self, tmp_path, monkeypatch):
+        repo = self._repo(tmp_path, monkeypatch)
+        monkeypatch.setattr(_mod, "_EXCLUDE_ARGV_PATHS", 0)
+        (repo / "gen").mkdir()
+        _git(repo, "mv", "api.pb.go", "gen/api2.pb.go")
+        (repo / "big.txt").write_text("line\n" * 80)
+        (repo / "app.py").write_text("print(2)\n")
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "feat(02-api): more")
+        status_before = _git(repo, "status", "--porcelain")
+
+        config = {"patch": {"exclude_over_lines": 10}}
+        diff_args, excluded = _mod.patch_diff_args(["HEAD~1", "HEAD"], config=config)
+
+        assert sorted(excluded) == ["api.pb.go", "big.txt", "gen/api2.pb.go"]
+        assert not any(a.startswith(":(exclude,literal)") for a in diff_args)
+        patch = _git(repo, *diff_args)
+        assert [l for l in patch.splitlines() if l.startswith("diff --git")] == ["diff --git a/app.py b/app.py"]
+        assert _git(repo, "status", "--porcelain") == status_before
+
+    def test_gitattributes_can_be_disabled(self, tmp_path, monkeypatch):
+        self._repo(tmp_path, monkeypatch)
+        _, excluded = _mod.patch_diff_args(["HEAD~1", "HEAD"], config={"patch": {"gitattributes": False}})
+        assert excluded == []
+
+    def test_adhoc_patch_omits_excluded_files(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        (repo / ".planning").mkdir()
+        (repo / ".planning" / "config.json").write_text(json.dumps({"patch": {"exclude_over_lines": 10}}))
+        out = tmp_path / "adhoc.patch"
+        _mod.cmd_generate_adhoc_patch(argparse.Namespace(commit="HEAD", output=str(out), end=None, binary=False))
+
+        content = out.read_text()
+        assert "app.py" in content and "bundle.min.js" in content
+        for skipped in ("api.pb.go", "home.snap", "big.txt"):
+            assert skipped not in content
+
+
+class TestPhaseCommitIndex:
+    """Persistent phase commit index under the git dir (real git repo)."""
+
+    def test_matches_uncached_scan(self, tmp_path, monkeypatch):
+        repo = _init_repo(tmp_path)
+        monkeypatch.chdir(repo)
+        _commit(repo, "feat(01-setup): init")
+        _commit(repo, "fix(1-uat): button")
+        _commit(repo, "feat(10-deploy): ship")
+        _commit(repo, "feat(02.1-hotfix): urgent")
+        _commit(repo, "docs: readme")
+
+        queries = [("1", ""), ("1", "uat-fixes"), ("1", "setup"), ("10", ""), ("2.1", ""), ("3", "")]
+        indexed = [find_phase_commit_hashes(p, sfx) for p, sfx in queries]
+        assert (repo / ".git" / "ms-tools" / "phase-commits.json").is_file()
+        with mock.patch.object(_mod, "_tool_cache_dir", return_value=None):
+            scanned = [find_phase_commit_hashes(p, sfx) for p, sfx in queries]
+        assert indexed == scanned
+        assert len(indexed[0]) == 2
+
+    def test_extends_from_tip(self, tmp_path, monkeypatch):
+        repo = _init_repo(tmp_path)
+        monkeypatch.chdir(repo)
+        first = _commit(repo, "feat(01-setup): init")
+        assert find_phase_commit_hashes("1") == [first]
+
+        second = _commit(repo, "feat(01-setup): more")
+        calls = []
+        real_run_git = _mod.run_git
+
+        def spy(*args):
+            calls.append(args)
+            return real_run_git(*args)
+
+        with mock.patch.object(_mod, "run_git", side_effect=spy):
+            assert find_phase_commit_hashes("1") == [second, first]
+        log_calls = [c for c in calls if c[0] == "log"]
+        assert len(log_calls) == 1 and ".." in log_calls[0][-1]
+
+        with mock.patch.object(_mod, "run_git", side_effect=spy):
+            calls.clear()
+            find_phase_commit_hashes("1")
+        assert calls == []  # tip unchanged: HEAD resolved through the cat-file session
+
+    def test_rebuilds_after_history_rewrite(self, tmp_path, monkeypatch):
+        repo = _init_repo(tmp_path)
+        monkeypatch.chdir(repo)
+        base = _commit(repo, "feat(01-setup): init")
+        _commit(repo, "feat(02-auth): login")
+        assert len(find_phase_commit_hashes("2")) == 1
+
+        _git(repo, "reset", "-q", "--hard", base)
+        replacement = _commit(repo, "feat(03-billing): stripe")
+        assert find_phase_commit_hashes("2") == []
+        assert find_phase_commit_hashes("3") == [replacement]
+
+    def test_stores_full_ids_and_abbreviates_on_read(self, tmp_path, monkeypatch):
+        repo = _init_repo(tmp_path)
+        monkeypatch.chdir(repo)
+        short = _commit(repo, "feat(01-setup): init")
+        assert find_phase_commit_hashes("1") == [short]
+
+        data = json.loads((repo / ".git" / "ms-tools" / "phase-commits.json").read_text())
+        assert [entry[0] for entry in data["commits"]] == [_git(repo, "rev-parse", "HEAD")]
+
+        _git(repo, "config", "core.abbrev", "12")
+        assert find_phase_commit_hashes("1") == [_git(repo, "rev-parse", "--short", "HEAD")]
+        paths = _mod._phase_path_index(repo / ".git" / "ms-tools")
+        assert paths["file.txt"][0][2] == _git(repo, "rev-parse", "HEAD")
+
+
+class TestCmdArchiveMilestonePhases:
+    """archive-milestone-phases streaming consolidation and journal resume."""
+
+    def _tree(self, tmp_path):
+        phases = tmp_path / ".planning" / "phases"
+        for name in ("01-setup", "02-auth", "03-later"):
+            (phases / name).mkdir(parents=True)
+            (phases / name / f"{name[:2]}-01-SUMMARY.md").write_text(f"summary {name}\n")
+            (phases / name / f"{name[:2]}-01-PLAN.md").write_text("# Plan\n")
+            (phases / name / f"{name[:2]}-CONTEXT.md").write_text("# Context\n")
+        (tmp_path / ".planning" / "milestones" / "mvp").mkdir(parents=True)
+        return tmp_path / ".planning" / "milestones" / "mvp"
+
+    def _run(self, tmp_path, start=1, end=2):
+        with mock.patch.object(_mod, "find_git_root", return_value=tmp_path), \
+                mock.patch.object(_mod.GitSession, "resolve", return_value=None):
+            _mod.cmd_archive_milestone_phases(argparse.Namespace(start_phase=start, end_phase=end, milestone="mvp"))
+
+    def test_consolidates_deletes_and_moves(self, tmp_path, capsys):
+        milestone = self._tree(tmp_path)
+        self._run(tmp_path)
+        out = capsys.readouterr().out
+
+        assert (milestone / "PHASE-SUMMARIES.md").read_text() == (
+            "# Phase Summaries: mvp\n\n## Phase 01: setup\n\n### 01-01\n\nsummary 01-setup\n\n\n"
+            "## Phase 02: auth\n\n### 02-01\n\nsummary 02-auth\n\n"
+        )
+        assert "Archive complete: 2 summaries, 4 artifacts deleted, 2 dirs moved" in out
+        assert sorted(p.name for p in (milestone / "phases" / "02-auth").iterdir()) == ["02-01-PLAN.md"]
+        assert (tmp_path / ".planning" / "phases" / "03-later").is_dir()
+        assert not (milestone / ".archive-journal.json").exists()
+
+    def test_resumes_after_interruption(self, tmp_path, capsys):
+        milestone = self._tree(tmp_path)
+        real_move = _mod.shutil.move
+
+        def crash_on_auth(src, dst):
+            if src.endswith("02-auth"):
+                raise KeyboardInterrupt
+            return real_move(src, dst)
+
+        with mock.patch.object(_mod.shutil, "move", side_effect=crash_on_auth), pytest.raises(KeyboardInterrupt):
+            self._run(tmp_path)
+        journal = json.loads((milestone / ".archive-journal.json").read_text())
+        assert journal["moved"] == ["01-setup"] and journal["summaries"] == 2
+
+        self._run(tmp_path)
+        out = capsys.readouterr().out
+
+        assert "Resuming archive from .archive-journal.json (1/2 phases moved)" in out
+        assert "Archive complete: 2 summaries, 4 artifacts deleted, 2 dirs moved" in out
+        assert "summary 02-auth" in (milestone / "PHASE-SUMMARIES.md").read_text()  # not rewritten after delete
+        assert (milestone / "phases" / "02-auth").is_dir()
+        assert not (milestone / ".archive-journal.json").exists()
+
+    def test_journal_for_other_range_exits(self, tmp_path):
+        milestone = self._tree(tmp_path)
+        (milestone / ".archive-journal.json").write_text(json.dumps(
+            {"range": [1, 3], "phases": [], "summaries": None, "deleted": 0, "moved": []}
+        ))
+        with pytest.raises(SystemExit) as exc:
+            self._run(tmp_path)
+        assert exc.value.code == 1
+
+
+class TestArchivePack:
+    """archive-pack / archive-ls / archive-cat over packed milestone phases."""
+
+    def _milestone(self, tmp_path):
+        milestone = tmp_path / ".planning" / "milestones" / "mvp"
+        for name, body in (("01-setup/01-01-PLAN.md", "plan one\n"), ("02-auth/02-01-PLAN.md", "x" * 70_000)):
+            (milestone / "phases" / name).parent.mkdir(parents=True, exist_ok=True)
+            (milestone / "phases" / name).write_text(body)
+        return milestone
+
+    def _cat(self, tmp_path, capsysbinary, path):
+        with mock.patch.object(_mod, "find_git_root", return_value=tmp_path):
+            _mod.cmd_archive_cat(argparse.Namespace(milestone="mvp", path=path))
+        return capsysbinary.readouterr().out
+
+    def _pack(self, tmp_path, fmt):
+        with mock.patch.object(_mod, "find_git_root", return_value=tmp_path):
+            _mod.cmd_archive_pack(argparse.Namespace(milestone="mvp", format=fmt))
+
+    @pytest.mark.parametrize("fmt", ["tar.xz", "zip"])
+    def test_pack_and_cat_without_extracting(self, tmp_path, capsysbinary, fmt):
+        milestone = self._milestone(tmp_path)
+        self._pack(tmp_path, fmt)
+        capsysbinary.readouterr()
+
+        assert not (milestone / "phases").exists()
+        index = json.loads((milestone / "phases.index.json").read_text())
+        assert index["archive"] == f"phases.{fmt}"
+        assert sorted(index["members"]) == ["01-setup/01-01-PLAN.md", "02-auth/02-01-PLAN.md"]
+        assert self._cat(tmp_path, capsysbinary, "phases/01-setup/01-01-PLAN.md") == b"plan one\n"
+        assert self._cat(tmp_path, capsysbinary, "02-auth/02-01-PLAN.md") == b"x" * 70_000
+
+    def test_repack_merges_new_files_and_switches_format(self, tmp_path, capsysbinary):
+        milestone = self._milestone(tmp_path)
+        self._pack(tmp_path, "tar.xz")
+        (milestone / "phases" / "03-billing").mkdir(parents=True)
+        (milestone / "phases" / "03-billing" / "03-01-PLAN.md").write_text("billing\n")
+        self._pack(tmp_path, "zip")
+        capsysbinary.readouterr()
+
+        assert not (milestone / "phases.tar.xz").exists()
+        assert self._cat(tmp_path, capsysbinary, "01-setup/01-01-PLAN.md") == b"plan one\n"
+        assert self._cat(tmp_path, capsysbinary, "03-billing/03-01-PLAN.md") == b"billing\n"
+
+    def test_ls_and_missing_member(self, tmp_path, capsys):
+        self._milestone(tmp_path)
+        (tmp_path / ".planning" / "milestones" / "v0").mkdir()
+        self._pack(tmp_path, "tar.xz")
+        capsys.readouterr()
+        with mock.patch.object(_mod, "find_git_root", return_value=tmp_path):
+            _mod.cmd_archive_ls(argparse.Namespace(milestone=None, json=True))
+            assert json.loads(capsys.readouterr().out) == {
+                "mvp": {"state": "tar.xz", "files": 2}, "v0": {"state": "none", "files": 0},
+            }
+            _mod.cmd_archive_ls(argparse.Namespace(milestone="mvp", json=False))
+            assert capsys.readouterr().out.splitlines()[1].endswith("  02-auth/02-01-PLAN.md")
+            with pytest.raises(SystemExit) as exc:
+                _mod.cmd_archive_cat(argparse.Namespace(milestone="mvp", path="nope.md"))
+        assert exc.value.code == 1
+
+    def test_archive_milestone_phases_pack(self, tmp_path, capsys):
+        phase = tmp_path / ".planning" / "phases" / "01-setup"
+        phase.mkdir(parents=True)
+        (phase / "01-01-SUMMARY.md").write_text("done\n")
+        (phase / "01-01-PLAN.md").write_text("# Plan\n")
+        milestone = tmp_path / ".planning" / "milestones" / "mvp"
+        milestone.mkdir(parents=True)
+        with mock.patch.object(_mod, "find_git_root", return_value=tmp_path), \
+                mock.patch.object(_mod.GitSession, "resolve", return_value=None):
+            _mod.cmd_archive_milestone_phases(
+                argparse.Namespace(start_phase=1, end_phase=1, milestone="mvp", pack="zip")
+            )
+
+        assert "Stage 5: Packed 1 files into milestones/mvp/phases.zip" in capsys.readouterr().out
+        assert sorted(p.name for p in milestone.iterdir()) == [
+            "PHASE-SUMMARIES.index.json", "PHASE-SUMMARIES.md", "phases.index.json", "phases.zip",
+        ]
+
+
+class TestMilestoneBoundary:
+    """archive-milestone-phases records a boundary that later searches start from."""
+
+    def _archive(self, repo, monkeypatch, capsys):
+        phase = repo / ".planning" / "phases" / "01-setup"
+        phase.mkdir(parents=True)
+        (phase / "01-01-SUMMARY.md").write_text("---\nphase: 01-setup\n---\n")
+        (repo / ".planning" / "milestones" / "mvp").mkdir(parents=True)
+        monkeypatch.chdir(repo)
+        with mock.patch.object(_mod, "find_git_root", return_value=repo):
+            _mod.cmd_archive_milestone_phases(argparse.Namespace(start_phase=1, end_phase=1, milestone="mvp"))
+        capsys.readouterr()
+
+    def test_archive_records_head(self, tmp_path, monkeypatch, capsys):
+        repo = _init_repo(tmp_path)
+        _commit(repo, "feat(01-setup): init")
+        self._archive(repo, monkeypatch, capsys)
+        boundary = json.loads((repo / ".planning" / "milestones" / "mvp" / "boundary.json").read_text())
+        assert boundary["commit"] == _git(repo, "rev-parse", "HEAD")
+        assert _mod._milestone_boundary(repo) == boundary["commit"]
+
+    @pytest.mark.parametrize("indexed", [True, False])
+    def test_find_phase_commits_bounded(self, tmp_path, monkeypatch, capsys, indexed):
+        if not indexed:
+            monkeypatch.setattr(_mod, "_tool_cache_dir", lambda root: None)
+        repo = _init_repo(tmp_path)
+        old = _commit(repo, "feat(01-setup): first milestone")
+        self._archive(repo, monkeypatch, capsys)
+        new = _commit(repo, "feat(01-dashboard): phase numbering restarted")
+
+        with mock.patch.object(_mod, "find_git_root", return_value=repo):
+            cmd_find_phase_commits(argparse.Namespace(phase="1", suffix="", all_history=False))
+            assert capsys.readouterr().out.split() == [new]
+            cmd_find_phase_commits(argparse.Namespace(phase="1", suffix="", all_history=True))
+            assert capsys.readouterr().out.split() == [new, old]
+
+    def test_gather_stats_bounded(self, tmp_path, monkeypatch, capsys):
+        repo = _init_repo(tmp_path)
+        _commit(repo, "feat(01-setup): first milestone")
+        self._archive(repo, monkeypatch, capsys)
+        phase = repo / ".planning" / "phases" / "01-dashboard"
+        phase.mkdir(parents=True)
+        (phase / "01-01-SUMMARY.md").write_text("# Summary")
+        _commit(repo, "feat(01-dashboard): new milestone", "src/app.txt")
+
+        with mock.patch.object(_mod, "find_git_root", return_value=repo):
+            cmd_gather_milestone_stats(argparse.Namespace(start_phase=1, end_phase=1, all_history=False, change_stats=False, breakdown=False))
+            assert "Commits: 1" in capsys.readouterr().out
+            cmd_gather_milestone_stats(argparse.Namespace(start_phase=1, end_phase=1, all_history=True, change_stats=False, breakdown=False))
+            assert "Commits: 2" in capsys.readouterr().out
+
+    def test_boundary_not_ancestor_ignored(self, tmp_path):
+        repo = _init_repo(tmp_path)
+        _commit(repo, "feat(01-setup): init")
+        milestone = repo / ".planning" / "milestones" / "mvp"
+        milestone.mkdir(parents=True)
+        (milestone / "boundary.json").write_text(json.dumps({"commit": "0" * 40, "recorded": "2026-01-01"}))
+        import subprocess
+        with mock.patch.object(_mod, "run_git", side_effect=subprocess.CalledProcessError(1, "git")):
+            assert _mod._milestone_boundary(repo) is None
+
+
 class TestCmdFindPhaseCommits:
     """CLI contract tests for cmd_find_phase_commits."""
 
+    @pytest.fixture(autouse=True)
+    def _no_index(self, monkeypatch):
+        monkeypatch.setattr(_mod, "_tool_cache_dir", lambda root: None)
+
     def test_prints_hashes_one_per_line(self, capsys, monkeypatch):
         monkeypatch.setattr(_mod, "find_git_root", lambda: "/fake")
         monkeypatch.setattr(_mod.os, "chdir", lambda _: None)
@@ -2713,7 +4167,7 @@ class TestCmdFindPhaseCommits:
             "bbb2222 fix(1-setup): typo",
         ]
         with mock.patch.object(_mod, "run_git", return_value="\n".join(lines)):
-            cmd_find_phase_commits(argparse.Namespace(phase="1", suffix=""))
+            cmd_find_phase_commits(argparse.Namespace(phase="1", suffix="", all_history=False))
         out = capsys.readouterr().out
         assert out == "aaa1111\nbbb2222\n"
 
@@ -2721,7 +4175,7 @@ class TestCmdFindPhaseCommits:
         monkeypatch.setattr(_mod, "find_git_root", lambda: "/fake")
         monkeypatch.setattr(_mod.os, "chdir", lambda _: None)
         with mock.patch.object(_mod, "run_git", return_value="abc123 docs: readme"):
-            cmd_find_phase_commits(argparse.Namespace(phase="1", suffix=""))
+            cmd_find_phase_commits(argparse.Namespace(phase="1", suffix="", all_history=False))
         out = capsys.readouterr().out
         assert out == ""
 
@@ -2734,7 +4188,7 @@ class TestCmdFindPhaseCommits:
             side_effect=subprocess.CalledProcessError(1, "git"),
         ):
             with pytest.raises(SystemExit) as exc_info:
-                cmd_find_phase_commits(argparse.Namespace(phase="1", suffix=""))
+                cmd_find_phase_commits(argparse.Namespace(phase="1", suffix="", all_history=False))
             assert exc_info.value.code == 1
 
 
@@ -2743,6 +4197,119 @@ class TestCmdFindPhaseCommits:
 # ===================================================================
 
 
+class TestCmdPhaseOf:
+    """phase-of path attribution over the cached path index (real git repo)."""
+
+    def _repo(self, tmp_path, monkeypatch):
+        return _patch_repo(tmp_path, monkeypatch, [
+            ("feat(01-02): add login", "src/auth/login.ts"),
+            ("docs: notes", "src/auth/login.ts"),
+            ("fix(3-uat): login redirect", "src/auth/login.ts"),
+            ("feat(02-01): api", "src/api.ts"),
+        ], cache=True)
+
+    def _args(self, *paths, **overrides):
+        args = dict(paths=list(paths), all=False, json=False)
+        args.update(overrides)
+        return argparse.Namespace(**args)
+
+    def test_introduced_and_last_touched(self, tmp_path, monkeypatch, capsys):
+        self._repo(tmp_path, monkeypatch)
+        _mod.cmd_phase_of(self._args("src/auth/login.ts", "file.txt"))
+        lines = capsys.readouterr().out.splitlines()
+
+        assert lines[0].startswith("src/auth/login.ts: introduced 01-02 (")
+        assert "last touched 03-uat (" in lines[0]
+        assert lines[1] == "file.txt: no phase commits"
+
+    def test_directory_and_json(self, tmp_path, monkeypatch, capsys):
+        self._repo(tmp_path, monkeypatch)
+        _mod.cmd_phase_of(self._args("src", json=True))
+        out = json.loads(capsys.readouterr().out)
+
+        assert [(e["phase"], e["plan"]) for e in out["src"]] == [("02", "01"), ("03", "uat"), ("01", "02")]
+
+    def test_index_extends_from_tip(self, tmp_path, monkeypatch, capsys):
+        repo = self._repo(tmp_path, monkeypatch)
+        _mod.cmd_phase_of(self._args("src/api.ts"))
+        capsys.readouterr()
+        assert (repo / ".git" / "ms-tools" / "phase-paths.json").is_file()
+        head = _git(repo, "rev-parse", "HEAD")
+        newest = _commit(repo, "feat(04-01): api v2", "src/api.ts")
+
+        calls = []
+        real_run_git = _mod.run_git
+
+        def spy(*args):
+            calls.append(args)
+            return real_run_git(*args)
+
+        with mock.patch.object(_mod, "run_git", side_effect=spy):
+            _mod.cmd_phase_of(self._args("src/api.ts", all=True))
+        out = capsys.readouterr().out
+
+        logs = [c for c in calls if c[0] == "log"]
+        assert len(logs) == 1 and logs[0][-1].startswith(f"{head}..")
+        assert out.splitlines()[1].startswith(f"  04-01  {newest}")
+
+
+class TestReadAtRev:
+    """Global --rev: planning readers over a commit's tree (real git repo)."""
+
+    def _repo(self, tmp_path, monkeypatch):
+        repo = _patch_repo(tmp_path, monkeypatch, cache=True)
+        _write_scan_tree(repo)
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "docs: planning")
+        old = _git(repo, "rev-parse", "--short", "HEAD")
+        _git(repo, "rm", "-rq", ".planning/phases/05-auth")
+        _commit(repo, "docs: drop auth phase", ".planning/phases/07-billing/07-01-PLAN.md")
+        monkeypatch.setattr(_mod, "_READ_REV", None)
+        return repo, old
+
+    def test_find_phase_and_list_artifacts(self, tmp_path, monkeypatch, capsys):
+        _, old = self._repo(tmp_path, monkeypatch)
+        _mod.cmd_find_phase(argparse.Namespace(phase="5"))
+        assert json.loads(capsys.readouterr().out)["dir"] is None
+
+        _mod._use_rev(old, "find-phase")
+        _mod.cmd_find_phase(argparse.Namespace(phase="5"))
+        assert json.loads(capsys.readouterr().out)["dir"] == ".planning/phases/05-auth"
+        _mod.cmd_list_artifacts(argparse.Namespace(phase="5"))
+        assert json.loads(capsys.readouterr().out)["summaries"] == 1
+
+    def test_scan_reads_blobs_and_caches_by_tree(self, tmp_path, monkeypatch, capsys):
+        _, old = self._repo(tmp_path, monkeypatch)
+        _mod._use_rev(old, "scan-planning-context")
+        args = argparse.Namespace(phase="6", phase_name="", subsystems=["auth"], keywords="jwt",
+                                  json=True, ndjson=False, no_cache=False, verbose=True)
+        _mod.cmd_scan_planning_context(args)
+        first = capsys.readouterr()
+        out = json.loads(first.out)
+
+        assert "cache: miss" in first.err
+        assert sorted(s["path"] for s in out["summaries"])[-1] == f"{old}:.planning/phases/05-auth/05-01-SUMMARY.md"
+        assert out["pending_todos"][0]["title"] == "Add logout endpoint"
+        _mod.cmd_scan_planning_context(args)
+        assert "cache: hit" in capsys.readouterr().err
+
+    def test_rejects_writing_commands_and_unknown_revs(self, tmp_path, monkeypatch):
+        self._repo(tmp_path, monkeypatch)
+        for rev, command in (("HEAD", "update-state"), ("no-such-ref", "find-phase")):
+            with pytest.raises(SystemExit) as exc:
+                _mod._use_rev(rev, command)
+            assert exc.value.code == 1
+
+    def test_objects_cached_by_id(self, tmp_path, monkeypatch):
+        repo, old = self._repo(tmp_path, monkeypatch)
+        session = _mod.GitSession(str(repo))
+        oid = session.resolve(f"{old}:.planning/todos/logout.md")
+        assert session.read_object(oid)[0] == "blob"
+        with mock.patch.object(session, "_request", side_effect=AssertionError("pipe used")):
+            assert session.read_object(oid)[1].startswith(b"---\ntitle: Add logout endpoint")
+        session.close()
+
+
 class TestDetectWebProject:
     """Tests for _detect_web_project helper."""
 
@@ -3478,6 +5045,52 @@ class TestDoctorResearchApiKeys:
         assert "CONTEXT7_API_KEY: not set" not in section
 
 
+# ---------------------------------------------------------------------------
+# Doctor: concurrent checks with per-check timings
+# ---------------------------------------------------------------------------
+
+
+class TestDoctorScanConcurrency:
+    """Doctor checks run on a pool but print in fixed order with wall times."""
+
+    def test_fixed_order_and_timings(self, tmp_path, capsys):
+        planning = tmp_path / ".planning"
+        planning.mkdir()
+        (planning / "config.json").write_text(json.dumps({
+            "subsystems": ["app"],
+            "browser_verification": {"enabled": False},
+        }))
+
+        # Make the first check the slowest so later checks finish before it.
+        real_scan = _mod._scan_artifact_subsystem_values
+
+        def slow_scan(p):
+            time.sleep(0.2)
+            return real_scan(p)
+
+        with mock.patch.object(_mod, "find_git_root", return_value=tmp_path), \
+             mock.patch.object(_mod, "_scan_artifact_subsystem_values", side_effect=slow_scan):
+            cmd_doctor_scan(argparse.Namespace())
+
+        out = capsys.readouterr().out
+        headers = [l[4:-4] for l in out.splitlines() if l.startswith("=== ")]
+        expected = [
+            "Subsystem Vocabulary", "Milestone Directory Structure", "Phase Archival",
+            "Knowledge Files", "Phase Summaries", "PLAN Cleanup", "CLI Wrappers",
+            "Milestone Naming Convention", "Research API Keys", "Phase Directory Naming",
+            "Browser Verification", "Screenshot Optimization", "Roadmap Format",
+            "Phase Skills", "Summary",
+        ]
+        assert headers == expected
+        assert "Checks: 14 total" in out
+
+        summary = out[out.index("=== Summary ==="):]
+        assert re.search(r"^Timings: [\d.]+s wall, [\d.]+s across checks$", summary, re.M)
+        timed = re.findall(r"^  (.+): ([\d.]+)s$", summary, re.M)
+        assert [name for name, _ in timed] == expected[:-1]
+        assert float(dict(timed)["Subsystem Vocabulary"]) >= 0.2
+
+
 # ---------------------------------------------------------------------------
 # Prework Status
 # ---------------------------------------------------------------------------